@@ -0,0 +1,51 @@
+"""Measures how quickly Graphics can be created, with and without the cache
+which lets repeated colours be validated only once.
+
+The uncached figures use a copy of the character-by-character validation
+which every colour went through before the cache was added. Run with
+``python -m benchmarks.colors``."""
+
+import time
+import omnicanvas.graphics as graphics
+from omnicanvas.color import colors
+
+COUNT = 200000
+
+def uncached_process_color(color):
+    if not isinstance(color, str):
+        raise TypeError("Color must be str, not '%s'" % color)
+    if not color or color[0] != "#" or len(color) != 7:
+        raise ValueError("'%s' is not a valid color" % color)
+    for char in color[1:]:
+        if char.upper() not in "0123456789ABCDEF":
+            raise ValueError("'%s' is not a valid color" % color)
+    return color.upper()
+
+
+def create_graphics():
+    palette = [color.lower() for color in colors]
+    start = time.perf_counter()
+    for n in range(COUNT):
+        color = palette[n % len(palette)]
+        graphics.Rectangle(
+         n, n, 10, 20, fill_color=color, line_color=color
+        ).fill_color(color)
+    return COUNT / (time.perf_counter() - start)
+
+
+def main():
+    cached_process_color = graphics.process_color
+    graphics.process_color = uncached_process_color
+    try:
+        uncached = create_graphics()
+    finally:
+        graphics.process_color = cached_process_color
+    cached = create_graphics()
+    print("%-10s %16s" % ("Colours", "Rectangles / s"))
+    print("%-10s %16.0f" % ("Uncached", uncached))
+    print("%-10s %16.0f" % ("Cached", cached))
+    print("%-10s %15.1fx" % ("Speedup", cached / uncached))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Measures how much memory each kind of Graphic takes up, compared with the
+Graphic classes as they were before they used ``__slots__``.
+
+Those earlier classes are copied below, reduced to the attributes that their
+constructors stored in each instance's ``__dict__`` - their validation and
+methods make no difference to the memory an instance takes up, except that
+colours were checked by upper-casing them, giving each Graphic its own copy of
+each colour string. Run with ``python -m benchmarks.memory``."""
+
+import tracemalloc
+import omnicanvas.graphics as graphics
+
+COUNT = 20000
+
+class Graphic:
+
+    def __init__(self, name=None, line_width=1, line_style="-",
+     line_color="#000000", rotation=(0, 0, 0), data=None):
+        self._name = name
+        self._line_width = line_width
+        self._line_style = line_style
+        self._line_color = line_color.upper()
+        self._rotation = rotation
+        self._data = data if data is not None else {}
+
+
+
+class ShapeGraphic(Graphic):
+
+    def __init__(self, *args, fill_color="#FFFFFF", opacity=1, **kwargs):
+        Graphic.__init__(self, *args, **kwargs)
+        self._fill_color = fill_color.upper()
+        self._opacity = opacity
+
+
+
+class BoxGraphic(ShapeGraphic):
+
+    def __init__(self, x, y, width, height, *args, **kwargs):
+        ShapeGraphic.__init__(self, *args, **kwargs)
+        self._x = x
+        self._y = y
+        self._width = width
+        self._height = height
+
+
+
+class Rectangle(BoxGraphic):
+    pass
+
+
+
+class Oval(BoxGraphic):
+    pass
+
+
+
+class Line(Graphic):
+
+    def __init__(self, x1, y1, x2, y2, *args, **kwargs):
+        Graphic.__init__(self, *args, **kwargs)
+        self._x1 = x1
+        self._y1 = y1
+        self._x2 = x2
+        self._y2 = y2
+
+
+
+class Polygon(ShapeGraphic):
+
+    def __init__(self, *coordinates, **kwargs):
+        ShapeGraphic.__init__(self, **kwargs)
+        self._coordinates = list(coordinates)
+
+
+
+class Polyline(Graphic):
+
+    def __init__(self, *coordinates, **kwargs):
+        Graphic.__init__(self, **kwargs)
+        self._coordinates = list(coordinates)
+
+
+
+class Text(ShapeGraphic):
+
+    def __init__(self, x, y, text, *args, font_size=18, fill_color="#000000",
+     line_width=0, horizontal_align="center", vertical_align="center", **kwargs):
+        ShapeGraphic.__init__(
+         self, *args, fill_color=fill_color, line_width=line_width, **kwargs
+        )
+        self._x = x
+        self._y = y
+        self._text = text
+        self._font_size = font_size
+        self._horizontal_align = horizontal_align
+        self._vertical_align = vertical_align
+
+
+
+FACTORIES = (
+ ("Rectangle", lambda classes, n: classes.Rectangle(n, n, 10.5, 20.5)),
+ ("Oval", lambda classes, n: classes.Oval(
+  n, n, 10.5, 20.5, fill_color="#FF0000"
+ )),
+ ("Line", lambda classes, n: classes.Line(n, n, n + 10.5, n + 20.5)),
+ ("Polygon", lambda classes, n: classes.Polygon(n, n, 10.5, 20.5, 30.5, n)),
+ ("Polyline", lambda classes, n: classes.Polyline(n, n, 10.5, 20.5, 30.5, n)),
+ ("Text", lambda classes, n: classes.Text(n, n, "Label")),
+)
+
+class Baseline:
+    """The classes above, looked up by name like those of the graphics
+    module."""
+
+    Rectangle, Oval, Line = Rectangle, Oval, Line
+    Polygon, Polyline, Text = Polygon, Polyline, Text
+
+
+
+def measure(factory):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(n) for n in range(COUNT)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(objects)
+
+
+def main():
+    print("%-10s %12s %12s %8s" % ("Graphic", "__dict__", "__slots__", "Saving"))
+    for name, factory in FACTORIES:
+        before = measure(lambda n: factory(Baseline, n))
+        after = measure(lambda n: factory(graphics, n))
+        print("%-10s %10.0f B %10.0f B %7.0f%%" % (
+         name, before, after, 100 * (1 - after / before)
+        ))
+
+
+if __name__ == "__main__":
+    main()
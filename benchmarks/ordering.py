@@ -0,0 +1,46 @@
+"""Measures how the cost of reordering Graphics on a canvas grows with the
+number of Graphics - alternately bringing random Graphics to the front and
+sending them to the back, and moving them to random positions.
+
+Run with ``python -m benchmarks.ordering``."""
+
+import random
+import time
+from omnicanvas import Canvas
+
+SIZES = (10000, 50000, 200000, 1000000)
+OPERATIONS = 2000
+
+def time_operations(canvas, graphics, operation):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for n in range(OPERATIONS):
+        operation(canvas, rng.choice(graphics), n, rng)
+    return (time.perf_counter() - start) / OPERATIONS * 1000000
+
+
+def front_and_back(canvas, graphic, n, rng):
+    if n % 2:
+        canvas.bring_to_front(graphic)
+    else:
+        canvas.send_to_back(graphic)
+
+
+def to_index(canvas, graphic, n, rng):
+    canvas.move_to_index(graphic, rng.randrange(len(canvas._graphics)))
+
+
+def main():
+    print("%-10s %18s %18s" % ("Graphics", "front/back (us)", "to index (us)"))
+    for size in SIZES:
+        canvas = Canvas(1000, 1000, columnar=False)
+        graphics = [canvas.add_line(0, 0, 10, 10) for _ in range(size)]
+        print("%-10i %18.1f %18.1f" % (
+         size,
+         time_operations(canvas, graphics, front_and_back),
+         time_operations(canvas, graphics, to_index)
+        ))
+
+
+if __name__ == "__main__":
+    main()
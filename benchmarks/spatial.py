@@ -0,0 +1,57 @@
+"""Measures how long the canvas's spatial index takes to answer queries in
+dense scenes - small Rectangles scattered over a 1000×1000 canvas - with
+cells of a fixed 128 pixels, and with cells sized from the number of
+Graphics.
+
+Run with ``python -m benchmarks.spatial``."""
+
+import random
+import time
+from omnicanvas import Canvas
+from omnicanvas.spatial import SpatialIndex, choose_cell_size
+
+SIZES = (1000, 10000, 100000, 400000)
+QUERIES = 2000
+FIXED_CELL_SIZE = 128
+
+def time_queries(index, query):
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for n in range(QUERIES):
+        query(index, rng.uniform(0, 1000), rng.uniform(0, 1000))
+    return (time.perf_counter() - start) / QUERIES * 1000000
+
+
+def point(index, x, y):
+    index.at(x, y)
+
+
+def region(index, x, y):
+    index.within(x, y, 20, 20)
+
+
+def main():
+    print("%-10s %12s %16s %16s %16s %16s" % (
+     "Graphics", "cell size", "fixed at (us)", "sized at (us)",
+     "fixed in (us)", "sized in (us)"
+    ))
+    for size in SIZES:
+        rng = random.Random(0)
+        canvas = Canvas(1000, 1000)
+        for _ in range(size):
+            canvas.add_rectangle(
+             rng.uniform(0, 1000), rng.uniform(0, 1000),
+             rng.uniform(1, 5), rng.uniform(1, 5)
+            )
+        cell_size = choose_cell_size(size, 1000, 1000)
+        fixed = SpatialIndex(canvas._graphics, FIXED_CELL_SIZE)
+        sized = SpatialIndex(canvas._graphics, cell_size)
+        print("%-10i %12.1f %16.1f %16.1f %16.1f %16.1f" % (
+         size, cell_size,
+         time_queries(fixed, point), time_queries(sized, point),
+         time_queries(fixed, region), time_queries(sized, region)
+        ))
+
+
+if __name__ == "__main__":
+    main()
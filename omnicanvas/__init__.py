@@ -1,6 +1,7 @@
 from .canvas import Canvas
 from .color import hsl_to_rgb, colors, RED, BLUE, GREEN, YELLOW, ORANGE
 from .color import PURPLE, PINK, BROWN, PALEBLUE, PALEGREEN, BLACK
+from .color import hsl_to_rgb_many, rgb_to_hex_many, gradient, apply_colormap
 
 __version__ = "0.3.0"
 __author__ = "Sam Ireland"
@@ -1,8 +1,13 @@
 """This module contains the main Canvas class."""
 
+import gzip
 from .color import process_color
 from . import graphics
 from . import svg
+from . import spatial
+from . import raster
+from . import tiles
+from .order import DrawingOrder
 
 class Canvas:
     """A backdrop on which other :py:class:`.Graphic` objects are painted.
@@ -10,9 +15,12 @@ class Canvas:
     :param width: The canvas's width in pixels.
     :param height: The canvas's height in pixels.
     :param background_color: The canvas's background colour - the default is\
-    white"""
+    white
+    :param bool columnar: If ``True``, Rectangles, Ovals and Lines will be\
+    stored in columns of numbers rather than as separate objects (see\
+    :py:meth:`add_rectangle`)."""
 
-    def __init__(self, width, height, background_color=None):
+    def __init__(self, width, height, background_color=None, columnar=False):
         if isinstance(width, float):
             width = round(width)
         if not isinstance(width, int):
@@ -30,7 +38,14 @@ class Canvas:
         else:
             self._background_color = process_color(background_color)
 
-        self._graphics = []
+        if not isinstance(columnar, bool):
+            raise TypeError("columnar must be bool, not '%s'" % columnar)
+        self._columnar = columnar
+
+        self._graphics = DrawingOrder()
+        self._spatial_index = None
+        self._name_index = None
+        self._name_index_source = None
 
 
     def __repr__(self):
@@ -39,6 +54,21 @@ class Canvas:
         )
 
 
+    def __getstate__(self):
+        # The indexes are left out - they are rebuilt when they are next needed.
+        state = dict(self.__dict__)
+        state.update(
+         _spatial_index=None, _name_index=None, _name_index_source=None
+        )
+        return state
+
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for graphic in self._graphics:
+            graphic._parent = self
+
+
     def width(self, width=None):
         """The canvas's width in pixels. Passing a value will update the width
         property.
@@ -100,6 +130,9 @@ class Canvas:
         first one with a matching name. Returns ``None`` if there are no
         matches.
 
+        The canvas keeps an index of its Graphics by name, so this does not
+        need to check every Graphic.
+
         :param str name: The name to search by.
         :rtype: str"""
 
@@ -107,9 +140,8 @@ class Canvas:
             raise TypeError(
              "Can only search for str name, not '%s'" % str(name)
             )
-        for graphic in self.graphics():
-            if graphic.name() == name:
-                return graphic
+        graphics = self._get_name_index().get(name)
+        return graphics[0] if graphics else None
 
 
     def get_graphics_by_name(self, name):
@@ -124,7 +156,7 @@ class Canvas:
             raise TypeError(
              "Can only search for str name, not '%s'" % str(name)
             )
-        return [g for g in self.graphics() if g.name() == name]
+        return list(self._get_name_index().get(name, ()))
 
 
     def move_graphic_forward(self, graphic):
@@ -136,11 +168,13 @@ class Canvas:
 
         if not isinstance(graphic, graphics.Graphic):
             raise TypeError("%s is not a Graphic" % str(graphic))
-        if not graphic is self.graphics()[-1]:
-            index = self.graphics().index(graphic)
-            self._graphics[index], self._graphics[index + 1] = (
-             self._graphics[index + 1], self._graphics[index]
-            )
+        if self._is_row(graphic) and graphic._row != len(graphic._batch) - 1:
+            graphic._batch._swap(graphic._row, graphic._row + 1)
+            self._graphic_reordered(graphic)
+            return
+        index = self._separate(graphic)
+        if index != len(self._graphics) - 1:
+            self._move_graphic(index, index + 1)
 
 
     def move_graphic_backward(self, graphic):
@@ -151,17 +185,303 @@ class Canvas:
 
         if not isinstance(graphic, graphics.Graphic):
             raise TypeError("%s is not a Graphic" % str(graphic))
-        if not graphic is self.graphics()[0]:
-            index = self.graphics().index(graphic)
-            if index == -1:
-                raise ValueError("%s is not a Graphic in %s" % (
-                 graphic, self
-                ))
-            self._graphics[index], self._graphics[index - 1] = (
-             self._graphics[index - 1], self._graphics[index]
+        if self._is_row(graphic) and graphic._row != 0:
+            graphic._batch._swap(graphic._row, graphic._row - 1)
+            self._graphic_reordered(graphic)
+            return
+        index = self._separate(graphic)
+        if index != 0:
+            self._move_graphic(index, index - 1)
+
+
+    def bring_to_front(self, graphic):
+        """Moves a :py:class:`.Graphic` in front of all the others on the
+        canvas.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to move."""
+
+        if not isinstance(graphic, graphics.Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        self._move_graphic(self._separate(graphic), len(self._graphics) - 1)
+
+
+    def send_to_back(self, graphic):
+        """Moves a :py:class:`.Graphic` behind all the others on the canvas.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to move."""
+
+        if not isinstance(graphic, graphics.Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        self._move_graphic(self._separate(graphic), 0)
+
+
+    def move_to_index(self, graphic, index):
+        """Moves a :py:class:`.Graphic` to a particular position in the
+        canvas's list of Graphics, where 0 is the back.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to move.
+        :param int index: The position to move it to.
+        :raises ValueError: if the position is outside the list."""
+
+        if not isinstance(graphic, graphics.Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        if not isinstance(index, int):
+            raise TypeError("index must be int, not '%s'" % index)
+        if not 0 <= index < len(self._graphics):
+            raise ValueError("%i is not a valid position" % index)
+        self._move_graphic(self._separate(graphic), index)
+
+
+    def remove_graphic(self, graphic):
+        """Removes a :py:class:`.Graphic` from the canvas. If it is a row of a
+        batch, the row is taken out of the batch, and the batch is only
+        removed as well if that leaves it empty.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to remove."""
+
+        if not isinstance(graphic, graphics.Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        index = self._index_of(graphic)
+        self._forget_names(graphic)
+        if self._is_row(graphic):
+            batch = graphic._batch
+            batch._remove(graphic)
+            if len(batch):
+                return
+            graphic = batch
+            self._forget_names(graphic)
+        del self._graphics[index]
+        if self._spatial_index is not None\
+         and self._spatial_index.graphics is self._graphics:
+            self._spatial_index.remove(graphic)
+        graphic._parent = None
+
+
+    def _is_row(self, graphic):
+        # Whether a Graphic is a view of a row of one of the canvas's batches.
+        return hasattr(graphic, "_batch") and graphic._parent is graphic._batch\
+         and graphic._batch._parent is self
+
+
+    def _index_of(self, graphic):
+        if not isinstance(self._graphics, DrawingOrder):
+            # A plain list of Graphics has been given to the canvas.
+            self._graphics = DrawingOrder(self._graphics)
+        if self._is_row(graphic):
+            # Rows of batches are drawn where their batch is.
+            graphic = graphic._batch
+        try:
+            return self._graphics.index(graphic)
+        except ValueError:
+            raise ValueError("%s is not a Graphic in %s" % (graphic, self)) from None
+
+
+    def _position_of(self, graphic):
+        # Where a Graphic is drawn, as something which can be sorted by.
+        if self._is_row(graphic):
+            return (self._index_of(graphic), graphic._row)
+        return (self._index_of(graphic), -1)
+
+
+    def _separate(self, graphic):
+        # Splits a row of a batch off into a batch of its own, drawn in the
+        # same place, so that it can be moved separately. Returns the position
+        # of the Graphic to move.
+        index = self._index_of(graphic)
+        if self._is_row(graphic):
+            batch, row = graphic._batch, graphic._row
+            if row + 1 < len(batch):
+                self._insert_graphic(index + 1, batch._split(row + 1))
+            if row:
+                index += 1
+                self._insert_graphic(index, batch._split(row))
+        return index
+
+
+    def _move_graphic(self, index, new_index):
+        graphic = self._graphics[index]
+        self._graphics.move(index, new_index)
+        self._graphic_reordered(graphic)
+
+
+    def graphics_at(self, x, y):
+        """Returns all the :py:class:`.Graphic` objects on the canvas whose
+        bounding boxes contain a given point. Rotation is taken into account.
+
+        The canvas keeps a spatial index of its Graphics for this, so it does
+        not need to check every Graphic to answer. The Graphics are returned in
+        the order they are painted, from back to front. Batches are checked
+        row by row, and the views of the rows which match are returned rather
+        than the batch.
+
+        :param x: The x-coordinate of the point.
+        :param y: The y-coordinate of the point.
+        :returns: ``list`` of :py:class:`.Graphic`"""
+
+        if not isinstance(x, int) and not isinstance(x, float):
+            raise TypeError("x must be numeric, not '%s'" % x)
+        if not isinstance(y, int) and not isinstance(y, float):
+            raise TypeError("y must be numeric, not '%s'" % y)
+        return sorted(
+         self._get_spatial_index().at(x, y), key=self._position_of
+        )
+
+
+    def graphics_in(self, x, y, width, height):
+        """Returns all the :py:class:`.Graphic` objects on the canvas whose
+        bounding boxes overlap a given rectangular region. Rotation is taken
+        into account. The Graphics are returned in the order they are painted,
+        from back to front, and batches are checked row by row as they are by
+        :py:meth:`graphics_at`.
+
+        :param x: The x-coordinate of the region's upper left corner.
+        :param y: The y-coordinate of the region's upper left corner.
+        :param width: The region's width.
+        :param height: The region's height.
+        :returns: ``list`` of :py:class:`.Graphic`"""
+
+        for name, value in (
+         ("x", x), ("y", y), ("width", width), ("height", height)
+        ):
+            if not isinstance(value, int) and not isinstance(value, float):
+                raise TypeError("%s must be numeric, not '%s'" % (name, value))
+        if width < 0 or height < 0:
+            raise ValueError("Region width and height cannot be negative")
+        return sorted(
+         self._get_spatial_index().within(x, y, width, height),
+         key=self._position_of
+        )
+
+
+    def _get_spatial_index(self):
+        # The index is rebuilt if the number of Graphics or the size of the
+        # canvas has changed enough that its cells are the wrong size.
+        cell_size = spatial.choose_cell_size(
+         len(self._graphics), self._width, self._height
+        )
+        if self._spatial_index is None\
+         or self._spatial_index.graphics is not self._graphics\
+         or not 0.5 <= cell_size / self._spatial_index.cell_size() <= 2:
+            for graphic in self._graphics:
+                graphic._parent = self
+            self._spatial_index = spatial.SpatialIndex(
+             self._graphics, cell_size
+            )
+        return self._spatial_index
+
+
+    def _get_name_index(self):
+        if self._name_index is None\
+         or self._name_index_source is not self._graphics:
+            self._name_index = {}
+            for graphic in self._graphics:
+                graphic._parent = self
+                for named in self._named_graphics(graphic):
+                    self._name_index.setdefault(named.name(), []).append(named)
+            self._name_index_source = self._graphics
+        return self._name_index
+
+
+    def _named_graphics(self, graphic):
+        # A Graphic if it has a name, followed by the named rows of a batch.
+        if graphic.name() is not None:
+            yield graphic
+        for row in sorted(getattr(graphic, "_names", ())):
+            yield graphic[row]
+
+
+    def _forget_names(self, graphic):
+        if self._name_index_source is self._graphics:
+            for named in self._named_graphics(graphic):
+                graphics_with_name = self._name_index[named.name()]
+                graphics_with_name.remove(named)
+                if not graphics_with_name:
+                    del self._name_index[named.name()]
+
+
+    def _add_graphic(self, graphic):
+        self._insert_graphic(len(self._graphics), graphic)
+        if self._name_index_source is self._graphics:
+            for named in self._named_graphics(graphic):
+                self._name_index.setdefault(named.name(), []).append(named)
+        return graphic
+
+
+    def _insert_graphic(self, index, graphic):
+        # Graphics inserted part way through the drawing order are batches
+        # split off from others, whose named rows are already indexed.
+        graphic._parent = self
+        self._graphics.insert(index, graphic)
+        if self._spatial_index is not None:
+            self._spatial_index.add(graphic)
+
+
+    def _graphic_reordered(self, graphic):
+        if self._name_index_source is self._graphics:
+            for named in self._named_graphics(graphic):
+                graphics_with_name = self._name_index[named.name()]
+                if len(graphics_with_name) > 1:
+                    graphics_with_name.remove(named)
+                    self._insert_in_order(graphics_with_name, named)
+
+
+    def _insert_in_order(self, graphics_list, graphic):
+        position = self._position_of(graphic)
+        if not graphics_list or self._position_of(graphics_list[-1]) < position:
+            graphics_list.append(graphic)
+            return
+        for index, other in enumerate(graphics_list):
+            if self._position_of(other) > position:
+                graphics_list.insert(index, graphic)
+                break
+        else:
+            graphics_list.append(graphic)
+
+
+    def _graphic_renamed(self, graphic, old_name):
+        if self._name_index_source is self._graphics:
+            if old_name is not None:
+                graphics_with_name = self._name_index[old_name]
+                graphics_with_name.remove(graphic)
+                if not graphics_with_name:
+                    del self._name_index[old_name]
+            self._insert_in_order(
+             self._name_index.setdefault(graphic.name(), []), graphic
             )
 
 
+    def _add_row(self, graphic, batch_class):
+        if not self._columnar or graphic._data:
+            return self._add_graphic(graphic)
+        # Names belong to rows, so they don't keep Graphics out of a batch.
+        style = dict(graphic._style(), name=None)
+        if self._graphics and type(self._graphics[-1]) is batch_class\
+         and self._graphics[-1]._style() == style\
+         and self._graphics[-1]._transform == graphic._transform\
+         and self._graphics[-1]._split_on_restyle\
+         and not self._graphics[-1]._data:
+            batch = self._graphics[-1]
+        else:
+            batch = batch_class([], [], [], [], **style)
+            batch._split_on_restyle = True
+            self._add_graphic(batch)
+        batch._append(graphic)
+        view = batch[-1]
+        if graphic.name() is not None:
+            view.name(graphic.name())
+        return view
+
+
+    def _graphic_moved(self, graphic):
+        if self._spatial_index is not None:
+            self._spatial_index.move(graphic)
+
+
+    def _graphic_restyled(self, graphic):
+        # Nothing on the canvas depends on how a Graphic looks.
+        pass
+
+
     def add_rectangle(self, *args, **kwargs):
         """Adds a :py:class:`.Rectangle` to the canvas.
 
@@ -179,10 +499,20 @@ class Canvas:
         :param tuple rotation: Any rotation to be applied, in the format\
         (x of rotation point, y of rotation point, angle).
         :param dict data: Any data to be associated with the Rectangle.
-        :rtype: :py:class:`.Rectangle`"""
-
-        self._graphics.append(graphics.Rectangle(*args, **kwargs))
-        return self._graphics[-1]
+        :rtype: :py:class:`.Rectangle`
+
+        If the canvas is columnar, the Rectangle is stored as a row of the
+        :py:class:`.RectangleBatch` at the front of the canvas if it has the
+        same styling, or of a new batch if not, and a
+        :py:class:`.RectangleView` of that row is returned. Ovals and Lines are
+        stored the same way. Graphics with data are always stored as separate
+        objects. Views can be renamed, reordered, restyled and removed like any
+        other Graphic - a row which is moved, or whose styling, data or
+        transform is changed, is split off into a batch of its own."""
+
+        return self._add_row(
+         graphics.Rectangle(*args, **kwargs), graphics.RectangleBatch
+        )
 
 
     def add_line(self, *args, **kwargs):
@@ -201,8 +531,9 @@ class Canvas:
         :param dict data: Any data to be associated with the Line.
         :rtype: :py:class:`.Line`"""
 
-        self._graphics.append(graphics.Line(*args, **kwargs))
-        return self._graphics[-1]
+        return self._add_row(
+         graphics.Line(*args, **kwargs), graphics.LineBatch
+        )
 
 
     def add_oval(self, *args, **kwargs):
@@ -224,15 +555,17 @@ class Canvas:
         :param dict data: Any data to be associated with the Oval.
         :rtype: :py:class:`.Oval`"""
 
-        self._graphics.append(graphics.Oval(*args, **kwargs))
-        return self._graphics[-1]
+        return self._add_row(
+         graphics.Oval(*args, **kwargs), graphics.OvalBatch
+        )
 
 
     def add_polygon(self, *args, **kwargs):
         """Adds a :py:class:`.Polygon` to the canvas.
 
         :param \*points: The alternating x and y values of the Polygon's\
-        corners.
+        corners.\
+        These can also be given as a single sequence, such as an ``array``.
         :param str fill_color: The Polygon's interior colour.
         :param opacity: The degree of transparency, from 0 to 1 (0 being\
         invisible).
@@ -245,8 +578,7 @@ class Canvas:
         :param dict data: Any data to be associated with the Polygon.
         :rtype: :py:class:`.Polygon`"""
 
-        self._graphics.append(graphics.Polygon(*args, **kwargs))
-        return self._graphics[-1]
+        return self._add_graphic(graphics.Polygon(*args, **kwargs))
 
 
     def add_text(self, *args, **kwargs):
@@ -272,15 +604,15 @@ class Canvas:
         :param dict data: Any data to be associated with the Text.
         :rtype: :py:class:`.Text`"""
 
-        self._graphics.append(graphics.Text(*args, **kwargs))
-        return self._graphics[-1]
+        return self._add_graphic(graphics.Text(*args, **kwargs))
 
 
     def add_polyline(self, *args, **kwargs):
         """Adds a :py:class:`.Polyline` to the canvas.
 
         :param \*points: The alternating x and y values of the Polyline's\
-        corners.
+        corners.\
+        These can also be given as a single sequence, such as an ``array``.
         :param line_width: The width of the edge of the Polyline in pixels.
         :param str line_style: The pattern of the edges. Acceptable values are\
         ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
@@ -290,17 +622,249 @@ class Canvas:
         :param dict data: Any data to be associated with the Polyline.
         :rtype: :py:class:`.Polyline`"""
 
-        self._graphics.append(graphics.Polyline(*args, **kwargs))
-        return self._graphics[-1]
+        return self._add_graphic(graphics.Polyline(*args, **kwargs))
+
+
+    def add_instance(self, *args, **kwargs):
+        """Adds an :py:class:`.Instance` of another Graphic to the canvas. The
+        template is written to the SVG only once however many Instances of it
+        there are.
+
+        :param Graphic template: The Graphic to copy. It does not need to be\
+        on the canvas itself.
+        :param x: The horizontal distance to shift the template by.
+        :param y: The vertical distance to shift the template by.
+        :param tuple rotation: Any rotation to be applied, in the format\
+        (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with the Instance.
+        :rtype: :py:class:`.Instance`"""
+
+        return self._add_graphic(graphics.Instance(*args, **kwargs))
+
+
+    def add_heatmap(self, *args, **kwargs):
+        """Adds a :py:class:`.Heatmap` to the canvas - a grid of cells coloured
+        by their values, which is drawn with as few elements as possible.
+
+        :param x: The x coordinate of the Heatmap's upper left corner.
+        :param y: The y coordinate of the Heatmap's upper left corner.
+        :param values: The values of the cells, as a sequence of rows, or as\
+        a flat sequence if ``columns`` is given.
+        :param cell_width: The width of each cell. Defaults to 1.
+        :param cell_height: The height of each cell. Defaults to 1.
+        :param colormap: The name of a colormap, or a sequence of colours.
+        :param int columns: The number of columns, if the values are flat.
+        :param minimum: The value to give the first colour of the colormap.
+        :param maximum: The value to give the last colour of the colormap.
+        :param str name: An identifable name for the Graphic.
+        :param tuple rotation: Any rotation to be applied, in the format\
+        (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with the Heatmap.
+        :rtype: :py:class:`.Heatmap`"""
+
+        return self._add_graphic(graphics.Heatmap(*args, **kwargs))
+
+
+    def add_image(self, *args, **kwargs):
+        """Adds an :py:class:`.Image` to the canvas - a PNG, JPEG or GIF file,
+        or a buffer of RGB or RGBA pixels, embedded in the SVG.
+
+        :param x: The x coordinate of the Image's upper left corner.
+        :param y: The y coordinate of the Image's upper left corner.
+        :param source: The image's file path, the bytes of an image file, or\
+        a ``(height, width, channels)`` buffer of pixels such as a NumPy array.
+        :param width: The Image's width. Defaults to that of the image.
+        :param height: The Image's height. Defaults to that of the image.
+        :param opacity: The degree of transparency, from 0 to 1 (0 being\
+        invisible).
+        :param str name: An identifable name for the Graphic.
+        :param tuple rotation: Any rotation to be applied, in the format\
+        (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with the Image.
+        :rtype: :py:class:`.Image`"""
+
+        return self._add_graphic(graphics.Image(*args, **kwargs))
+
+
+    def add_group(self, *args, **kwargs):
+        """Adds a :py:class:`.Group` to the canvas - a collection of Graphics
+        which are moved, transformed and faded together, and drawn as a single
+        ``<g>`` element.
+
+        :param graphics: The Graphics to put in the Group, from back to front.\
+        They must not already be on a canvas.
+        :param opacity: The degree of transparency of the whole Group, from 0\
+        to 1 (0 being invisible).
+        :param str name: An identifable name for the Graphic.
+        :param tuple rotation: Any rotation to be applied, in the format\
+        (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with the Group.
+        :rtype: :py:class:`.Group`"""
 
+        return self._add_graphic(graphics.Group(*args, **kwargs))
 
-    def save(self, path):
-        """Saves the canvas to file as an SVG file.
 
-        :param str path: The location and filename to save to."""
+    def add_rectangles(self, *args, **kwargs):
+        """Adds many :py:class:`.Rectangle` objects with the same styling to the
+        canvas at once, as a single :py:class:`.RectangleBatch`. The
+        coordinates can be any sequences of numbers, including NumPy arrays,
+        and each sequence is checked once rather than value by value.
 
-        with open(path, "w") as f:
-            f.write(self.to_svg())
+        :param xs: The x-coordinates of the Rectangles' upper left corners.
+        :param ys: The y-coordinates of the Rectangles' upper left corners.
+        :param widths: The Rectangles' widths.
+        :param heights: The Rectangles' heights.
+        :param str fill_color: The Rectangles' interior colour.
+        :param opacity: The degree of transparency, from 0 to 1 (0 being\
+        invisible).
+        :param line_width: The width of the edges of the Rectangles in pixels.
+        :param str line_style: The pattern of the edges. Acceptable values are\
+        ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
+        :param str line_color: The colour of the edges.
+        :param tuple rotation: Any rotation to be applied to each Rectangle, in\
+        the format (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with each Rectangle.
+        :rtype: :py:class:`.RectangleBatch`"""
+
+        return self._add_graphic(graphics.RectangleBatch(*args, **kwargs))
+
+
+    def add_lines(self, *args, **kwargs):
+        """Adds many :py:class:`.Line` objects with the same styling to the
+        canvas at once, as a single :py:class:`.LineBatch`. The coordinates can
+        be any sequences of numbers, including NumPy arrays, and each sequence
+        is checked once rather than value by value.
+
+        :param x1s: The x-coordinates of the Lines' start points.
+        :param y1s: The y-coordinates of the Lines' start points.
+        :param x2s: The x-coordinates of the Lines' end points.
+        :param y2s: The y-coordinates of the Lines' end points.
+        :param line_width: The width of the Lines in pixels.
+        :param str line_style: The pattern of the Lines. Acceptable values are\
+        ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
+        :param str line_color: The colour of the Lines.
+        :param tuple rotation: Any rotation to be applied to each Line, in the\
+        format (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with each Line.
+        :rtype: :py:class:`.LineBatch`"""
+
+        return self._add_graphic(graphics.LineBatch(*args, **kwargs))
+
+
+    def add_ovals(self, *args, **kwargs):
+        """Adds many :py:class:`.Oval` objects with the same styling to the
+        canvas at once, as a single :py:class:`.OvalBatch`. The coordinates can
+        be any sequences of numbers, including NumPy arrays, and each sequence
+        is checked once rather than value by value.
+
+        :param xs: The x-coordinates of the Ovals' bounding rectangle upper left\
+        corners.
+        :param ys: The y-coordinates of the Ovals' bounding rectangle upper left\
+        corners.
+        :param widths: The bounding rectangles' widths.
+        :param heights: The bounding rectangles' heights.
+        :param str fill_color: The Ovals' interior colour.
+        :param opacity: The degree of transparency, from 0 to 1 (0 being\
+        invisible).
+        :param line_width: The width of the edges of the Ovals in pixels.
+        :param str line_style: The pattern of the edges. Acceptable values are\
+        ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
+        :param str line_color: The colour of the edges.
+        :param tuple rotation: Any rotation to be applied to each Oval, in the\
+        format (x of rotation point, y of rotation point, angle).
+        :param dict data: Any data to be associated with each Oval.
+        :rtype: :py:class:`.OvalBatch`"""
+
+        return self._add_graphic(graphics.OvalBatch(*args, **kwargs))
+
+
+    def save(self, path, compress=None, **options):
+        """Saves the canvas to file as an SVG file. The SVG is streamed to the
+        file as it is generated, rather than being built in memory first.
+
+        If the file is compressed, the SVG is gzipped as it is streamed, giving
+        an SVGZ file which browsers and editors can open directly. By default
+        this happens when the path ends in ``.svgz``.
+
+        :param str path: The location and filename to save to.
+        :param bool compress: Whether to gzip the file. If not given, the file\
+        will be compressed if its name ends in ``.svgz``.
+        :param \**options: Any of the output options of :py:meth:`to_svg`."""
+
+        if compress is None:
+            compress = str(path).lower().endswith(".svgz")
+        if not isinstance(compress, bool):
+            raise TypeError("compress must be bool, not '%s'" % compress)
+        pieces = self.iter_svg(**options)
+        if compress:
+            with gzip.open(path, "wb") as f:
+                svg.write_canvas_svg(pieces, f, 65536)
+        else:
+            with open(path, "w") as f:
+                svg.write_canvas_svg(pieces, f, 65536)
+
+
+    def write_svg(self, fileobj, chunk_size=65536, **options):
+        """Writes the SVG text of the canvas to a file-like object, a piece at a
+        time, so that the whole document never has to be held in memory.
+
+        Text streams (such as files opened in text mode or ``io.StringIO``)
+        are written ``str`` - anything else (binary files, ``io.BytesIO``,
+        sockets etc.) is written UTF-8 encoded ``bytes``. Objects without a
+        ``write`` method will be written to with ``sendall``.
+
+        :param fileobj: The object to write to.
+        :param int chunk_size: The approximate number of characters to buffer\
+        before each write.
+        :param \**options: Any of the output options of :py:meth:`to_svg`.
+        :raises ValueError: if the chunk size is not positive."""
+
+        if not isinstance(chunk_size, int):
+            raise TypeError("chunk_size must be int, not '%s'" % chunk_size)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive, not %i" % chunk_size)
+        svg.write_canvas_svg(self.iter_svg(**options), fileobj, chunk_size)
+
+
+    def render_tiles(self, tile_size, zoom_levels, out_dir, rasters=False,
+     **options):
+        """Renders the canvas as a pyramid of square SVG tiles, of the kind used
+        by slippy maps, so that canvases far too large to open as one document
+        can be viewed a piece at a time.
+
+        The tiles of each zoom level are saved as ``out_dir/zoom/x/y.svg``.
+        The last zoom level is at the canvas's full size, and each level
+        before it is half the size of the one after it, so that level 0 is
+        the most zoomed out. Each tile only contains the Graphics whose
+        bounding boxes overlap it, and tiles which no Graphics overlap are not
+        saved at all. The Graphics are sorted into tiles with a single pass
+        over the canvas per zoom level, and the rows of batches are sorted
+        individually. A ``tolerance`` is measured in the pixels of the tiles,
+        so Polylines and Polygons are simplified further at each level out.
+
+        :param int tile_size: The width and height of each tile in pixels.
+        :param int zoom_levels: The number of zoom levels.
+        :param str out_dir: The directory to save the tiles in.
+        :param bool rasters: If ``True``, a PNG version of each tile (see\
+        :py:meth:`to_png`) will be saved alongside it.
+        :param \**options: Any of the output options of :py:meth:`to_svg`.
+        :raises ValueError: if the tile size or number of zoom levels is not\
+        positive.
+        :returns: The number of tiles saved, as an ``int``."""
+
+        if not isinstance(tile_size, int):
+            raise TypeError("tile_size must be int, not '%s'" % tile_size)
+        if tile_size < 1:
+            raise ValueError("tile_size must be positive, not %i" % tile_size)
+        if not isinstance(zoom_levels, int):
+            raise TypeError("zoom_levels must be int, not '%s'" % zoom_levels)
+        if zoom_levels < 1:
+            raise ValueError("zoom_levels must be positive, not %i" % zoom_levels)
+        if not isinstance(rasters, bool):
+            raise TypeError("rasters must be bool, not '%s'" % rasters)
+        return tiles.render_canvas_tiles(
+         self, tile_size, zoom_levels, out_dir, rasters, options
+        )
 
 
     to_svg = svg.generate_canvas_svg
@@ -309,4 +873,73 @@ class Canvas:
     Any ``data`` attributes of the Graphics contained will be rendered as SVG
     attributes.
 
+    By default every element carries its own ``style`` attribute. If
+    ``css_classes`` is ``True``, each distinct style is instead written once,
+    as a class in a ``<style>`` block at the top of the document, and elements
+    refer to it with ``class="s0"``, ``class="s1"`` and so on. Canvases where
+    many Graphics share the same styling produce much smaller files this way.
+
+    Numbers are written to one decimal place unless another ``precision`` is
+    given. If ``minify`` is ``True``, the output is made as small as possible
+    for sending over a network: trailing zeros are stripped from numbers
+    (``10`` rather than ``10.0``), points are separated by single spaces,
+    colours use their three digit forms where they have them, styling which
+    makes no difference to how the SVG looks (such as a black fill, or the
+    stroke of an edge with no width) is left out, and there is no XML
+    declaration or comment. The default output of each Graphic is cached,
+    but other precisions and minified output are generated afresh each time.
+
+    If a ``viewport`` is given, the SVG will only show that region of the
+    canvas - it will be the size of the region, with a ``viewBox`` covering
+    it, and only Graphics whose bounding boxes (rotation included) overlap the
+    region will be written. These are found with the canvas's spatial index
+    rather than by checking every Graphic, and rows of batches which fall
+    outside the region are left out too.
+
+    If a ``tolerance`` is given, Polylines and Polygons are written with only
+    as many vertices as are needed to keep within that distance of their
+    paths (see :py:meth:`.Polyline.simplify`). The Graphics themselves are
+    not changed.
+
+    :param bool css_classes: If ``True``, styles will be written as CSS\
+    classes.
+    :param int precision: The number of decimal places to give numbers to.
+    :param bool minify: If ``True``, the output will be minified.
+    :param tuple viewport: The ``(x, y, width, height)`` region of the canvas\
+    to show, if not all of it.
+    :param tolerance: How far the paths of Polylines and Polygons can be\
+    simplified by.
+    :raises ValueError: if the precision or tolerance is negative, or the\
+    viewport has no area.
     :rtype: ``str``"""
+
+
+    iter_svg = svg.iterate_canvas_svg
+    """Returns a generator which yields the SVG text of the canvas piece by
+    piece. Joining the pieces together gives the same text as
+    :py:meth:`to_svg`.
+
+    :param bool css_classes: If ``True``, styles will be written as CSS\
+    classes.
+    :param int precision: The number of decimal places to give numbers to.
+    :param bool minify: If ``True``, the output will be minified.
+    :param tuple viewport: The ``(x, y, width, height)`` region of the canvas\
+    to show, if not all of it.
+    :param tolerance: How far the paths of Polylines and Polygons can be\
+    simplified by.
+    :rtype: ``generator``"""
+
+
+    to_png = raster.generate_canvas_png
+    """Returns the canvas as a PNG image, painted without needing a browser or
+    any other software.
+
+    Rectangles, Ovals, Lines, Polygons and Polylines (along with any batches
+    and Instances of them) are painted with their line widths, line styles,
+    opacities and rotations. Text is not painted, and shapes are not
+    anti-aliased, so this is best suited to thumbnails and previews.
+
+    :param scale: The size of the image relative to the canvas - ``0.25``\
+    will give an image a quarter of the canvas's width and height.
+    :raises ValueError: if the scale is not positive.
+    :rtype: ``bytes``"""
@@ -2,20 +2,46 @@
 mainly for validation pruposes currently."""
 
 import colorsys
+import re
+import sys
+from array import array
+from functools import lru_cache
+from itertools import chain, repeat
+from operator import add, mul, sub
+
+hex_color = re.compile(r"#[0-9A-Fa-f]{6}")
 
 def process_color(color):
-    """Raises exceptions if a colour does not meet requirements.
+    """Raises exceptions if a colour does not meet requirements. Valid colours
+    are returned in upper case.
+
+    The same few colours tend to be used over and over, so the result for
+    each colour is remembered and repeated colours are only checked once. The
+    strings returned are interned, so Graphics which share a colour also
+    share the string.
 
     :param str color: The colour to check.
     :raises TypeError: if the colour is not a string.
-    :raises ValueError: if the colour is not valid."""
+    :raises ValueError: if the colour is not valid.
+    :rtype: ``str``"""
 
     if not isinstance(color, str):
         raise TypeError("Color must be str, not '%s'" % color)
-    elif not is_valid_color(color):
+    return normalize_color(color)
+
+
+@lru_cache(maxsize=1024)
+def normalize_color(color):
+    """Checks that a string is a valid colour, and returns it in upper case.
+    The most recently used colours are cached.
+
+    :param str color: The colour to check.
+    :raises ValueError: if the colour is not valid.
+    :rtype: ``str``"""
+
+    if not is_valid_color(color):
         raise ValueError("'%s' is not a valid color" % color)
-    else:
-        return color.upper()
+    return sys.intern(color.upper())
 
 
 def is_valid_color(color):
@@ -24,16 +50,7 @@ def is_valid_color(color):
     :param str color: The color to check.
     :rtype: ``bool``"""
 
-    if not color:
-        return False
-    if color[0] != "#":
-        return False
-    if len(color) != 7:
-        return False
-    for char in color[1:]:
-        if char.upper() not in "0123456789ABCDEF":
-            return False
-    return True
+    return hex_color.fullmatch(color) is not None
 
 
 def hsl_to_rgb(hue, saturation, lightness):
@@ -85,3 +102,211 @@ colors = [
  BLACK
 ]
 """Color constants"""
+
+
+hex_pairs = ["%02X" % value for value in range(256)]
+sample_size = 4096
+
+colormaps = {
+ "greys": ("#000000", "#FFFFFF"),
+ "heat": ("#000000", "#FF0000", "#FFFF00", "#FFFFFF"),
+ "viridis": ("#440154", "#3B528B", "#21918C", "#5EC962", "#FDE725"),
+ "cool_warm": (BLUE, "#FFFFFF", RED),
+ "rainbow": (RED, ORANGE, YELLOW, GREEN, BLUE, PURPLE),
+}
+"""The colours which the named colormaps run through, from lowest to
+highest."""
+
+def hsl_to_rgb_many(hues, saturations, lightnesses):
+    """Converts whole columns of colours in HSL format to RGB strings in the
+    form #RRGGBB, giving the same results as :py:func:`.hsl_to_rgb` much more
+    quickly. Each column is checked in one go, and each distinct colour is
+    only converted once.
+
+    :param hues: The Hue values (between 0 and 360).
+    :param saturations: The Saturation values (between 0 and 100).
+    :param lightnesses: The Lightness values (between 0 and 100).
+    :raises TypeError: if any of the values are not numeric.
+    :raises ValueError: if any of the values are outside their bounds, or the\
+    columns are of different lengths.
+    :rtype: ``list``"""
+
+    hues = process_channel(hues, "hue", 360)
+    saturations = process_channel(saturations, "saturation", 100)
+    lightnesses = process_channel(lightnesses, "lightness", 100)
+    if not len(hues) == len(saturations) == len(lightnesses):
+        raise ValueError("There must be as many saturations and lightnesses as hues")
+    sample = set(zip(
+     hues[:sample_size], saturations[:sample_size], lightnesses[:sample_size]
+    ))
+    if len(sample) * 2 < min(len(hues), sample_size) and all(
+     map(float.is_integer, chain(hues, saturations, lightnesses))
+    ):
+        # The first few colours suggest there will be many repeats. Whole
+        # number colours can each be identified by a single number, so the
+        # repeats are quick to find and each colour is only converted once.
+        keys = list(map(add, map(mul, map(add, map(
+         mul, hues, repeat(101)
+        ), saturations), repeat(101)), lightnesses))
+        first_rows = dict(zip(keys, range(len(keys))))
+        converted = dict(zip(first_rows, map(hsl_to_hex, *[
+         map(column.__getitem__, first_rows.values())
+         for column in (hues, saturations, lightnesses)
+        ])))
+        return list(map(converted.__getitem__, keys))
+    return list(map(hsl_to_hex, hues, saturations, lightnesses))
+
+
+def hsl_to_hex(hue, saturation, lightness):
+    """Converts a colour in HSL format to an RGB string in the form #RRGGBB,
+    without checking it first.
+
+    :param hue: The Hue value (between 0 and 360).
+    :param saturation: The Saturation value (between 0 and 100).
+    :param lightness: The Lightness value (between 0 and 100).
+    :rtype: ``str``"""
+
+    r, g, b = colorsys.hls_to_rgb(hue / 360, lightness / 100, saturation / 100)
+    return "#%s%s%s" % (
+     hex_pairs[int(r * 255)], hex_pairs[int(g * 255)], hex_pairs[int(b * 255)]
+    )
+
+
+def rgb_to_hex_many(reds, greens, blues):
+    """Converts whole columns of red, green and blue values to RGB strings in
+    the form #RRGGBB.
+
+    :param reds: The red values, as ints between 0 and 255.
+    :param greens: The green values, as ints between 0 and 255.
+    :param blues: The blue values, as ints between 0 and 255.
+    :raises TypeError: if any of the values are not ints.
+    :raises ValueError: if any of the values are outside 0 to 255, or the\
+    columns are of different lengths.
+    :rtype: ``list``"""
+
+    channels = []
+    for values, name in ((reds, "red"), (greens, "green"), (blues, "blue")):
+        try:
+            channels.append(array("B", values))
+        except TypeError:
+            raise TypeError(
+             "%s values must be ints, not '%s'" % (name, values)
+            ) from None
+        except OverflowError:
+            raise ValueError(
+             "%s values must be between 0 and 255" % name
+            ) from None
+    if not len(channels[0]) == len(channels[1]) == len(channels[2]):
+        raise ValueError("There must be as many greens and blues as reds")
+    return list(map("#{}{}{}".format, *[
+     map(hex_pairs.__getitem__, channel) for channel in channels
+    ]))
+
+
+def gradient(*stops, steps=256):
+    """Creates a linear ramp of colours which runs evenly through two or more
+    colours - ``gradient(RED, BLUE, steps=5)`` gives five colours running
+    from red to blue, for example.
+
+    :param \*stops: The colours to run through, in order.
+    :param int steps: The number of colours to create.
+    :raises ValueError: if fewer than two colours or steps are given.
+    :rtype: ``list``"""
+
+    if len(stops) < 2:
+        raise ValueError("Gradients need at least two colours")
+    if not isinstance(steps, int):
+        raise TypeError("steps must be int, not '%s'" % steps)
+    if steps < 2:
+        raise ValueError("Gradients need at least two steps, not %i" % steps)
+    stops = [process_color(stop) for stop in stops]
+    stops = [[int(stop[i:i + 2], 16) for i in (1, 3, 5)] for stop in stops]
+    channels = [[], [], []]
+    last_segment = len(stops) - 2
+    scale = (len(stops) - 1) / (steps - 1)
+    for step in range(steps):
+        position = step * scale
+        segment = min(int(position), last_segment)
+        fraction = position - segment
+        start, end = stops[segment], stops[segment + 1]
+        for channel, low, high in zip(channels, start, end):
+            channel.append(round(low + (high - low) * fraction))
+    return rgb_to_hex_many(*channels)
+
+
+@lru_cache(maxsize=None)
+def get_colormap(name):
+    """Returns the lookup table of a named colormap from
+    :py:data:`colormaps` - a ``tuple`` of 256 colours running from its lowest
+    to its highest. Each table is only worked out once.
+
+    :param str name: The name of the colormap.
+    :raises ValueError: if there is no colormap with that name.
+    :rtype: ``tuple``"""
+
+    if name not in colormaps:
+        raise ValueError("There is no colormap called '%s'" % name)
+    return tuple(gradient(*colormaps[name]))
+
+
+def apply_colormap(values, colormap="viridis", minimum=None, maximum=None):
+    """Converts a whole column of numbers to colours using a colormap, as is
+    needed for heatmaps. The numbers are scaled so that the minimum gets the
+    first colour of the colormap, and the maximum gets the last.
+
+    :param values: The numbers to convert.
+    :param colormap: The name of a colormap in :py:data:`colormaps`, or a\
+    sequence of colours such as one made by :py:func:`gradient`.
+    :param minimum: The number to give the first colour. By default this is\
+    the smallest of the values, and smaller values get the first colour.
+    :param maximum: The number to give the last colour. By default this is\
+    the largest of the values, and larger values get the last colour.
+    :raises TypeError: if any of the values are not numeric.
+    :rtype: ``list``"""
+
+    table = get_colormap(colormap) if isinstance(colormap, str) else colormap
+    if not table:
+        raise ValueError("Colormaps must have at least one colour")
+    try:
+        values = array("d", values)
+    except TypeError:
+        raise TypeError(
+         "Colormap values must be numeric, not '%s'" % values
+        ) from None
+    if not values:
+        return []
+    if minimum is None:
+        minimum = min(values)
+    if maximum is None:
+        maximum = max(values)
+    last = len(table) - 1
+    scale = last / (maximum - minimum) if maximum > minimum else 0
+    indices = map(int, map(
+     mul, map(sub, values, repeat(minimum)), repeat(scale)
+    ))
+    indices = map(min, map(max, indices, repeat(0)), repeat(last))
+    return list(map(table.__getitem__, indices))
+
+
+def process_channel(values, name, maximum):
+    """Turns a column of colour values into an ``array`` of floats, checking
+    that they are all between 0 and a maximum.
+
+    :param values: The values.
+    :param str name: The name of the values, for error messages.
+    :param maximum: The largest value allowed.
+    :raises TypeError: if any of the values are not numeric.
+    :raises ValueError: if any of the values are out of bounds.
+    :rtype: ``array``"""
+
+    try:
+        values = array("d", values)
+    except TypeError:
+        raise TypeError(
+         "%s values must be numeric, not '%s'" % (name, values)
+        ) from None
+    if values and not (0 <= min(values) and max(values) <= maximum):
+        raise ValueError(
+         "%s values must be between 0 and %s" % (name, maximum)
+        )
+    return values
@@ -1,11 +1,89 @@
 """This module contains the various Graphics objects which can be painted to
 the canvas."""
 
-from .color import process_color
+import math
+import mmap
+import operator
+import os
+import struct
+import weakref
+from array import array
+from itertools import compress, count, islice
+from .color import process_color, apply_colormap, colormaps
 from .exceptions import GeometryError
 from . import svg
+from . import raster
+from .simplify import simplify_coordinates
+from .transforms import IDENTITY, process_transform, combine_transforms
+from .transforms import graphic_transform, transform_coordinates
+from .transforms import apply_transform, rotation_transform
+from .transforms import translation_transform, scale_transform, skew_transform
 
 ALLOWED_LINESTYLES = ("-", "--", "..")
+TEXT_WIDTH_RATIO = 0.6
+
+class GraphicData(dict):
+    """The ``dict`` in which a :py:class:`.Graphic` keeps its data. It behaves
+    exactly like a normal ``dict``, but lets the Graphic know whenever it is
+    modified so that its cached SVG can be discarded.
+
+    :param Graphic graphic: The Graphic the data belongs to.
+    :param dict data: The initial contents."""
+
+    __slots__ = ("_graphic",)
+
+    def __init__(self, graphic, data):
+        dict.__init__(self, data)
+        self._graphic = graphic
+
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._graphic._invalidate()
+
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._graphic._invalidate()
+
+
+    def clear(self):
+        dict.clear(self)
+        self._graphic._invalidate()
+
+
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self._graphic._invalidate()
+        return value
+
+
+    def popitem(self):
+        item = dict.popitem(self)
+        self._graphic._invalidate()
+        return item
+
+
+    def setdefault(self, key, default=None):
+        value = dict.setdefault(self, key, default)
+        self._graphic._invalidate()
+        return value
+
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._graphic._invalidate()
+
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+
+    def __reduce__(self):
+        return (GraphicData, (self._graphic, dict(self)))
+
+
 
 class Graphic:
     """The base class of all Graphics - it would not orindarily need to be
@@ -23,6 +101,11 @@ class Graphic:
     (x of rotation point, y of rotation point, angle), in degrees.
     :param dict data: Any data to be associated with the Graphic."""
 
+    __slots__ = (
+     "_name", "_line_width", "_line_style", "_line_color", "_rotation",
+     "_transform", "_data", "_svg", "_bounds", "_parent", "_instances"
+    )
+
     def __init__(self, name=None, line_width=1, line_style="-",
     line_color="#000000", rotation=(0, 0, 0), data=None):
         if not isinstance(name, str) and name is not None:
@@ -55,10 +138,42 @@ class Graphic:
              "Rotation must be between 0 and 360, not %s" % str(rotation[2])
             )
         self._rotation = rotation
+        self._transform = IDENTITY
 
         if data is not None and not isinstance(data, dict):
             raise TypeError("Data must be dict, not '%s'" % data)
-        self._data = data if data is not None else {}
+        self._data = GraphicData(self, data if data is not None else {})
+
+        self._svg = None
+        self._bounds = None
+        self._parent = None
+        self._instances = None
+
+
+    def __getstate__(self):
+        # Cached values are left out, as is the parent, which will re-adopt the
+        # Graphic if it is pickled along with it, and any Instances of it,
+        # which will register with it again.
+        state = {slot: getattr(self, slot) for cls in type(self).__mro__
+         for slot in cls.__dict__.get("__slots__", ()) if slot not in (
+          "_svg", "_bounds", "_parent", "_instances", "_views", "__weakref__"
+         ) and hasattr(self, slot)}
+        state.update(getattr(self, "__dict__", {}))
+        return state
+
+
+    def __setstate__(self, state):
+        self._svg = self._bounds = self._parent = None
+        if not hasattr(self, "_instances"):
+            # An Instance of the Graphic may already have registered with it.
+            self._instances = None
+        for slot, value in state.items():
+            setattr(self, slot, value)
+        data = state.get("_data")
+        if isinstance(data, GraphicData) and data._graphic is not self:
+            # A copy of the Graphic gets data of its own, which will tell it,
+            # rather than the original, when it changes.
+            self._data = GraphicData(self, data)
 
 
     def name(self, name=None):
@@ -72,7 +187,9 @@ class Graphic:
         else:
             if not isinstance(name, str):
                 raise TypeError("name must be str, not '%s'" % name)
-            self._name = name
+            old_name, self._name = self._name, name
+            if self._parent is not None:
+                self._parent._graphic_renamed(self, old_name)
 
 
     def line_width(self, line_width=None):
@@ -92,6 +209,7 @@ class Graphic:
                  "line_width must be numeric, not '%s'" % line_width
                 )
             self._line_width = line_width
+            self._invalidate(geometry=True)
 
 
     def line_style(self, line_style=None):
@@ -111,6 +229,7 @@ class Graphic:
             if line_style not in ALLOWED_LINESTYLES:
                 raise ValueError("'%s' is not a valid line style" % line_style)
             self._line_style = line_style
+            self._invalidate()
 
 
     def line_color(self, line_color=None):
@@ -125,6 +244,7 @@ class Graphic:
             return self._line_color
         else:
             self._line_color = process_color(line_color)
+            self._invalidate()
 
 
     def rotation(self):
@@ -145,7 +265,7 @@ class Graphic:
         again by 100° about the same point, the end result will just be a
         rotation of 100° around that point, *not* 130°. This is because the
         method just sets the Graphic's ``rotation`` property to whatever is
-        given.
+        given. Use :py:meth:`rotate_by` for rotations which do sum.
 
         :param str x_pivot: The x value of the pivot point.
         :param str y_pivot: The y value of the pivot point.
@@ -161,6 +281,123 @@ class Graphic:
              "Rotation must be between 0 and 360, not %s" % str(rotation[2])
             )
         self._rotation = rotation
+        self._invalidate(geometry=True)
+
+
+    def transform(self, transform=None):
+        """The affine transform applied to the Graphic after its rotation. It
+        takes the form of a six number tuple - ``(a, b, c, d, e, f)`` - which
+        moves each point (x, y) to (ax + cy + e, bx + dy + f), as SVG's
+        ``matrix()`` does. Passing a value will replace the transform.
+
+        Unlike the rotation, the transform can be built up step by step with
+        :py:meth:`translate`, :py:meth:`scale`, :py:meth:`skew` and
+        :py:meth:`rotate_by`, each of which is applied after what is already
+        there.
+
+        :param tuple transform: If given, the Graphic's transform will be set\
+        to this.
+        :raises TypeError: if the transform is not a tuple of numbers.
+        :raises ValueError: if the transform is not of length 6.
+        :rtype: ``tuple``"""
+
+        if transform is None:
+            return self._transform
+        else:
+            self._transform = process_transform(transform)
+            self._invalidate(geometry=True)
+
+
+    def matrix(self):
+        """Returns the single affine transform which applies the Graphic's
+        rotation and then its transform, in the form ``(a, b, c, d, e, f)``.
+        Matrices are compiled once and cached, so Graphics which share a
+        rotation and transform share a matrix.
+
+        :rtype: ``tuple``"""
+
+        return graphic_transform(self._rotation, self._transform)
+
+
+    def apply_transform(self, transform):
+        """Adds an affine transform to the Graphic, to be applied after its
+        current transform.
+
+        :param tuple transform: The ``(a, b, c, d, e, f)`` transform to add.
+        :raises TypeError: if the transform is not a tuple of numbers.
+        :raises ValueError: if the transform is not of length 6."""
+
+        self.transform(combine_transforms(
+         self._transform, process_transform(transform)
+        ))
+
+
+    def translate(self, x_offset, y_offset):
+        """Moves the Graphic by adding a translation to its transform.
+
+        :param x_offset: The distance to move the Graphic to the right.
+        :param y_offset: The distance to move the Graphic down."""
+
+        for value in (x_offset, y_offset):
+            if not isinstance(value, int) and not isinstance(value, float):
+                raise TypeError(
+                 "Translation values must be numeric, not '%s'" % value
+                )
+        self.apply_transform(translation_transform(x_offset, y_offset))
+
+
+    def scale(self, x_scale, y_scale=None, x_origin=0, y_origin=0):
+        """Stretches the Graphic by adding a scaling to its transform.
+
+        :param x_scale: The factor to stretch the Graphic by horizontally.
+        :param y_scale: The factor to stretch the Graphic by vertically - by\
+        default the same as ``x_scale``.
+        :param x_origin: The x value of the point to scale about.
+        :param y_origin: The y value of the point to scale about."""
+
+        if y_scale is None:
+            y_scale = x_scale
+        for value in (x_scale, y_scale, x_origin, y_origin):
+            if not isinstance(value, int) and not isinstance(value, float):
+                raise TypeError(
+                 "Scale values must be numeric, not '%s'" % value
+                )
+        self.apply_transform(
+         scale_transform(x_scale, y_scale, x_origin, y_origin)
+        )
+
+
+    def skew(self, x_angle, y_angle=0, x_origin=0, y_origin=0):
+        """Shears the Graphic by adding a skew to its transform.
+
+        :param x_angle: The angle to slant vertical lines by, in degrees.
+        :param y_angle: The angle to slant horizontal lines by, in degrees.
+        :param x_origin: The x value of the point to skew about.
+        :param y_origin: The y value of the point to skew about."""
+
+        for value in (x_angle, y_angle, x_origin, y_origin):
+            if not isinstance(value, int) and not isinstance(value, float):
+                raise TypeError(
+                 "Skew values must be numeric, not '%s'" % value
+                )
+        self.apply_transform(
+         skew_transform(x_angle, y_angle, x_origin, y_origin)
+        )
+
+
+    def rotate_by(self, x_pivot, y_pivot, angle):
+        """Rotates the Graphic about a point by adding a rotation to its
+        transform. Unlike :py:meth:`rotate`, repeated rotations sum, and the
+        angle can be any number of degrees.
+
+        :param x_pivot: The x value of the pivot point.
+        :param y_pivot: The y value of the pivot point.
+        :param angle: The (clockwise) angle of rotation, in degrees."""
+
+        for value in (x_pivot, y_pivot, angle):
+            if not isinstance(value, int) and not isinstance(value, float):
+                raise TypeError("Rotation values must be numeric, not '%s'" % value)
+        self.apply_transform(rotation_transform((x_pivot, y_pivot, angle)))
 
 
     def data(self):
@@ -176,6 +413,75 @@ class Graphic:
         return self._data
 
 
+    def to_svg(self):
+        """Returns the SVG text of the Graphic.
+
+        The text is generated the first time it is asked for and then kept
+        until one of the Graphic's properties changes, so Graphics which don't
+        change between renders don't need to be serialised again.
+
+        :rtype: ``str``"""
+
+        text = self._svg
+        if text is None:
+            text = self._svg = self._generate_svg()
+        return text
+
+
+    def bounding_box(self):
+        """Returns the smallest upright box which contains the Graphic, taking
+        its rotation and the width of its edge into account, in the form
+        ``(x, y, width, height)``.
+
+        The box is calculated the first time it is asked for and then kept
+        until the Graphic's geometry changes.
+
+        :rtype: ``tuple``"""
+
+        min_x, min_y, max_x, max_y = self._get_bounds()
+        return (min_x, min_y, max_x - min_x, max_y - min_y)
+
+
+    def _get_bounds(self):
+        bounds = self._bounds
+        if bounds is None:
+            min_x, min_y, max_x, max_y = self._extents()
+            padding = self._line_width / 2
+            min_x, min_y = min_x - padding, min_y - padding
+            max_x, max_y = max_x + padding, max_y + padding
+            matrix = self.matrix()
+            if matrix != IDENTITY:
+                xs, ys = zip(*apply_transform(matrix, (
+                 (min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y)
+                )))
+                min_x, min_y, max_x, max_y = min(xs), min(ys), max(xs), max(ys)
+            bounds = self._bounds = (min_x, min_y, max_x, max_y)
+        return bounds
+
+
+    def _invalidate(self, geometry=False):
+        self._svg = None
+        if geometry:
+            self._bounds = None
+            if self._parent is not None:
+                self._parent._graphic_moved(self)
+        elif self._parent is not None:
+            self._parent._graphic_restyled(self)
+        if self._instances:
+            # Instances refer to their template by an ID made from its SVG,
+            # and take their bounds from it.
+            for instance in list(self._instances):
+                instance._invalidate(geometry=geometry)
+
+
+    def _style(self):
+        return {
+         "name": self._name, "line_width": self._line_width,
+         "line_style": self._line_style, "line_color": self._line_color,
+         "rotation": self._rotation
+        }
+
+
     graphic_svg = svg.generate_graphic_svg
     rotation_svg = svg.generate_rotation_svg
     data_svg = svg.generate_data_svg
@@ -203,6 +509,8 @@ class ShapeGraphic(Graphic):
     (x of rotation point, y of rotation point, angle), in degrees.
     :param dict data: Any data to be associated with the Graphic."""
 
+    __slots__ = ("_fill_color", "_opacity")
+
     def __init__(self, *args, fill_color="#FFFFFF", opacity=1, **kwargs):
         Graphic.__init__(self, *args, **kwargs)
 
@@ -229,6 +537,7 @@ class ShapeGraphic(Graphic):
             return self._fill_color
         else:
             self._fill_color = process_color(fill_color)
+            self._invalidate()
 
 
     def opacity(self, opacity=None):
@@ -249,6 +558,14 @@ class ShapeGraphic(Graphic):
                  "opacity must be between 0 and 1, not %s" % (str(opacity))
                 )
             self._opacity = opacity
+            self._invalidate()
+
+
+    def _style(self):
+        style = Graphic._style(self)
+        style["fill_color"] = self._fill_color
+        style["opacity"] = self._opacity
+        return style
 
 
     shape_svg = svg.generate_shape_svg
@@ -278,6 +595,8 @@ class BoxGraphic(ShapeGraphic):
     (x of rotation point, y of rotation point, angle), in degrees.
     :param dict data: Any data to be associated with the Box."""
 
+    __slots__ = ("_x", "_y", "_width", "_height")
+
     def __init__(self, x, y, width, height, *args, **kwargs):
         ShapeGraphic.__init__(self, *args, **kwargs)
 
@@ -311,6 +630,7 @@ class BoxGraphic(ShapeGraphic):
             if not isinstance(x, int) and not isinstance(x, float):
                 raise TypeError("x must be numeric, not '%s'" % x)
             self._x = x
+            self._invalidate(geometry=True)
 
 
     def y(self, y=None):
@@ -326,6 +646,7 @@ class BoxGraphic(ShapeGraphic):
             if not isinstance(y, int) and not isinstance(y, float):
                 raise TypeError("y must be numeric, not '%s'" % y)
             self._y = y
+            self._invalidate(geometry=True)
 
 
     def width(self, width=None):
@@ -340,6 +661,7 @@ class BoxGraphic(ShapeGraphic):
             if not isinstance(width, int) and not isinstance(width, float):
                 raise TypeError("width must be numeric, not '%s'" % width)
             self._width = width
+            self._invalidate(geometry=True)
 
 
     def height(self, height=None):
@@ -354,6 +676,7 @@ class BoxGraphic(ShapeGraphic):
             if not isinstance(height, int) and not isinstance(height, float):
                 raise TypeError("height must be numeric, not '%s'" % height)
             self._height = height
+            self._invalidate(geometry=True)
 
 
     def center(self):
@@ -367,6 +690,15 @@ class BoxGraphic(ShapeGraphic):
         )
 
 
+    def _extents(self):
+        return (
+         min(self._x, self._x + self._width),
+         min(self._y, self._y + self._height),
+         max(self._x, self._x + self._width),
+         max(self._y, self._y + self._height)
+        )
+
+
 
 class Rectangle(BoxGraphic):
     """Base class: :py:class:`BoxGraphic`
@@ -389,6 +721,8 @@ class Rectangle(BoxGraphic):
     (x of rotation point, y of rotation point, angle).
     :param dict data: Any data to be associated with the Shape."""
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         BoxGraphic.__init__(self, *args, **kwargs)
 
@@ -399,7 +733,7 @@ class Rectangle(BoxGraphic):
         )
 
 
-    to_svg = svg.generate_rectangle_svg
+    _generate_svg = svg.generate_rectangle_svg
 
 
 
@@ -421,6 +755,8 @@ class Line(Graphic):
     (x of rotation point, y of rotation point, angle), in degrees.
     :param dict data: Any data to be associated with the Graphic."""
 
+    __slots__ = ("_x1", "_y1", "_x2", "_y2")
+
     def __init__(self, x1, y1, x2, y2, *args, **kwargs):
         Graphic.__init__(self, *args, **kwargs)
         if not isinstance(x1, int) and not isinstance(x1, float):
@@ -456,6 +792,7 @@ class Line(Graphic):
             if not isinstance(x1, int) and not isinstance(x1, float):
                 raise TypeError("x1 must be numeric, not '%s'" % x1)
             self._x1 = x1
+            self._invalidate(geometry=True)
 
 
     def y1(self, y1=None):
@@ -471,6 +808,7 @@ class Line(Graphic):
             if not isinstance(y1, int) and not isinstance(y1, float):
                 raise TypeError("y1 must be numeric, not '%s'" % y1)
             self._y1 = y1
+            self._invalidate(geometry=True)
 
 
     def x2(self, x2=None):
@@ -486,6 +824,7 @@ class Line(Graphic):
             if not isinstance(x2, int) and not isinstance(x2, float):
                 raise TypeError("x2 must be numeric, not '%s'" % x2)
             self._x2 = x2
+            self._invalidate(geometry=True)
 
 
     def y2(self, y2=None):
@@ -501,9 +840,17 @@ class Line(Graphic):
             if not isinstance(y2, int) and not isinstance(y2, float):
                 raise TypeError("y2 must be numeric, not '%s'" % y2)
             self._y2 = y2
+            self._invalidate(geometry=True)
+
+
+    def _extents(self):
+        return (
+         min(self._x1, self._x2), min(self._y1, self._y2),
+         max(self._x1, self._x2), max(self._y1, self._y2)
+        )
 
 
-    to_svg = svg.generate_line_svg
+    _generate_svg = svg.generate_line_svg
 
 
 
@@ -513,7 +860,9 @@ class Polygon(ShapeGraphic):
     Polygons are shapes with an arbitrary number of vertices.
 
     :param \*coordinates: The coordinates as a sequence of alternating x and y \
-    values.
+    values. They can also be given as a single sequence - an ``array`` of\
+    floats will be used as it is without being copied, and other buffers of\
+    floats (such as NumPy arrays) are copied in one go.
     :param str fill_color: Defaults to '#FFFFFF'.
     :param opacity: The degree of transparency, from 0 to 1 (0 being\
     invisible).
@@ -528,17 +877,17 @@ class Polygon(ShapeGraphic):
     :raises ValueError: if an odd number of coordinate values are given.
     :raises GeometryError: if there are fewer than three vertices."""
 
+    __slots__ = ("_coordinates",)
+
     def __init__(self, *coordinates, **kwargs):
         ShapeGraphic.__init__(self, **kwargs)
 
-        for value in coordinates:
-            if not isinstance(value, int) and not isinstance(value, float):
-                raise TypeError("'%s' is an invalid coordinate" % value)
+        coordinates = process_coordinates(coordinates)
         if len(coordinates) % 2 != 0:
             raise ValueError("There must be an even number of coordinates")
         if len(coordinates) < 6:
             raise GeometryError("There must be at least three vertices")
-        self._coordinates = list(coordinates)
+        self._coordinates = coordinates
 
 
     def __repr__(self):
@@ -556,6 +905,10 @@ class Polygon(ShapeGraphic):
 
         ``((x1, y1), (x2, y2), (x3, y3)...)``
 
+        The coordinates are stored as 64-bit floats, so they are returned as
+        ``float`` values whatever type they were given as - their values are
+        kept, but ints come back as their ``float`` equivalents.
+
         :param bool xy_pairs: if True, the coordinates will be returned as xy\
         pairs (see above).
         :rtype: ``tuple``"""
@@ -566,6 +919,32 @@ class Polygon(ShapeGraphic):
             return tuple(self._coordinates)
 
 
+    def coordinates_view(self):
+        """Returns the coordinates of the Polygon as a read-only ``memoryview``
+        of 64-bit floats, of alternating x and y values. Unlike
+        :py:meth:`coordinates`, nothing is copied, which makes this the way
+        to read the coordinates of Polygons with very many vertices (it can
+        be passed straight to ``numpy.frombuffer`` for example).
+
+        The Polygon's vertices cannot be added or removed while the view is in
+        use - call its ``release`` method when finished with it.
+
+        :rtype: ``memoryview``"""
+
+        return memoryview(self._coordinates).toreadonly()
+
+
+    def transformed_coordinates(self):
+        """Returns the coordinates of the Polygon as they will appear once its
+        rotation and transform have been applied, as an ``array`` of
+        alternating x and y values. All the vertices are transformed in one
+        go by the Polygon's compiled matrix.
+
+        :rtype: ``array``"""
+
+        return transform_coordinates(self.matrix(), self._coordinates)
+
+
     def add_vertex(self, x, y):
         """Adds a vertex to the Polygon. The vertex will be added at the end of
         the list of vertices.
@@ -579,6 +958,52 @@ class Polygon(ShapeGraphic):
             raise TypeError("y must be numeric, not '%s'" % y)
         self._coordinates.append(x)
         self._coordinates.append(y)
+        self._invalidate(geometry=True)
+
+
+    def add_vertices(self, xs, ys):
+        """Adds any number of vertices to the end of the Polygon's list of
+        vertices at once.
+
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if there are different numbers of x and y values."""
+
+        self._coordinates.extend(interleave_vertices(xs, ys))
+        self._invalidate(geometry=True)
+
+
+    def insert_vertices(self, index, xs, ys):
+        """Inserts any number of vertices into the Polygon's list of vertices at
+        once, before the vertex at the specified index.
+
+        :param int index: The index to insert the vertices at.
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if there are different numbers of x and y values."""
+
+        if not isinstance(index, int):
+            raise TypeError("Vertex index must be int")
+        index = slice(index, index).indices(len(self._coordinates) // 2)[0]
+        self._coordinates[index * 2:index * 2] = interleave_vertices(xs, ys)
+        self._invalidate(geometry=True)
+
+
+    def set_vertices(self, vertices, xs, ys):
+        """Replaces a slice of the Polygon's vertices with new ones, in the same
+        way that a slice of a ``list`` can be replaced. For example,
+        ``set_vertices(slice(-100, None), xs, ys)`` replaces the last hundred
+        vertices.
+
+        :param slice vertices: The vertices to replace.
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if the wrong number of values are given.
+        :raises GeometryError: if the Polygon would be left with fewer than three\
+        vertices."""
+
+        replace_vertices(self._coordinates, vertices, xs, ys, 3)
+        self._invalidate(geometry=True)
 
 
     def remove_vertex(self, index):
@@ -590,13 +1015,47 @@ class Polygon(ShapeGraphic):
 
         if len(self._coordinates) <= 6:
             raise GeometryError("There must be at least three vertices")
-        if not isinstance(index, int):
-            raise TypeError("Vertex index must be int")
-        self._coordinates.pop(index * 2)
-        self._coordinates.pop(index * 2)
+        self.remove_vertices((index,))
+
+
+    def remove_vertices(self, indices):
+        """Removes the vertices at any number of indices from the Polygon at
+        once. This is much faster than removing them one at a time, as the
+        vertices which are left only need to be moved once.
+
+        :param indices: The indices of the vertices to be removed.
+        :raises GeometryError: if removing the vertices would leave the\
+        Polygon with fewer than three vertices."""
 
+        delete_vertices(self._coordinates, indices, 3)
+        self._invalidate(geometry=True)
 
-    to_svg = svg.generate_polygon_svg
+
+    def simplify(self, tolerance):
+        """Removes vertices from the Polygon which make no visible difference to
+        it, so that none of its original vertices are more than ``tolerance``
+        away from it. Use this on Polygons with far more vertices than there
+        are pixels to draw them in.
+
+        :param tolerance: The largest distance a vertex can be moved by.
+        :raises ValueError: if the tolerance is negative."""
+
+        if not isinstance(tolerance, int) and not isinstance(tolerance, float):
+            raise TypeError("tolerance must be numeric, not '%s'" % tolerance)
+        if tolerance < 0:
+            raise ValueError("tolerance cannot be negative")
+        self._coordinates = array("d", simplify_coordinates(
+         self._coordinates, tolerance, closed=True
+        ))
+        self._invalidate(geometry=True)
+
+
+    def _extents(self):
+        xs, ys = self._coordinates[::2], self._coordinates[1::2]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+
+    _generate_svg = svg.generate_polygon_svg
 
 
 
@@ -621,13 +1080,15 @@ class Oval(BoxGraphic):
     (x of rotation point, y of rotation point, angle).
     :param dict data: Any data to be associated with the Oval."""
 
+    __slots__ = ()
+
     def __repr__(self):
         return "<Oval %i×%i at (%i,%i)>" % (
          self._width, self._height, self._x, self._y
         )
 
 
-    to_svg = svg.generate_oval_svg
+    _generate_svg = svg.generate_oval_svg
 
 
 
@@ -656,6 +1117,11 @@ class Text(ShapeGraphic):
     (x of rotation point, y of rotation point, angle), in degrees.
     :param dict data: Any data to be associated with the Text."""
 
+    __slots__ = (
+     "_x", "_y", "_text", "_font_size", "_horizontal_align",
+     "_vertical_align"
+    )
+
     def __init__(self, x, y, text, *args, font_size=18, fill_color="#000000",
      line_width=0, horizontal_align="center", vertical_align="center", **kwargs):
         ShapeGraphic.__init__(self, *args, fill_color=fill_color, line_width=line_width, **kwargs)
@@ -716,6 +1182,7 @@ class Text(ShapeGraphic):
             if not isinstance(x, int) and not isinstance(x, float):
                 raise TypeError("x must be numeric, not '%s'" % x)
             self._x = x
+            self._invalidate(geometry=True)
 
 
     def y(self, y=None):
@@ -732,6 +1199,7 @@ class Text(ShapeGraphic):
             if not isinstance(y, int) and not isinstance(y, float):
                 raise TypeError("y must be numeric, not '%s'" % y)
             self._y = y
+            self._invalidate(geometry=True)
 
 
     def text(self, text=None):
@@ -745,6 +1213,7 @@ class Text(ShapeGraphic):
             return self._text
         else:
             self._text = text
+            self._invalidate(geometry=True)
 
 
     def font_size(self, font_size=None):
@@ -760,6 +1229,7 @@ class Text(ShapeGraphic):
             if not isinstance(font_size, int) and not isinstance(font_size, float):
                 raise TypeError("font_size must be numeric, not '%s'" % font_size)
             self._font_size = font_size
+            self._invalidate(geometry=True)
 
 
     def horizontal_align(self, horizontal_align=None):
@@ -786,6 +1256,7 @@ class Text(ShapeGraphic):
                  "'%s' is not a valid horizontal alignment" % horizontal_align
                 )
             self._horizontal_align = horizontal_align
+            self._invalidate(geometry=True)
 
 
     def vertical_align(self, vertical_align=None):
@@ -811,9 +1282,24 @@ class Text(ShapeGraphic):
                  "'%s' is not a valid vertical alignment" % vertical_align
                 )
             self._vertical_align = vertical_align
+            self._invalidate(geometry=True)
+
 
+    def _extents(self):
+        # There is no way to know how big the text will be once a renderer has
+        # chosen a font, so this is an estimate based on the font size.
+        width = len(str(self._text)) * self._font_size * TEXT_WIDTH_RATIO
+        height = self._font_size
+        x = {
+         "left": self._x - width, "center": self._x - width / 2, "right": self._x
+        }[self._horizontal_align]
+        y = {
+         "top": self._y - height, "center": self._y - height / 2, "bottom": self._y
+        }[self._vertical_align]
+        return (x, y, x + width, y + height)
 
-    to_svg = svg.generate_text_svg
+
+    _generate_svg = svg.generate_text_svg
 
 
 
@@ -825,7 +1311,9 @@ class Polyline(Graphic):
     interior space.
 
     :param \*coordinates: The coordinates as a sequence of alternating x and y \
-    values.
+    values. They can also be given as a single sequence - an ``array`` of\
+    floats will be used as it is without being copied, and other buffers of\
+    floats (such as NumPy arrays) are copied in one go.
     :param line_width: Defaults to 1.
     :param str name: An identifable name for the Graphic.
     :param str line_style: The line pattern. Acceptable values are\
@@ -837,17 +1325,17 @@ class Polyline(Graphic):
     :raises ValueError: if an odd number of coordinate values are given.
     :raises GeometryError: if there are fewer than two vertices."""
 
+    __slots__ = ("_coordinates",)
+
     def __init__(self, *coordinates, **kwargs):
         Graphic.__init__(self, **kwargs)
 
-        for value in coordinates:
-            if not isinstance(value, int) and not isinstance(value, float):
-                raise TypeError("'%s' is an invalid coordinate" % value)
+        coordinates = process_coordinates(coordinates)
         if len(coordinates) % 2 != 0:
             raise ValueError("There must be an even number of coordinates")
         if len(coordinates) < 4:
             raise GeometryError("There must be at least two vertices")
-        self._coordinates = list(coordinates)
+        self._coordinates = coordinates
 
 
     def __repr__(self):
@@ -865,6 +1353,10 @@ class Polyline(Graphic):
 
         ``((x1, y1), (x2, y2), (x3, y3)...)``
 
+        The coordinates are stored as 64-bit floats, so they are returned as
+        ``float`` values whatever type they were given as - their values are
+        kept, but ints come back as their ``float`` equivalents.
+
         :param bool xy_pairs: if True, the coordinates will be returned as xy\
         pairs (see above).
         :rtype: ``tuple``"""
@@ -875,6 +1367,32 @@ class Polyline(Graphic):
             return tuple(self._coordinates)
 
 
+    def coordinates_view(self):
+        """Returns the coordinates of the Polyline as a read-only ``memoryview``
+        of 64-bit floats, of alternating x and y values. Unlike
+        :py:meth:`coordinates`, nothing is copied, which makes this the way
+        to read the coordinates of Polylines with very many vertices (it can
+        be passed straight to ``numpy.frombuffer`` for example).
+
+        The Polyline's vertices cannot be added or removed while the view is in
+        use - call its ``release`` method when finished with it.
+
+        :rtype: ``memoryview``"""
+
+        return memoryview(self._coordinates).toreadonly()
+
+
+    def transformed_coordinates(self):
+        """Returns the coordinates of the Polyline as they will appear once its
+        rotation and transform have been applied, as an ``array`` of
+        alternating x and y values. All the vertices are transformed in one
+        go by the Polyline's compiled matrix.
+
+        :rtype: ``array``"""
+
+        return transform_coordinates(self.matrix(), self._coordinates)
+
+
     def add_vertex(self, x, y):
         """Adds a vertex to the Polyline. The vertex will be added at the end of
         the list of vertices.
@@ -888,6 +1406,52 @@ class Polyline(Graphic):
             raise TypeError("y must be numeric, not '%s'" % y)
         self._coordinates.append(x)
         self._coordinates.append(y)
+        self._invalidate(geometry=True)
+
+
+    def add_vertices(self, xs, ys):
+        """Adds any number of vertices to the end of the Polyline's list of
+        vertices at once.
+
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if there are different numbers of x and y values."""
+
+        self._coordinates.extend(interleave_vertices(xs, ys))
+        self._invalidate(geometry=True)
+
+
+    def insert_vertices(self, index, xs, ys):
+        """Inserts any number of vertices into the Polyline's list of vertices at
+        once, before the vertex at the specified index.
+
+        :param int index: The index to insert the vertices at.
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if there are different numbers of x and y values."""
+
+        if not isinstance(index, int):
+            raise TypeError("Vertex index must be int")
+        index = slice(index, index).indices(len(self._coordinates) // 2)[0]
+        self._coordinates[index * 2:index * 2] = interleave_vertices(xs, ys)
+        self._invalidate(geometry=True)
+
+
+    def set_vertices(self, vertices, xs, ys):
+        """Replaces a slice of the Polyline's vertices with new ones, in the same
+        way that a slice of a ``list`` can be replaced. For example,
+        ``set_vertices(slice(-100, None), xs, ys)`` replaces the last hundred
+        vertices.
+
+        :param slice vertices: The vertices to replace.
+        :param xs: The x-values of the new vertices' coordinates.
+        :param ys: The y-values of the new vertices' coordinates.
+        :raises ValueError: if the wrong number of values are given.
+        :raises GeometryError: if the Polyline would be left with fewer than two\
+        vertices."""
+
+        replace_vertices(self._coordinates, vertices, xs, ys, 2)
+        self._invalidate(geometry=True)
 
 
     def remove_vertex(self, index):
@@ -899,10 +1463,1464 @@ class Polyline(Graphic):
 
         if len(self._coordinates) <= 4:
             raise GeometryError("There must be at least two vertices")
+        self.remove_vertices((index,))
+
+
+    def remove_vertices(self, indices):
+        """Removes the vertices at any number of indices from the Polyline at
+        once. This is much faster than removing them one at a time, as the
+        vertices which are left only need to be moved once.
+
+        :param indices: The indices of the vertices to be removed.
+        :raises GeometryError: if removing the vertices would leave the\
+        Polyline with fewer than two vertices."""
+
+        delete_vertices(self._coordinates, indices, 2)
+        self._invalidate(geometry=True)
+
+
+    def simplify(self, tolerance):
+        """Removes vertices from the Polyline which make no visible difference to
+        it, so that none of its original vertices are more than ``tolerance``
+        away from it. Use this on Polylines with far more vertices than there
+        are pixels to draw them in.
+
+        :param tolerance: The largest distance a vertex can be moved by.
+        :raises ValueError: if the tolerance is negative."""
+
+        if not isinstance(tolerance, int) and not isinstance(tolerance, float):
+            raise TypeError("tolerance must be numeric, not '%s'" % tolerance)
+        if tolerance < 0:
+            raise ValueError("tolerance cannot be negative")
+        self._coordinates = array("d", simplify_coordinates(
+         self._coordinates, tolerance, closed=False
+        ))
+        self._invalidate(geometry=True)
+
+
+    def _extents(self):
+        xs, ys = self._coordinates[::2], self._coordinates[1::2]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+
+    _generate_svg = svg.generate_polyline_svg
+
+
+
+def process_column(values, name):
+    """Turns a sequence of numbers into an ``array`` of floats, checking the
+    whole sequence at once. Buffers of 64-bit floats (such as NumPy arrays) are
+    copied directly without looking at each value.
+
+    :param values: The sequence to convert.
+    :param str name: The name of the column, for error messages.
+    :raises TypeError: if any of the values are not numeric.
+    :rtype: ``array``"""
+
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == "d" and view.ndim == 1\
+     and view.c_contiguous:
+        column = array("d")
+        column.frombytes(view.cast("B"))
+        return column
+    if isinstance(values, (str, bytes)):
+        raise TypeError("%s must be a sequence of numbers, not '%s'" % (
+         name, values
+        ))
+    try:
+        return array("d", values)
+    except TypeError:
+        raise TypeError(
+         "%s must be a sequence of numbers, not '%s'" % (name, values)
+        ) from None
+
+
+
+def process_coordinates(coordinates):
+    """Turns the coordinates given to a :py:class:`.Polygon` or
+    :py:class:`.Polyline` into an ``array`` of floats, which takes up a
+    quarter of the memory of a list. The coordinates can be separate numbers,
+    or a single sequence of them.
+
+    :param tuple coordinates: The coordinates.
+    :raises TypeError: if any of the coordinates are not numeric.
+    :rtype: ``array``"""
+
+    if len(coordinates) == 1 and not isinstance(coordinates[0], (int, float)):
+        if isinstance(coordinates[0], array) and coordinates[0].typecode == "d":
+            return coordinates[0]
+        return process_column(coordinates[0], "Coordinates")
+    for value in coordinates:
+        if not isinstance(value, int) and not isinstance(value, float):
+            raise TypeError("'%s' is an invalid coordinate" % value)
+    return array("d", coordinates)
+
+
+
+def interleave_vertices(xs, ys):
+    """Turns separate sequences of x and y values into a single ``array`` of
+    alternating x and y values, checking them all at once.
+
+    :param xs: The x values.
+    :param ys: The y values.
+    :raises TypeError: if any of the values are not numeric.
+    :raises ValueError: if there are different numbers of x and y values.
+    :rtype: ``array``"""
+
+    xs, ys = process_column(xs, "xs"), process_column(ys, "ys")
+    if len(xs) != len(ys):
+        raise ValueError("There must be as many y values as x values")
+    coordinates = array("d", bytes(16 * len(xs)))
+    coordinates[::2], coordinates[1::2] = xs, ys
+    return coordinates
+
+
+def delete_vertices(coordinates, indices, minimum):
+    """Removes any number of vertices from an ``array`` of alternating x and y
+    values in place, moving the vertices that remain only once.
+
+    :param array coordinates: The coordinates to remove vertices from.
+    :param indices: The indices of the vertices to remove.
+    :param int minimum: The fewest vertices that can be left.
+    :raises TypeError: if any of the indices are not ints.
+    :raises IndexError: if any of the indices are out of range.
+    :raises GeometryError: if too few vertices would be left."""
+
+    vertices = len(coordinates) // 2
+    removed = set()
+    for index in indices:
         if not isinstance(index, int):
             raise TypeError("Vertex index must be int")
-        self._coordinates.pop(index * 2)
-        self._coordinates.pop(index * 2)
+        if not -vertices <= index < vertices:
+            raise IndexError("There is no vertex %i" % index)
+        removed.add(index % vertices)
+    if vertices - len(removed) < minimum:
+        raise GeometryError("There must be at least %i vertices" % minimum)
+    if len(removed) == 1:
+        index = removed.pop()
+        del coordinates[index * 2:index * 2 + 2]
+        return
+    kept, start = array("d"), 0
+    for index in sorted(removed):
+        kept += coordinates[start * 2:index * 2]
+        start = index + 1
+    kept += coordinates[start * 2:]
+    coordinates[:] = kept
+
+
+def replace_vertices(coordinates, vertices, xs, ys, minimum):
+    """Replaces a slice of the vertices in an ``array`` of alternating x and
+    y values in place. As with lists, a slice with no step can be replaced by
+    any number of vertices, but an extended slice must be replaced by the same
+    number of vertices as it covers.
+
+    :param array coordinates: The coordinates to change.
+    :param slice vertices: The vertices to replace.
+    :param xs: The new x values.
+    :param ys: The new y values.
+    :param int minimum: The fewest vertices that can be left.
+    :raises TypeError: if the vertices are not a slice, or any of the new\
+    values are not numeric.
+    :raises ValueError: if the wrong number of values are given.
+    :raises GeometryError: if too few vertices would be left."""
+
+    if not isinstance(vertices, slice):
+        raise TypeError("Vertices must be a slice, not '%s'" % str(vertices))
+    replacements = interleave_vertices(xs, ys)
+    start, stop, step = vertices.indices(len(coordinates) // 2)
+    if step == 1:
+        stop = max(start, stop)
+        if len(coordinates) - 2 * (stop - start) + len(replacements)\
+         < minimum * 2:
+            raise GeometryError("There must be at least %i vertices" % minimum)
+        coordinates[start * 2:stop * 2] = replacements
+    else:
+        indices = range(start, stop, step)
+        if len(indices) * 2 != len(replacements):
+            raise ValueError(
+             "%i vertices cannot replace a slice of %i vertices" % (
+              len(replacements) // 2, len(indices)
+             )
+            )
+        for index, x, y in zip(
+         indices, replacements[::2], replacements[1::2]
+        ):
+            coordinates[index * 2] = x
+            coordinates[index * 2 + 1] = y
+
+
+
+class BatchColumn:
+    """A descriptor which makes an attribute of a batch row view read and write
+    one of the batch's columns.
+
+    :param int index: The index of the column in the batch."""
+
+    def __init__(self, index):
+        self._index = index
+
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return view._batch._columns[self._index][view._row]
+
+
+    def __set__(self, view, value):
+        view._batch._columns[self._index][view._row] = value
+
+
+
+class BatchStyle:
+    """A descriptor which makes an attribute of a batch row view read and write
+    the styling shared by the whole batch. If the batch holds the Graphics of
+    a columnar canvas, a row whose styling is changed is first split off into
+    a batch of its own, so that the rest keep theirs.
+
+    :param str attribute: The name of the batch's attribute.
+    :param bool separate: If ``False``, the attribute is not styling, and is\
+    changed for the whole batch even on a columnar canvas."""
+
+    def __init__(self, attribute, separate=True):
+        self._attribute = attribute
+        self._separate = separate
+
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return getattr(view._batch, self._attribute)
+
+
+    def __set__(self, view, value):
+        if self._separate and getattr(view._batch, self._attribute) != value:
+            _separate_batch_row(view)
+        setattr(view._batch, self._attribute, value)
+        view._batch._invalidate()
+
+
+
+class BatchRowName:
+    """A descriptor which makes the name of a batch row view the name of its
+    row. Unlike the styling, names belong to single rows, and the batch keeps
+    only those which have been given."""
+
+    def __get__(self, view, owner):
+        if view is None:
+            return self
+        return view._batch._names.get(view._row)
+
+
+    def __set__(self, view, name):
+        if name is None:
+            view._batch._names.pop(view._row, None)
+        else:
+            view._batch._names[view._row] = name
+
+
+
+class Uncached:
+    """A descriptor for a cache attribute which never holds anything. Batch
+    row views use it for their SVG and bounding box, because changes made to
+    the batch rather than the view could not otherwise be noticed, Instances
+    use it because their SVG depends on their template's, and Images use it
+    because their data is too large to keep as text."""
+
+    def __get__(self, view, owner):
+        return None if view is not None else self
+
+
+    def __set__(self, view, value):
+        pass
+
+
+
+def _separate_batch_row(view):
+    # Rows of a columnar canvas's batches are Graphics in their own right, so
+    # one which is restyled is split off from the rest by the canvas first.
+    batch = view._batch
+    if batch._split_on_restyle and len(batch) > 1\
+     and hasattr(batch._parent, "_separate"):
+        batch._parent._separate(view)
+
+
+def _get_view_data(view):
+    """Returns any data associated with the Graphic as a ``dict``. This
+    ``dict`` is modifiable, and is the data of the whole batch unless the
+    batch holds the Graphics of a columnar canvas, in which case the row is
+    first split off into a batch of its own.
+
+    :rtype: ``dict``"""
+
+    _separate_batch_row(view)
+    return view._data
+
+
+def _make_view(view_class, batch, row):
+    # There is only ever one view of a row at a time, so that views can be
+    # found by identity, and can be kept pointing at their row when rows move.
+    view = batch._views.get(row)
+    if view is None:
+        view = object.__new__(view_class)
+        view._batch, view._row, view._parent = batch, row, batch
+        batch._views[row] = view
+    return view
+
+
+def _get_batch_row(batch, index):
+    if not isinstance(index, int):
+        raise TypeError("Batch index must be int, not '%s'" % index)
+    if index < 0:
+        index += len(batch)
+    if not 0 <= index < len(batch):
+        raise IndexError("Batch index out of range")
+    return _make_view(batch._view_class, batch, index)
+
+
+def _iterate_batch_rows(batch):
+    for row in range(len(batch)):
+        yield _make_view(batch._view_class, batch, row)
+
+
+def _batch_row_moved(batch, view):
+    batch._invalidate(geometry=True)
+
+
+def _batch_row_restyled(batch, view):
+    batch._invalidate()
+
+
+def _batch_row_renamed(batch, view, old_name):
+    if batch._parent is not None:
+        batch._parent._graphic_renamed(view, old_name)
+
+
+def _set_batch_state(batch, state):
+    batch._split_on_restyle = False
+    Graphic.__setstate__(batch, state)
+    batch._views = weakref.WeakValueDictionary()
+
+
+def _move_batch_rows(batch, start, other, offset):
+    # Moves the names and views of the rows of a batch from a row onwards to
+    # the rows of another batch, offset by some amount.
+    for row in [row for row in batch._names if row >= start]:
+        other._names[row + offset] = batch._names.pop(row)
+    for row in [row for row in batch._views.keys() if row >= start]:
+        view = batch._views.pop(row, None)
+        if view is not None:
+            view._batch, view._row, view._parent = other, row + offset, other
+            other._views[row + offset] = view
+
+
+def _split_batch(batch, row):
+    # Moves the rows from a row onwards into a new batch with the same
+    # styling, which their views then belong to.
+    split = type(batch)(
+     *[column[row:] for column in batch._columns],
+     data=dict(batch._data), **dict(batch._style(), name=None)
+    )
+    split._transform = batch._transform
+    split._split_on_restyle = batch._split_on_restyle
+    for column in batch._columns:
+        del column[row:]
+    _move_batch_rows(batch, row, split, -row)
+    batch._invalidate(geometry=True)
+    return split
+
+
+def _remove_batch_row(batch, view):
+    # Takes a row out of a batch. Its view is left with a batch of its own,
+    # which isn't on anything, so that it is still a usable Graphic.
+    row = view._row
+    rest = _split_batch(_split_batch(batch, row), 1)
+    for column, rest_column in zip(batch._columns, rest._columns):
+        column.extend(rest_column)
+    _move_batch_rows(rest, 0, batch, row)
+    batch._invalidate(geometry=True)
+    view._parent = None
+
+
+def _swap_batch_rows(batch, row, other):
+    for column in batch._columns:
+        column[row], column[other] = column[other], column[row]
+    names, views = batch._names, batch._views
+    name, other_name = names.pop(row, None), names.pop(other, None)
+    view, other_view = views.pop(row, None), views.pop(other, None)
+    if name is not None:
+        names[other] = name
+    if other_name is not None:
+        names[row] = other_name
+    if view is not None:
+        view._row = other
+        views[other] = view
+    if other_view is not None:
+        other_view._row = row
+        views[row] = other_view
+    batch._invalidate(geometry=True)
+
+
+def _iterate_batch_row_bounds(batch):
+    # The bounds of each row, worked out from the columns directly unless the
+    # rows are transformed.
+    if batch.matrix() != IDENTITY:
+        return (view._get_bounds() for view in batch)
+    padding = batch._line_width / 2
+    x1s, y1s, x2s, y2s = batch._columns
+    if isinstance(batch, BoxBatch):
+        x2s = map(operator.add, x1s, x2s)
+        y2s = map(operator.add, y1s, y2s)
+    return ((
+     min(x1, x2) - padding, min(y1, y2) - padding,
+     max(x1, x2) + padding, max(y1, y2) + padding
+    ) for x1, y1, x2, y2 in zip(x1s, y1s, x2s, y2s))
+
+
+def _select_batch_rows(batch, rows):
+    # A new batch of some of the rows, with the same styling.
+    selected = type(batch)(
+     *[array("d", map(column.__getitem__, rows)) for column in batch._columns],
+     data=dict(batch._data), **batch._style()
+    )
+    selected._transform = batch._transform
+    return selected
+
+
+
+class BoxView:
+    """The attributes shared by :py:class:`.RectangleView` and
+    :py:class:`.OvalView` - the geometry comes from the batch's columns, and
+    the styling is the batch's own."""
+
+    __slots__ = ()
+
+    _x, _y, _width, _height = (BatchColumn(index) for index in range(4))
+    _name = BatchRowName()
+    _line_width = BatchStyle("_line_width")
+    _line_style = BatchStyle("_line_style")
+    _line_color = BatchStyle("_line_color")
+    _rotation = BatchStyle("_rotation")
+    _transform = BatchStyle("_transform")
+    _data = BatchStyle("_data")
+    _fill_color = BatchStyle("_fill_color")
+    _opacity = BatchStyle("_opacity")
+    _instances = BatchStyle("_instances", separate=False)
+    _svg = _bounds = Uncached()
+    data = _get_view_data
+
+
+
+class RectangleView(BoxView, Rectangle):
+    """Base class: :py:class:`Rectangle`
+
+    One row of a :py:class:`.RectangleBatch`, which behaves like a normal
+    :py:class:`.Rectangle`. Its geometry is read from and written to the
+    batch's columns, and its styling is the batch's styling - so restyling the
+    view restyles every Rectangle in the batch, unless the batch holds the
+    Graphics of a columnar canvas, which splits the row off first - but its
+    name is its own.
+    Views are created when they are asked for and hold nothing but a reference
+    to their row, and there is only one view of a row at a time, which follows
+    the row if it moves to another batch."""
+
+    __slots__ = ("_batch", "_row", "__weakref__")
+
+
+
+class OvalView(BoxView, Oval):
+    """Base class: :py:class:`Oval`
+
+    One row of an :py:class:`.OvalBatch`, which behaves like a normal
+    :py:class:`.Oval`. Its geometry is read from and written to the batch's
+    columns, and its styling is the batch's styling - so restyling the view
+    restyles every Oval in the batch, unless it is on a columnar canvas - but
+    its name is its own."""
+
+    __slots__ = ("_batch", "_row", "__weakref__")
+
+
+
+class LineView(Line):
+    """Base class: :py:class:`Line`
+
+    One row of a :py:class:`.LineBatch`, which behaves like a normal
+    :py:class:`.Line`. Its geometry is read from and written to the batch's
+    columns, and its styling is the batch's styling - so restyling the view
+    restyles every Line in the batch, unless it is on a columnar canvas - but
+    its name is its own."""
+
+    __slots__ = ("_batch", "_row", "__weakref__")
+
+    _x1, _y1, _x2, _y2 = (BatchColumn(index) for index in range(4))
+    _name = BatchRowName()
+    _line_width = BatchStyle("_line_width")
+    _line_style = BatchStyle("_line_style")
+    _line_color = BatchStyle("_line_color")
+    _rotation = BatchStyle("_rotation")
+    _transform = BatchStyle("_transform")
+    _data = BatchStyle("_data")
+    _instances = BatchStyle("_instances", separate=False)
+    _svg = _bounds = Uncached()
+    data = _get_view_data
+
+
+
+class BoxBatch(ShapeGraphic):
+    """Base class: :py:class:`ShapeGraphic`
+
+    A collection of many :py:class:`.BoxGraphic` objects which share all their
+    styling. Rather than being stored as separate objects, the boxes are stored
+    as four columns of numbers, which makes creating and storing very large
+    numbers of them much cheaper. It would not generally be instantiated
+    directly.
+
+    The styling properties (``fill_color``, ``rotation`` etc.) apply to every
+    box in the batch.
+
+    :param xs: The x-values of the top-left corners.
+    :param ys: The y-values of the top-left corners.
+    :param widths: The boxes' widths in pixels.
+    :param heights: The boxes' heights in pixels.
+    :param str fill_color: Defaults to '#FFFFFF'.
+    :param opacity: The degree of transparency, from 0 to 1 (0 being\
+    invisible).
+    :param str name: An identifable name for the Graphic.
+    :param line_width: Defaults to 1.
+    :param str line_style: The line pattern. Acceptable values are\
+    ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
+    :param str line_color: Defaults to '#000000'.
+    :param tuple rotation: Any rotation to be applied to each box, in the\
+    format (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with each box.
+    :raises ValueError: if the columns are of different lengths."""
+
+    __slots__ = ("_columns", "_names", "_views", "_split_on_restyle")
+
+    def __init__(self, xs, ys, widths, heights, *args, **kwargs):
+        ShapeGraphic.__init__(self, *args, **kwargs)
+        self._columns = (
+         process_column(xs, "xs"), process_column(ys, "ys"),
+         process_column(widths, "widths"), process_column(heights, "heights")
+        )
+        if len(set(len(column) for column in self._columns)) != 1:
+            raise ValueError("All columns must be the same length")
+        self._names = {}
+        self._views = weakref.WeakValueDictionary()
+        self._split_on_restyle = False
+
+
+    def __len__(self):
+        return len(self._columns[0])
+
+
+    __getitem__ = _get_batch_row
+    __iter__ = _iterate_batch_rows
+    __setstate__ = _set_batch_state
+    _graphic_moved = _batch_row_moved
+    _graphic_renamed = _batch_row_renamed
+    _graphic_restyled = _batch_row_restyled
+    _select = _select_batch_rows
+    _row_bounds = _iterate_batch_row_bounds
+    _split = _split_batch
+    _remove = _remove_batch_row
+    _swap = _swap_batch_rows
+
+
+    def _append(self, box):
+        for column, value in zip(
+         self._columns, (box._x, box._y, box._width, box._height)
+        ):
+            column.append(value)
+        self._invalidate(geometry=True)
+
+
+    def _extents(self):
+        if not len(self):
+            return (0, 0, 0, 0)
+        xs, ys, widths, heights = self._columns
+        ends = [x + width for x, width in zip(xs, widths)]
+        bottoms = [y + height for y, height in zip(ys, heights)]
+        return (
+         min(min(xs), min(ends)), min(min(ys), min(bottoms)),
+         max(max(xs), max(ends)), max(max(ys), max(bottoms))
+        )
+
+
+
+class RectangleBatch(BoxBatch):
+    """Base class: :py:class:`BoxBatch`
+
+    Many :py:class:`.Rectangle` objects with the same styling, stored as
+    columns of numbers."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<RectangleBatch (%i Rectangles)>" % len(self)
+
+
+    _generate_svg = svg.generate_rectangle_batch_svg
+    _view_class = RectangleView
+
+
+
+class OvalBatch(BoxBatch):
+    """Base class: :py:class:`BoxBatch`
+
+    Many :py:class:`.Oval` objects with the same styling, stored as columns of
+    numbers."""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        return "<OvalBatch (%i Ovals)>" % len(self)
+
+
+    _generate_svg = svg.generate_oval_batch_svg
+    _view_class = OvalView
+
 
 
-    to_svg = svg.generate_polyline_svg
+class LineBatch(Graphic):
+    """Base class: :py:class:`Graphic`
+
+    Many :py:class:`.Line` objects with the same styling, stored as four
+    columns of numbers rather than as separate objects.
+
+    :param x1s: The x-values of the start points.
+    :param y1s: The y-values of the start points.
+    :param x2s: The x-values of the end points.
+    :param y2s: The y-values of the end points.
+    :param str name: An identifable name for the Graphic.
+    :param line_width: Defaults to 1.
+    :param str line_style: The line pattern. Acceptable values are\
+    ``-`` (default), ``..`` (dotted) or ``--`` (dashed).
+    :param str line_color: Defaults to '#000000'.
+    :param tuple rotation: Any rotation to be applied to each line, in the\
+    format (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with each line.
+    :raises ValueError: if the columns are of different lengths."""
+
+    __slots__ = ("_columns", "_names", "_views", "_split_on_restyle")
+
+    def __init__(self, x1s, y1s, x2s, y2s, *args, **kwargs):
+        Graphic.__init__(self, *args, **kwargs)
+        self._columns = (
+         process_column(x1s, "x1s"), process_column(y1s, "y1s"),
+         process_column(x2s, "x2s"), process_column(y2s, "y2s")
+        )
+        if len(set(len(column) for column in self._columns)) != 1:
+            raise ValueError("All columns must be the same length")
+        self._names = {}
+        self._views = weakref.WeakValueDictionary()
+        self._split_on_restyle = False
+
+
+    def __repr__(self):
+        return "<LineBatch (%i Lines)>" % len(self)
+
+
+    def __len__(self):
+        return len(self._columns[0])
+
+
+    __getitem__ = _get_batch_row
+    __iter__ = _iterate_batch_rows
+    __setstate__ = _set_batch_state
+    _graphic_moved = _batch_row_moved
+    _graphic_renamed = _batch_row_renamed
+    _graphic_restyled = _batch_row_restyled
+    _select = _select_batch_rows
+    _row_bounds = _iterate_batch_row_bounds
+    _split = _split_batch
+    _remove = _remove_batch_row
+    _swap = _swap_batch_rows
+
+
+    def _append(self, line):
+        for column, value in zip(
+         self._columns, (line._x1, line._y1, line._x2, line._y2)
+        ):
+            column.append(value)
+        self._invalidate(geometry=True)
+
+
+    def _extents(self):
+        if not len(self):
+            return (0, 0, 0, 0)
+        x1s, y1s, x2s, y2s = self._columns
+        return (
+         min(min(x1s), min(x2s)), min(min(y1s), min(y2s)),
+         max(max(x1s), max(x2s)), max(max(y1s), max(y2s))
+        )
+
+
+    _generate_svg = svg.generate_line_batch_svg
+    _view_class = LineView
+
+
+
+class Instance(Graphic):
+    """Base class: :py:class:`Graphic`
+
+    A copy of another Graphic, the template, shifted by some distance. In SVG
+    the template is written out once, inside a ``<defs>`` block, and each
+    Instance is a short ``<use>`` element referring to it - so drawing the
+    same shape thousands of times only costs a few bytes per copy. Changes to
+    the template will appear in all of its Instances.
+
+    :param Graphic template: The Graphic to copy. It does not need to be on\
+    any canvas itself.
+    :param x: The horizontal distance to shift the template by.
+    :param y: The vertical distance to shift the template by.
+    :param str name: An identifable name for the Graphic.
+    :param tuple rotation: Any rotation to be applied, in the format\
+    (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with the Instance."""
+
+    __slots__ = ("_template", "_x", "_y", "__weakref__")
+
+    _svg = _bounds = Uncached()
+
+    def __init__(self, template, x, y, name=None, rotation=(0, 0, 0), data=None):
+        Graphic.__init__(
+         self, name=name, line_width=0, rotation=rotation, data=data
+        )
+
+        if not isinstance(template, Graphic):
+            raise TypeError("template must be Graphic, not '%s'" % template)
+        self._template = template
+        self._register()
+
+        if not isinstance(x, int) and not isinstance(x, float):
+            raise TypeError("x must be numeric, not '%s'" % x)
+        self._x = x
+
+        if not isinstance(y, int) and not isinstance(y, float):
+            raise TypeError("y must be numeric, not '%s'" % y)
+        self._y = y
+
+
+    def __repr__(self):
+        return "<Instance of %s shifted by (%i,%i)>" % (
+         self._template, self._x, self._y
+        )
+
+
+    def __setstate__(self, state):
+        Graphic.__setstate__(self, state)
+        self._register()
+
+
+    def template(self):
+        """Returns the Graphic that this Instance is a copy of.
+
+        :rtype: :py:class:`Graphic`"""
+
+        return self._template
+
+
+    def x(self, x=None):
+        """The horizontal distance that the template is shifted by. Passing a
+        value will update the x property.
+
+        :param x: If given, the Instance's x value will be set to this.
+        :rtype: ``float`` or ``int``"""
+
+        if x is None:
+            return self._x
+        else:
+            if not isinstance(x, int) and not isinstance(x, float):
+                raise TypeError("x must be numeric, not '%s'" % x)
+            self._x = x
+            self._invalidate(geometry=True)
+
+
+    def y(self, y=None):
+        """The vertical distance that the template is shifted by. Passing a
+        value will update the y property.
+
+        :param y: If given, the Instance's y value will be set to this.
+        :rtype: ``float`` or ``int``"""
+
+        if y is None:
+            return self._y
+        else:
+            if not isinstance(y, int) and not isinstance(y, float):
+                raise TypeError("y must be numeric, not '%s'" % y)
+            self._y = y
+            self._invalidate(geometry=True)
+
+
+    def _register(self):
+        # The template keeps weak references to its Instances, so that it can
+        # tell them when it changes without keeping them alive.
+        if self._template._instances is None:
+            self._template._instances = weakref.WeakSet()
+        self._template._instances.add(self)
+
+
+    def _extents(self):
+        min_x, min_y, max_x, max_y = self._template._get_bounds()
+        return (
+         min_x + self._x, min_y + self._y, max_x + self._x, max_y + self._y
+        )
+
+
+    _generate_svg = svg.generate_instance_svg
+
+
+
+class Group(Graphic):
+    """Base class: :py:class:`Graphic`
+
+    A collection of Graphics which are treated as one - they are drawn as a
+    single SVG ``<g>`` element, and the Group's rotation, transform, opacity
+    and data apply to all of them at once. Groups can contain other Groups.
+
+    The SVG of the Group's contents is cached separately from that of the
+    Group itself. Moving, transforming or fading a Group only rewrites its
+    opening tag, however many Graphics it holds, and changing one Graphic
+    inside it only rewrites the contents of the Groups around that Graphic.
+    Images in the Group are never kept as text - as with Images on the
+    canvas, their data is streamed when the canvas's SVG is written.
+
+    The Graphics in a Group belong to the Group rather than to a canvas, so
+    they are not found by the canvas's searches - the Group itself is.
+
+    :param graphics: The Graphics to put in the Group, from back to front.
+    :param opacity: The degree of transparency of the whole Group, from 0 to\
+    1 (0 being invisible).
+    :param str name: An identifable name for the Graphic.
+    :param tuple rotation: Any rotation to be applied, in the format\
+    (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with the Group.
+    :raises ValueError: if any of the Graphics are already on a canvas or in\
+    a Group."""
+
+    __slots__ = ("_graphics", "_opacity", "_contents")
+
+    def __init__(self, graphics=(), opacity=1, name=None, rotation=(0, 0, 0),
+     data=None):
+        Graphic.__init__(
+         self, name=name, line_width=0, rotation=rotation, data=data
+        )
+
+        if not isinstance(opacity, int) and not isinstance(opacity, float):
+            raise TypeError("opacity must be numeric, not '%s'" % opacity)
+        if not 0 <= opacity <= 1:
+            raise ValueError(
+             "opacity must be between 0 and 1, not %s" % (str(opacity))
+            )
+        self._opacity = opacity
+
+        self._graphics = []
+        self._contents = None
+        for graphic in graphics:
+            self.add_graphic(graphic)
+
+
+    def __repr__(self):
+        return "<Group (%i Graphics)>" % len(self._graphics)
+
+
+    def __len__(self):
+        return len(self._graphics)
+
+
+    def __getstate__(self):
+        # The cached contents are left out, and the Graphics in the Group are
+        # re-adopted when it is unpickled.
+        state = Graphic.__getstate__(self)
+        del state["_contents"]
+        return state
+
+
+    def __setstate__(self, state):
+        Graphic.__setstate__(self, state)
+        self._contents = None
+        for graphic in self._graphics:
+            graphic._parent = self
+
+
+    def to_svg(self):
+        """Returns the SVG text of the Group. It is kept in the same way as
+        that of other Graphics, unless there are Images in the Group, whose
+        data is too large to keep as text.
+
+        :rtype: ``str``"""
+
+        if self._svg is None and len(svg.get_group_contents(self)) > 1:
+            return self._generate_svg()
+        return Graphic.to_svg(self)
+
+
+    def graphics(self):
+        """A list of the :py:class:`.Graphic` objects in the Group, from back
+        to front.
+
+        :rtype: ``list``"""
+
+        return list(self._graphics)
+
+
+    def add_graphic(self, graphic):
+        """Adds a :py:class:`.Graphic` to the front of the Group.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to add.
+        :raises ValueError: if the Graphic is already on a canvas or in a\
+        Group, or if it is this Group or one of the Groups containing it."""
+
+        if not isinstance(graphic, Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        if graphic._parent is not None:
+            raise ValueError("%s is already on a canvas or in a Group" % graphic)
+        group = self
+        while isinstance(group, Group):
+            if group is graphic:
+                raise ValueError("A Group cannot contain itself")
+            group = group._parent
+        graphic._parent = self
+        self._graphics.append(graphic)
+        self._graphic_moved(graphic)
+
+
+    def remove_graphic(self, graphic):
+        """Removes a :py:class:`.Graphic` from the Group.
+
+        :param Graphic graphic: The :py:class:`.Graphic` to remove.
+        :raises ValueError: if the Graphic is not in the Group."""
+
+        if not isinstance(graphic, Graphic):
+            raise TypeError("%s is not a Graphic" % str(graphic))
+        if graphic._parent is not self:
+            raise ValueError("%s is not in the Group" % graphic)
+        self._graphics.remove(graphic)
+        graphic._parent = None
+        self._graphic_moved(graphic)
+
+
+    def opacity(self, opacity=None):
+        """The degree of transparency of the whole Group, from 0 to 1 (0 being
+        invisible). Passing a value will update the opacity property.
+
+        :param opacity: If given, the Group's opacity will be set to this.
+        :rtype: ``float``"""
+
+        if opacity is None:
+            return self._opacity
+        else:
+            if not isinstance(opacity, int) and not isinstance(opacity, float):
+                raise TypeError("opacity must be numeric, not '%s'" % opacity)
+            if not 0 <= opacity <= 1:
+                raise ValueError(
+                 "opacity must be between 0 and 1, not %s" % (str(opacity))
+                )
+            self._opacity = opacity
+            self._invalidate()
+
+
+    def _graphic_moved(self, graphic):
+        self._contents = None
+        self._invalidate(geometry=True)
+
+
+    def _graphic_restyled(self, graphic):
+        self._contents = None
+        self._invalidate()
+
+
+    def _graphic_renamed(self, graphic, old_name):
+        # Names inside a Group are not indexed by anything.
+        pass
+
+
+    def _extents(self):
+        if not self._graphics:
+            return (0, 0, 0, 0)
+        min_xs, min_ys, max_xs, max_ys = zip(
+         *[graphic._get_bounds() for graphic in self._graphics]
+        )
+        return (min(min_xs), min(min_ys), max(max_xs), max(max_ys))
+
+
+    _generate_svg = svg.generate_group_svg
+
+
+
+class Heatmap(Graphic):
+    """Base class: :py:class:`Graphic`
+
+    A grid of cells, each coloured according to its value using a colormap.
+    The values are kept in a single ``array`` rather than as a Graphic per
+    cell, and when the Heatmap is drawn, neighbouring cells of the same colour
+    are merged into single rectangles - so the size of the SVG depends on how
+    often the colour changes rather than on the number of cells. If the
+    colour changes so often that an image would be smaller, the Heatmap is
+    written as a single embedded PNG image instead, with one pixel per cell.
+
+    :param x: The x coordinate of the Heatmap's upper left corner.
+    :param y: The y coordinate of the Heatmap's upper left corner.
+    :param values: The values of the cells, as a sequence of rows which are\
+    each a sequence of numbers (a 2-D NumPy array of floats can be used, and\
+    will be copied in one go). The values can also be given as one flat\
+    sequence, if the number of ``columns`` is given.
+    :param cell_width: The width of each cell. Defaults to 1.
+    :param cell_height: The height of each cell. Defaults to 1.
+    :param colormap: The name of a colormap from\
+    :py:data:`.color.colormaps`, or a sequence of colours to use as one.\
+    Defaults to ``viridis``.
+    :param int columns: The number of columns, if the values are flat.
+    :param minimum: The value to give the first colour of the colormap - by\
+    default the smallest value.
+    :param maximum: The value to give the last colour of the colormap - by\
+    default the largest value.
+    :param str name: An identifable name for the Graphic.
+    :param tuple rotation: Any rotation to be applied, in the format\
+    (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with the Heatmap.
+    :raises ValueError: if the rows are of different lengths, or the values\
+    cannot be split into the number of columns given."""
+
+    __slots__ = (
+     "_x", "_y", "_values", "_columns", "_cell_width", "_cell_height",
+     "_colormap", "_minimum", "_maximum"
+    )
+
+    def __init__(self, x, y, values, cell_width=1, cell_height=1,
+     colormap="viridis", columns=None, minimum=None, maximum=None, name=None,
+     rotation=(0, 0, 0), data=None):
+        Graphic.__init__(
+         self, name=name, line_width=0, rotation=rotation, data=data
+        )
+
+        if not isinstance(x, int) and not isinstance(x, float):
+            raise TypeError("x must be numeric, not '%s'" % x)
+        self._x = x
+
+        if not isinstance(y, int) and not isinstance(y, float):
+            raise TypeError("y must be numeric, not '%s'" % y)
+        self._y = y
+
+        if not isinstance(cell_width, int) and not isinstance(cell_width, float):
+            raise TypeError("cell_width must be numeric, not '%s'" % cell_width)
+        self._cell_width = cell_width
+
+        if not isinstance(cell_height, int) and not isinstance(cell_height, float):
+            raise TypeError("cell_height must be numeric, not '%s'" % cell_height)
+        self._cell_height = cell_height
+
+        self._values, self._columns = process_grid(values, columns)
+        self._colormap = process_colormap(colormap)
+
+        for limit in (minimum, maximum):
+            if limit is not None and not isinstance(limit, int)\
+             and not isinstance(limit, float):
+                raise TypeError("Colormap limits must be numeric, not '%s'" % limit)
+        self._minimum, self._maximum = minimum, maximum
+
+
+    def __repr__(self):
+        return "<Heatmap %ix%i at (%i,%i)>" % (
+         self._columns, self.rows(), self._x, self._y
+        )
+
+
+    def x(self, x=None):
+        """The x coordinate of the Heatmap's upper left corner. Passing a
+        value will update the x property.
+
+        :param x: If given, the Heatmap's x value will be set to this.
+        :rtype: ``float`` or ``int``"""
+
+        if x is None:
+            return self._x
+        else:
+            if not isinstance(x, int) and not isinstance(x, float):
+                raise TypeError("x must be numeric, not '%s'" % x)
+            self._x = x
+            self._invalidate(geometry=True)
+
+
+    def y(self, y=None):
+        """The y coordinate of the Heatmap's upper left corner. Passing a
+        value will update the y property.
+
+        :param y: If given, the Heatmap's y value will be set to this.
+        :rtype: ``float`` or ``int``"""
+
+        if y is None:
+            return self._y
+        else:
+            if not isinstance(y, int) and not isinstance(y, float):
+                raise TypeError("y must be numeric, not '%s'" % y)
+            self._y = y
+            self._invalidate(geometry=True)
+
+
+    def cell_width(self, cell_width=None):
+        """The width of each of the Heatmap's cells. Passing a value will
+        update the cell_width property.
+
+        :param cell_width: If given, the Heatmap's cell width will be set to\
+        this.
+        :rtype: ``float`` or ``int``"""
+
+        if cell_width is None:
+            return self._cell_width
+        else:
+            if not isinstance(cell_width, int)\
+             and not isinstance(cell_width, float):
+                raise TypeError(
+                 "cell_width must be numeric, not '%s'" % cell_width
+                )
+            self._cell_width = cell_width
+            self._invalidate(geometry=True)
+
+
+    def cell_height(self, cell_height=None):
+        """The height of each of the Heatmap's cells. Passing a value will
+        update the cell_height property.
+
+        :param cell_height: If given, the Heatmap's cell height will be set to\
+        this.
+        :rtype: ``float`` or ``int``"""
+
+        if cell_height is None:
+            return self._cell_height
+        else:
+            if not isinstance(cell_height, int)\
+             and not isinstance(cell_height, float):
+                raise TypeError(
+                 "cell_height must be numeric, not '%s'" % cell_height
+                )
+            self._cell_height = cell_height
+            self._invalidate(geometry=True)
+
+
+    def colormap(self, colormap=None):
+        """The colormap used to colour the Heatmap's cells - either the name of
+        one of :py:data:`.color.colormaps`, or a ``tuple`` of colours. Passing
+        a value will update the colormap property.
+
+        :param colormap: If given, the Heatmap's colormap will be set to this.
+        :rtype: ``str`` or ``tuple``"""
+
+        if colormap is None:
+            return self._colormap
+        else:
+            self._colormap = process_colormap(colormap)
+            self._invalidate()
+
+
+    def columns(self):
+        """Returns the number of columns of cells in the Heatmap.
+
+        :rtype: ``int``"""
+
+        return self._columns
+
+
+    def rows(self):
+        """Returns the number of rows of cells in the Heatmap.
+
+        :rtype: ``int``"""
+
+        return len(self._values) // self._columns
+
+
+    def values(self):
+        """Returns the values of the Heatmap's cells, as a ``tuple`` of rows.
+
+        :rtype: ``tuple``"""
+
+        values, columns = self._values, self._columns
+        return tuple(
+         tuple(values[start:start + columns])
+          for start in range(0, len(values), columns)
+        )
+
+
+    def colors(self):
+        """Returns the colours of the Heatmap's cells, row by row, as one flat
+        ``list``.
+
+        :rtype: ``list``"""
+
+        return apply_colormap(
+         self._values, self._colormap, self._minimum, self._maximum
+        )
+
+
+    def _runs(self, colors=None):
+        return merge_cells(
+         self.colors() if colors is None else colors, self._columns
+        )
+
+
+    def _extents(self):
+        return (
+         self._x, self._y,
+         self._x + self._columns * self._cell_width,
+         self._y + self.rows() * self._cell_height
+        )
+
+
+    _generate_svg = svg.generate_heatmap_svg
+
+
+
+def process_grid(values, columns=None):
+    """Turns the values of a grid into a single ``array`` of floats, row by
+    row, and works out how many columns the grid has.
+
+    :param values: A sequence of rows, or a single flat sequence of values.
+    :param int columns: The number of columns, if the values are flat.
+    :raises ValueError: if the grid is empty, the rows are of different\
+    lengths, or the values do not fit the number of columns.
+    :rtype: ``tuple``"""
+
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if view is not None and view.format == "d" and view.ndim == 2\
+     and view.c_contiguous and columns is None:
+        grid = array("d")
+        grid.frombytes(view.cast("B"))
+        columns = view.shape[1]
+    elif columns is None:
+        grid, columns = array("d"), None
+        for row in values:
+            row = process_column(row, "Heatmap rows")
+            if columns is None:
+                columns = len(row)
+            elif len(row) != columns:
+                raise ValueError("Heatmap rows must all be the same length")
+            grid += row
+    else:
+        if not isinstance(columns, int):
+            raise TypeError("columns must be int, not '%s'" % columns)
+        if columns < 1:
+            raise ValueError("columns must be positive, not %i" % columns)
+        grid = process_column(values, "Heatmap values")
+        if len(grid) % columns:
+            raise ValueError(
+             "%i values cannot be split into %i columns" % (len(grid), columns)
+            )
+    if not grid:
+        raise ValueError("Heatmaps must have at least one cell")
+    return grid, columns
+
+
+def process_colormap(colormap):
+    """Checks that a colormap is either the name of a known colormap, or a
+    sequence of valid colours.
+
+    :param colormap: The colormap to check.
+    :raises ValueError: if there is no colormap with the name given, or no\
+    colours are given.
+    :rtype: ``str`` or ``tuple``"""
+
+    if isinstance(colormap, str):
+        if colormap not in colormaps:
+            raise ValueError("There is no colormap called '%s'" % colormap)
+        return colormap
+    colormap = tuple(process_color(color) for color in colormap)
+    if not colormap:
+        raise ValueError("Colormaps must have at least one colour")
+    return colormap
+
+
+def merge_cells(colors, columns):
+    """Merges the cells of a grid into as few rectangles of one colour as
+    possible, by joining runs of neighbouring cells in each row which have the
+    same colour, and joining identical rows together.
+
+    :param list colors: The colours of the cells, row by row.
+    :param int columns: The number of columns in the grid.
+    :returns: ``(color, column, row, width, height)`` tuples, with widths and\
+    heights in cells, as a ``list``."""
+
+    merged, open_runs, previous = [], [], None
+    for start in range(0, len(colors), columns):
+        row = colors[start:start + columns]
+        if row == previous:
+            continue
+        row_index = start // columns
+        for color, column, first_row, width in open_runs:
+            merged.append((color, column, first_row, width, row_index - first_row))
+        ends = [*compress(count(1), map(
+         operator.ne, row, islice(row, 1, None)
+        )), columns]
+        open_runs, column = [], 0
+        for end in ends:
+            open_runs.append((row[column], column, row_index, end - column))
+            column = end
+        previous = row
+    rows = len(colors) // columns
+    for color, column, first_row, width in open_runs:
+        merged.append((color, column, first_row, width, rows - first_row))
+    return merged
+
+
+
+class Image(BoxGraphic):
+    """Base class: :py:class:`BoxGraphic`
+
+    A bitmap image, such as a photo or a layer which has been rendered
+    elsewhere, embedded in the SVG as a data URI.
+
+    The image can be a PNG, JPEG or GIF file, either as a path or as a buffer
+    of the file's bytes (``bytes``, a ``memoryview``, an ``mmap`` etc.). It
+    can also be a buffer of raw pixels with the shape ``(height, width, 3)``
+    or ``(height, width, 4)`` such as a NumPy array of ``uint8`` RGB or RGBA
+    values, which will be encoded as a PNG. Buffers are not copied, and files
+    are only read when the SVG is generated - and then by memory-mapping
+    them. The base64 text is generated a chunk at a time as the SVG is
+    written, so saving a canvas never holds a whole encoded copy of the image
+    in memory. This also means that changes to the source will show up in the
+    SVG.
+
+    :param x: The x-value of the top-left corner.
+    :param y: The y-value of the top-left corner.
+    :param source: The image's file path or buffer.
+    :param width: The Image's width in pixels - by default the width of the\
+    image itself.
+    :param height: The Image's height in pixels - by default the height of\
+    the image itself.
+    :param opacity: The degree of transparency, from 0 to 1 (0 being\
+    invisible).
+    :param str name: An identifable name for the Graphic.
+    :param tuple rotation: Any rotation to be applied, in the format\
+    (x of rotation point, y of rotation point, angle), in degrees.
+    :param dict data: Any data to be associated with the Image.
+    :raises TypeError: if the source is not a path or a buffer.
+    :raises ValueError: if the source is not an image that can be embedded."""
+
+    __slots__ = ("_source", "_source_type", "_mime_type")
+
+    _svg = Uncached()
+
+    def __init__(self, x, y, source, width=None, height=None, opacity=1,
+     name=None, rotation=(0, 0, 0), data=None):
+        source_type, mime_type, image_width, image_height =\
+         process_image_source(source)
+        BoxGraphic.__init__(
+         self, x, y,
+         image_width if width is None else width,
+         image_height if height is None else height,
+         opacity=opacity, name=name, line_width=0, rotation=rotation, data=data
+        )
+        self._source = source
+        self._source_type = source_type
+        self._mime_type = mime_type
+
+
+    def __repr__(self):
+        return "<Image %i×%i at (%i,%i)>" % (
+         self.width(), self.height(), self.x(), self.y()
+        )
+
+
+    def source(self):
+        """Returns the path or buffer that the Image is read from.
+
+        :rtype: ``str`` or buffer"""
+
+        return self._source
+
+
+    def mime_type(self):
+        """Returns the MIME type that the Image will be embedded as.
+
+        :rtype: ``str``"""
+
+        return self._mime_type
+
+
+    def _iterate_bytes(self, chunk_size):
+        # Yields the bytes of the image file, chunk_size at a time.
+        if self._source_type == "file":
+            with open(self._source, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    for start in range(0, len(mapped), chunk_size):
+                        yield mapped[start:start + chunk_size]
+            return
+        view = memoryview(self._source)
+        if self._source_type == "pixels":
+            height, width, channels = view.shape
+            view = memoryview(raster.encode_png(
+             width, height,
+             view.cast("B") if view.c_contiguous else view.tobytes(),
+             channels=channels
+            ))
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+
+
+    _generate_svg = svg.generate_image_svg
+    _iterate_svg = svg.iterate_image_svg
+
+
+
+def process_image_source(source):
+    """Works out what kind of image an :py:class:`.Image` is being made from,
+    and how big it is.
+
+    :param source: The file path or buffer.
+    :raises TypeError: if the source is not a path or a buffer.
+    :raises ValueError: if the source is not an image that can be embedded.
+    :returns: The source's type (``file``, ``encoded`` or ``pixels``), its\
+    MIME type, width and height, as a ``tuple``."""
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            try:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("'%s' is empty" % source) from None
+            with mapped:
+                return ("file", *measure_image(mapped))
+    try:
+        view = memoryview(source)
+    except TypeError:
+        raise TypeError(
+         "Image source must be a path or a buffer, not '%s'" % source
+        ) from None
+    if view.ndim == 3 and view.format == "B" and view.shape[2] in (3, 4):
+        return ("pixels", "image/png", view.shape[1], view.shape[0])
+    if view.ndim == 1 and view.itemsize == 1:
+        return ("encoded", *measure_image(view.cast("B")))
+    raise ValueError(
+     "Image buffers must be image files, or pixels with three or four channels"
+    )
+
+
+def measure_image(data):
+    """Works out the MIME type and size of an image from the bytes of its
+    file. Only as much of the file is looked at as is needed.
+
+    :param data: The bytes of the file, as ``bytes``, an ``mmap`` etc.
+    :raises ValueError: if the file is not a PNG, JPEG or GIF.
+    :returns: The MIME type, width and height, as a ``tuple``."""
+
+    if bytes(data[:8]) == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return ("image/png", *struct.unpack(">II", data[16:24]))
+    if bytes(data[:6]) in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return ("image/gif", *struct.unpack("<HH", data[6:10]))
+    if bytes(data[:2]) == b"\xff\xd8":
+        offset = 2
+        while offset + 9 <= len(data) and data[offset] == 0xFF:
+            marker = data[offset + 1]
+            if marker == 0xFF:
+                offset += 1
+            elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[offset + 5:offset + 9])
+                return ("image/jpeg", width, height)
+            else:
+                offset += 2 + struct.unpack(">H", data[offset + 2:offset + 4])[0]
+    raise ValueError("Images must be PNG, JPEG or GIF files")
@@ -0,0 +1,226 @@
+"""This module contains the sequence which the Canvas keeps its Graphics in,
+so that they can be found and reordered without shifting or re-indexing the
+whole list."""
+
+from bisect import bisect_left
+from itertools import chain
+
+BLOCK_SIZE = 512
+KEY_SPACING = 1024.0
+
+class DrawingOrder:
+    """A sequence of :py:class:`.Graphic` objects in the order they are
+    drawn, from back to front, which can find where a Graphic is and move it
+    elsewhere in logarithmic time.
+
+    The Graphics are held in blocks of a few hundred, and each Graphic has a
+    numeric order key, the keys increasing from back to front. A Graphic's
+    block is found by binary search on the keys, and the number of Graphics
+    in the blocks before it by a Fenwick tree of the block sizes. Moving a
+    Graphic only shifts the contents of the blocks it leaves and joins. A
+    Graphic moved between two others is given a key halfway between theirs,
+    and on the rare occasions that no such key is left, every Graphic is
+    given a new key.
+
+    It can be indexed, iterated over and compared with a ``list`` like a
+    list can.
+
+    :param graphics: The Graphics, from back to front."""
+
+    __slots__ = ("_blocks", "_key_blocks", "_maxes", "_tree", "_keys")
+
+    def __init__(self, graphics=()):
+        self._renumber(list(graphics))
+
+
+    def __repr__(self):
+        return "DrawingOrder(%r)" % list(self)
+
+
+    def __reduce__(self):
+        return (DrawingOrder, (list(self),))
+
+
+    def __len__(self):
+        return len(self._keys)
+
+
+    def __iter__(self):
+        return chain.from_iterable(self._blocks)
+
+
+    def __eq__(self, other):
+        if isinstance(other, (list, DrawingOrder)):
+            return list(self) == list(other)
+        return NotImplemented
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        block, position = self._locate(index)
+        return self._blocks[block][position]
+
+
+    def __delitem__(self, index):
+        block, position = self._locate(index)
+        graphic = self._blocks[block].pop(position)
+        self._key_blocks[block].pop(position)
+        del self._keys[graphic]
+        if self._blocks[block]:
+            self._maxes[block] = self._key_blocks[block][-1]
+            self._resize_block(block, -1)
+        else:
+            del self._blocks[block], self._key_blocks[block], self._maxes[block]
+            self._tree = None
+
+
+    def index(self, graphic):
+        """Finds the position of a Graphic.
+
+        :param Graphic graphic: The Graphic to find.
+        :raises ValueError: if the Graphic is not in the sequence.
+        :rtype: ``int``"""
+
+        key = self._keys.get(graphic)
+        if key is None:
+            raise ValueError("%s is not in the drawing order" % graphic)
+        block = bisect_left(self._maxes, key)
+        return self._count_before(block) + bisect_left(
+         self._key_blocks[block], key
+        )
+
+
+    def append(self, graphic):
+        """Adds a Graphic to the front.
+
+        :param Graphic graphic: The Graphic to add."""
+
+        if not self._blocks or len(self._blocks[-1]) >= BLOCK_SIZE:
+            key = self._maxes[-1] + KEY_SPACING if self._blocks else 0.0
+            self._blocks.append([])
+            self._key_blocks.append([])
+            self._maxes.append(key)
+            self._tree = None
+        else:
+            key = self._maxes[-1] + KEY_SPACING
+        self._blocks[-1].append(graphic)
+        self._key_blocks[-1].append(key)
+        self._maxes[-1] = key
+        self._keys[graphic] = key
+        self._resize_block(len(self._blocks) - 1, 1)
+
+
+    def insert(self, index, graphic):
+        """Inserts a Graphic so that it ends up at a given position.
+
+        :param int index: The position the Graphic will have.
+        :param Graphic graphic: The Graphic to insert."""
+
+        length = len(self)
+        index = max(0, min(index, length))
+        if not length or index == length:
+            self.append(graphic)
+            return
+        if index == 0:
+            key = self._key_blocks[0][0] - KEY_SPACING
+        else:
+            before, after = self._key_at(index - 1), self._key_at(index)
+            key = (before + after) / 2
+            if not before < key < after:
+                graphics = list(self)
+                graphics.insert(index, graphic)
+                self._renumber(graphics)
+                return
+        block = bisect_left(self._maxes, key)
+        keys, graphics = self._key_blocks[block], self._blocks[block]
+        position = bisect_left(keys, key)
+        keys.insert(position, key)
+        graphics.insert(position, graphic)
+        self._maxes[block] = keys[-1]
+        self._keys[graphic] = key
+        if len(keys) > 2 * BLOCK_SIZE:
+            # Blocks are split once they get large, so that shifting the
+            # contents of one stays cheap.
+            self._key_blocks.insert(block + 1, keys[BLOCK_SIZE:])
+            self._blocks.insert(block + 1, graphics[BLOCK_SIZE:])
+            del keys[BLOCK_SIZE:], graphics[BLOCK_SIZE:]
+            self._maxes.insert(block, keys[-1])
+            self._tree = None
+        else:
+            self._resize_block(block, 1)
+
+
+    def move(self, index, new_index):
+        """Moves the Graphic at one position to another.
+
+        :param int index: The Graphic's current position.
+        :param int new_index: The position to move it to."""
+
+        graphic = self[index]
+        del self[index]
+        self.insert(new_index, graphic)
+
+
+    def _locate(self, index):
+        # The block an index falls in, and the position within that block,
+        # found by descending the Fenwick tree.
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("DrawingOrder index out of range")
+        tree = self._get_tree()
+        block, step = 0, 1 << (len(tree) - 1).bit_length()
+        while step:
+            if block + step < len(tree) and tree[block + step] <= index:
+                block += step
+                index -= tree[block]
+            step >>= 1
+        return block, index
+
+
+    def _key_at(self, index):
+        block, position = self._locate(index)
+        return self._key_blocks[block][position]
+
+
+    def _count_before(self, block):
+        # The number of Graphics in the blocks before a block.
+        tree, count = self._get_tree(), 0
+        while block:
+            count += tree[block]
+            block &= block - 1
+        return count
+
+
+    def _resize_block(self, block, change):
+        tree = self._tree
+        if tree is not None:
+            block += 1
+            while block < len(tree):
+                tree[block] += change
+                block += block & -block
+
+
+    def _get_tree(self):
+        # The Fenwick tree is only built again after blocks have been added
+        # or removed.
+        tree = self._tree
+        if tree is None:
+            tree = self._tree = [0, *map(len, self._blocks)]
+            for node in range(1, len(tree)):
+                parent = node + (node & -node)
+                if parent < len(tree):
+                    tree[parent] += tree[node]
+        return tree
+
+
+    def _renumber(self, graphics):
+        keys = [position * KEY_SPACING for position in range(len(graphics))]
+        starts = range(0, len(graphics), BLOCK_SIZE)
+        self._blocks = [graphics[start:start + BLOCK_SIZE] for start in starts]
+        self._key_blocks = [keys[start:start + BLOCK_SIZE] for start in starts]
+        self._maxes = [keys[-1] for keys in self._key_blocks]
+        self._keys = dict(zip(graphics, keys))
+        self._tree = None
@@ -0,0 +1,439 @@
+"""This module contains the raster renderer, which paints Graphics into a
+buffer of pixels and writes them out as a PNG, without needing a browser or
+any other external software."""
+
+import math
+import struct
+import zlib
+from . import graphics
+from .transforms import combine_transforms, apply_transform
+
+MITER_LIMIT = 4
+
+DASH_PATTERNS = {"-": None, "--": (10, 5), "..": (1, 2)}
+
+class Raster:
+    """A grid of RGBA pixels which Graphics can be painted into.
+
+    Pixels are stored in a ``bytearray``, premultiplied by their alpha, so that
+    painting a translucent colour over a span of pixels is the same
+    calculation for every pixel and can be done a whole span at a time. Shapes
+    are filled by scanline, with a pixel painted if its centre is inside the
+    shape - there is no anti-aliasing.
+
+    :param int width: The width in pixels.
+    :param int height: The height in pixels.
+    :param str background_color: The colour to fill the raster with - if not\
+    given, the raster will start off transparent."""
+
+    def __init__(self, width, height, background_color=None):
+        self.width = width
+        self.height = height
+        if background_color is None:
+            self.pixels = bytearray(width * height * 4)
+        else:
+            self.pixels = bytearray(
+             bytes(parse_color(background_color)) + b"\xff"
+            ) * (width * height)
+        self._tables = {}
+
+
+    def paint(self, graphic, transform=None):
+        """Paints a Graphic into the raster. Text and Images are not painted,
+        and the opacity of Groups is not applied.
+
+        :param Graphic graphic: The Graphic to paint.
+        :param tuple transform: An affine transform ``(a, b, c, d, e, f)`` to\
+        apply to the Graphic's coordinates after its own rotation and\
+        transform."""
+
+        transform = transform or (1, 0, 0, 1, 0, 0)
+        if isinstance(graphic, graphics.Instance):
+            transform = combine_transforms(
+             graphic.matrix(), (1, 0, 0, 1, graphic.x(), graphic.y()), transform
+            )
+            self.paint(graphic.template(), transform)
+            return
+        if isinstance(graphic, graphics.Group):
+            transform = combine_transforms(graphic.matrix(), transform)
+            for child in graphic.graphics():
+                self.paint(child, transform)
+            return
+        if isinstance(graphic, (graphics.BoxBatch, graphics.LineBatch)):
+            for row in graphic:
+                self.paint(row, transform)
+            return
+        if isinstance(graphic, (graphics.Text, graphics.Image)):
+            return
+        transform = combine_transforms(graphic.matrix(), transform)
+        if isinstance(graphic, graphics.Heatmap):
+            self.paint_heatmap(graphic, transform)
+            return
+        if isinstance(graphic, graphics.Oval):
+            x, y = graphic.center()
+            x_radius, y_radius = graphic.width() / 2, graphic.height() / 2
+            scale = math.sqrt(abs(transform[0] * transform[3] - transform[1] * transform[2]))
+            sides = max(8, min(360, int(math.pi * max(x_radius, y_radius) * scale)))
+            points = [(
+             x + x_radius * math.cos(2 * math.pi * side / sides),
+             y + y_radius * math.sin(2 * math.pi * side / sides)
+            ) for side in range(sides)]
+            closed = True
+        elif isinstance(graphic, graphics.Rectangle):
+            x, y, width, height = graphic.x(), graphic.y(), graphic.width(), graphic.height()
+            points = [(x, y), (x + width, y), (x + width, y + height), (x, y + height)]
+            closed = True
+        elif isinstance(graphic, graphics.Line):
+            points = [(graphic.x1(), graphic.y1()), (graphic.x2(), graphic.y2())]
+            closed = False
+        elif isinstance(graphic, (graphics.Polygon, graphics.Polyline)):
+            points = list(graphic.coordinates(xy_pairs=True))
+            closed = isinstance(graphic, graphics.Polygon)
+        else:
+            return
+        points = apply_transform(transform, points)
+        if closed:
+            self.fill_polygon(
+             [points], parse_color(graphic.fill_color()), graphic.opacity()
+            )
+        if graphic.line_width():
+            scale = math.sqrt(abs(transform[0] * transform[3] - transform[1] * transform[2]))
+            self.stroke_path(
+             points, graphic.line_width() * scale,
+             parse_color(graphic.line_color()), closed,
+             DASH_PATTERNS[graphic.line_style()]
+            )
+
+
+    def paint_heatmap(self, heatmap, transform):
+        """Paints the merged cells of a Heatmap. If the Heatmap is upright, the
+        pixel edges of each of its columns and rows are worked out once, and
+        each merged cell is painted a span at a time - otherwise they are
+        filled as polygons.
+
+        :param Heatmap heatmap: The Heatmap to paint.
+        :param tuple transform: The affine transform to apply to the cells,\
+        including the Heatmap's own rotation."""
+
+        x, y = heatmap.x(), heatmap.y()
+        width, height = heatmap.cell_width(), heatmap.cell_height()
+        runs = heatmap._runs()
+        a, b, c, d, e, f = transform
+        if b or c or a * width <= 0 or d * height <= 0:
+            for color, column, row, columns, rows in runs:
+                left, top = x + column * width, y + row * height
+                right, bottom = left + columns * width, top + rows * height
+                self.fill_polygon([apply_transform(transform, [
+                 (left, top), (right, top), (right, bottom), (left, bottom)
+                ])], parse_color(color))
+            return
+        lefts = [min(self.width, max(0, math.ceil(
+         a * (x + column * width) + e - 0.5
+        ))) for column in range(heatmap.columns() + 1)]
+        tops = [min(self.height, max(0, math.ceil(
+         d * (y + row * height) + f - 0.5
+        ))) for row in range(heatmap.rows() + 1)]
+        painters = {}
+        for color, column, row, columns, rows in runs:
+            left, right = lefts[column], lefts[column + columns]
+            top, bottom = tops[row], tops[row + rows]
+            if left < right and top < bottom:
+                paint = painters.get(color)
+                if paint is None:
+                    paint = painters[color] = self._span_painter(
+                     parse_color(color), 1
+                    )
+                for start in range(
+                 top * self.width + left, bottom * self.width, self.width
+                ):
+                    paint(start, start + right - left)
+
+
+    def fill_polygon(self, contours, color, opacity=1):
+        """Fills the inside of one or more closed contours, using the non-zero
+        winding rule. Each row of pixels is filled by walking along a table of
+        the edges which cross it.
+
+        :param list contours: Lists of ``(x, y)`` points.
+        :param tuple color: The ``(r, g, b)`` colour to fill with.
+        :param opacity: The opacity of the fill, from 0 to 1."""
+
+        if opacity <= 0:
+            return
+        edges = []
+        for points in contours:
+            for index, (x0, y0) in enumerate(points):
+                x1, y1 = points[index - 1]
+                if y0 == y1:
+                    continue
+                direction = 1
+                if y0 > y1:
+                    x0, y0, x1, y1, direction = x1, y1, x0, y0, -1
+                first = max(0, math.ceil(y0 - 0.5))
+                last = min(self.height, math.ceil(y1 - 0.5))
+                if first < last:
+                    slope = (x1 - x0) / (y1 - y0)
+                    edges.append(
+                     (first, last, x0 + (first + 0.5 - y0) * slope, slope, direction)
+                    )
+        if not edges:
+            return
+        edges.sort(key=lambda edge: edge[0])
+        paint = self._span_painter(color, opacity)
+        width, active, next_edge = self.width, [], 0
+        rows = sorted({edge[0] for edge in edges} | {edge[1] for edge in edges})
+        for first, last in zip(rows, rows[1:]):
+            # Between these rows no edges start or stop.
+            while next_edge < len(edges) and edges[next_edge][0] == first:
+                active.append(list(edges[next_edge][1:]))
+                next_edge += 1
+            active = [edge for edge in active if edge[0] > first]
+            if not active:
+                continue
+            if not any(edge[2] for edge in active):
+                spans = winding_spans(active, width)
+                for row in range(first * width, last * width, width):
+                    for left, right in spans:
+                        paint(row + left, row + right)
+            else:
+                for row in range(first * width, last * width, width):
+                    for left, right in winding_spans(active, width):
+                        paint(row + left, row + right)
+                    for edge in active:
+                        edge[1] += edge[2]
+
+
+    def stroke_path(self, points, width, color, closed=False, dashes=None):
+        """Paints the edge of a path of points, with butt ends and mitred
+        corners.
+
+        :param list points: The ``(x, y)`` points of the path.
+        :param width: The width of the edge in pixels.
+        :param tuple color: The ``(r, g, b)`` colour of the edge.
+        :param bool closed: Whether the path joins back up with its start.
+        :param tuple dashes: The dash and gap lengths of the line pattern, as\
+        multiples of the width, if the edge is not solid."""
+
+        if closed:
+            points = points + points[:1]
+        if dashes:
+            paths = dash_path(points, dashes[0] * width, dashes[1] * width)
+            closed = False
+        else:
+            paths = [points]
+        contours = []
+        for path in paths:
+            contours += stroke_contours(path, width / 2, closed)
+        self.fill_polygon(contours, color)
+
+
+    def _span_painter(self, color, opacity):
+        # Returns a function which paints a colour over pixels start to end.
+        pixels = self.pixels
+        if opacity >= 1:
+            pixel = bytes(color) + b"\xff"
+            def paint(start, end):
+                pixels[start * 4:end * 4] = pixel * (end - start)
+            return paint
+        tables = self._tables.get((color, opacity))
+        if tables is None:
+            tables = self._tables[(color, opacity)] = [bytes([
+             min(255, round(value * opacity + background * (1 - opacity)))
+              for background in range(256)
+            ]) for value in (*color, 255)]
+        def paint(start, end):
+            start, end = start * 4, end * 4
+            for channel, table in enumerate(tables):
+                pixels[start + channel:end:4] =\
+                 pixels[start + channel:end:4].translate(table)
+        return paint
+
+
+    def to_png(self, level=6):
+        """Encodes the raster as a PNG file.
+
+        :param int level: The zlib compression level, from 0 to 9.
+        :rtype: ``bytes``"""
+
+        pixels = self.pixels
+        alphas = pixels[3::4]
+        if alphas.translate(None, b"\x00\xff"):
+            # Pixels which are neither transparent nor opaque need their
+            # colours taking back out of premultiplied form.
+            pixels = bytearray(pixels)
+            for index, alpha in enumerate(alphas):
+                if 0 < alpha < 255:
+                    for offset in range(index * 4, index * 4 + 3):
+                        pixels[offset] = min(255, round(pixels[offset] * 255 / alpha))
+        return encode_png(self.width, self.height, pixels, level)
+
+
+
+def generate_canvas_png(canvas, scale=1):
+    if not isinstance(scale, int) and not isinstance(scale, float):
+        raise TypeError("scale must be numeric, not '%s'" % scale)
+    if scale <= 0:
+        raise ValueError("scale must be positive, not %s" % str(scale))
+    raster = Raster(
+     max(1, round(canvas.width() * scale)),
+     max(1, round(canvas.height() * scale)),
+     canvas.background_color()
+    )
+    transform = (scale, 0, 0, scale, 0, 0)
+    for graphic in canvas.graphics():
+        raster.paint(graphic, transform)
+    return raster.to_png()
+
+
+def winding_spans(edges, width):
+    """Works out which pixels of a row are inside a shape, from the edges
+    which cross the row, using the non-zero winding rule.
+
+    :param list edges: The ``[last row, x, slope, direction]`` of each edge.
+    :param int width: The width of the row in pixels.
+    :rtype: ``list``"""
+
+    edges.sort(key=lambda edge: edge[1])
+    spans, winding = [], 0
+    for edge in edges:
+        if not winding:
+            start = edge[1]
+        winding += edge[3]
+        if not winding:
+            left = max(0, math.ceil(start - 0.5))
+            right = min(width, math.ceil(edge[1] - 0.5))
+            if left < right:
+                spans.append((left, right))
+    return spans
+
+
+def parse_color(color):
+    """Turns a ``#RRGGBB`` colour into a tuple of its red, green and blue
+    values.
+
+    :param str color: The colour.
+    :rtype: ``tuple``"""
+
+    return (int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16))
+
+
+def dash_path(points, dash, gap):
+    """Breaks a path into the dashes of a line pattern.
+
+    :param list points: The ``(x, y)`` points of the path.
+    :param dash: The length of each dash.
+    :param gap: The length of each gap.
+    :rtype: ``list``"""
+
+    paths, current, drawing, remaining = [], [points[0]], True, dash
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        travelled = 0
+        while length - travelled > remaining:
+            travelled += remaining
+            point = (
+             x0 + (x1 - x0) * travelled / length,
+             y0 + (y1 - y0) * travelled / length
+            )
+            if drawing:
+                current.append(point)
+                paths.append(current)
+            current = [point]
+            drawing = not drawing
+            remaining = gap if not drawing else dash
+        remaining -= length - travelled
+        current.append((x1, y1))
+    if drawing and len(current) > 1:
+        paths.append(current)
+    return paths
+
+
+def stroke_contours(points, half_width, closed):
+    """Works out the outline of the edge of a path, as a list of contours which
+    all wind the same way - one for each segment and one for each corner.
+
+    :param list points: The ``(x, y)`` points of the path.
+    :param half_width: Half the width of the edge.
+    :param bool closed: Whether the last point joins up with the first.
+    :rtype: ``list``"""
+
+    segments = []
+    for (x0, y0), (x1, y1) in zip(points, points[1:]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        if length:
+            segments.append((x0, y0, x1, y1, (y0 - y1) / length, (x1 - x0) / length))
+    contours = [[
+     (x0 + nx * half_width, y0 + ny * half_width),
+     (x1 + nx * half_width, y1 + ny * half_width),
+     (x1 - nx * half_width, y1 - ny * half_width),
+     (x0 - nx * half_width, y0 - ny * half_width)
+    ] for x0, y0, x1, y1, nx, ny in segments]
+    joins = list(zip(segments, segments[1:]))
+    if closed and len(segments) > 1:
+        joins.append((segments[-1], segments[0]))
+    for first, second in joins:
+        x, y = second[0], second[1]
+        nx1, ny1, nx2, ny2 = first[4], first[5], second[4], second[5]
+        side = -1 if nx1 * (second[2] - x) + ny1 * (second[3] - y) > 0 else 1
+        corner1 = (x + side * nx1 * half_width, y + side * ny1 * half_width)
+        corner2 = (x + side * nx2 * half_width, y + side * ny2 * half_width)
+        mx, my = nx1 + nx2, ny1 + ny2
+        cosine = math.hypot(mx, my) / 2
+        if cosine and 1 / cosine <= MITER_LIMIT:
+            miter = half_width / (cosine * cosine * 2)
+            join = [(x, y), corner1, (x + side * mx * miter, y + side * my * miter), corner2]
+        else:
+            join = [(x, y), corner1, corner2]
+        if signed_area(join) * signed_area(contours[0]) < 0:
+            join.reverse()
+        contours.append(join)
+    return contours
+
+
+def signed_area(points):
+    """Returns the signed area of a polygon, whose sign depends on which way
+    round its points go.
+
+    :param list points: The ``(x, y)`` points.
+    :rtype: ``float``"""
+
+    return sum(
+     x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1])
+    ) / 2
+
+
+def encode_png(width, height, pixels, level=6, channels=4):
+    """Encodes RGBA pixels, which are not premultiplied, as a PNG file.
+
+    :param int width: The width in pixels.
+    :param int height: The height in pixels.
+    :param bytes pixels: The pixels, four bytes each, row by row.
+    :param int level: The zlib compression level, from 0 to 9.
+    :param int channels: The number of bytes per pixel - 3 if the pixels are\
+    RGB rather than RGBA.
+    :rtype: ``bytes``"""
+
+    stride = width * channels
+    data = b"".join([
+     b"\x00" + pixels[row:row + stride] for row in range(0, len(pixels), stride)
+    ])
+    return b"".join((
+     b"\x89PNG\r\n\x1a\n",
+     png_chunk(b"IHDR", struct.pack(
+      ">IIBBBBB", width, height, 8, 6 if channels == 4 else 2, 0, 0, 0
+     )),
+     png_chunk(b"IDAT", zlib.compress(data, level)),
+     png_chunk(b"IEND", b"")
+    ))
+
+
+def png_chunk(kind, data):
+    """Creates a chunk of a PNG file.
+
+    :param bytes kind: The four letter chunk type.
+    :param bytes data: The contents of the chunk.
+    :rtype: ``bytes``"""
+
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(
+     ">I", zlib.crc32(kind + data) & 0xffffffff
+    )
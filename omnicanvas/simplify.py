@@ -0,0 +1,115 @@
+"""This module contains the functions used to simplify the paths of Polylines
+and Polygons, so that paths with far more vertices than can be seen are drawn
+with only as many as are needed."""
+
+from itertools import compress, count, islice, repeat
+from operator import floordiv, ne
+
+def simplify_coordinates(coordinates, tolerance, closed=False):
+    """Removes vertices from a path which make no visible difference to it,
+    so that no vertex of the original path is more than ``tolerance`` away
+    from the simplified one.
+
+    The path is first divided into runs of consecutive vertices which fall in
+    the same vertical strip, and each run is cut down to its first, last,
+    highest and lowest vertices. This quickly thins out very dense paths, such
+    as a time series with many vertices per pixel. The Douglas-Peucker
+    algorithm then removes vertices which lie close to straight lines. Each
+    step is given half of the tolerance.
+
+    :param coordinates: The alternating x and y values of the path.
+    :param tolerance: The largest distance a vertex can be from the\
+    simplified path and be removed.
+    :param bool closed: If ``True``, the path is treated as a closed loop, and\
+    at least three vertices will be kept.
+    :rtype: ``list``"""
+
+    xs, ys = list(coordinates[::2]), list(coordinates[1::2])
+    minimum = 3 if closed else 2
+    if tolerance <= 0 or len(xs) <= minimum:
+        return list(coordinates)
+    indices = decimate_strips(xs, ys, tolerance / 2)
+    if closed:
+        indices.append(indices[0])
+    kept = [indices[index] for index in douglas_peucker(
+     [xs[index] for index in indices], [ys[index] for index in indices],
+     tolerance / 2
+    )]
+    if closed:
+        kept.pop()
+        if len(kept) < minimum:
+            # The whole loop is smaller than the tolerance, but it must
+            # remain a polygon.
+            kept = [0, len(xs) // 3, 2 * len(xs) // 3]
+    simplified = []
+    for index in kept:
+        simplified += (xs[index], ys[index])
+    return simplified
+
+
+def decimate_strips(xs, ys, width):
+    """Divides a path into runs of consecutive vertices in the same vertical
+    strip, and cuts each run down to its first, last, highest and lowest
+    vertices. Every vertex of a run is then within the strip's width of the
+    path through the vertices that are kept.
+
+    :param list xs: The x values of the vertices.
+    :param list ys: The y values of the vertices.
+    :param width: The width of the strips.
+    :returns: The indices of the vertices to keep, as a ``list``."""
+
+    strips = list(map(floordiv, xs, repeat(width)))
+    starts = [0, *compress(count(1), map(ne, strips, islice(strips, 1, None)))]
+    kept = []
+    for start, end in zip(starts, starts[1:] + [len(xs)]):
+        if end - start <= 2:
+            kept += range(start, end)
+        else:
+            run = ys[start:end]
+            lowest = start + run.index(min(run))
+            highest = start + run.index(max(run))
+            kept += sorted({start, lowest, highest, end - 1})
+    return kept
+
+
+def douglas_peucker(xs, ys, tolerance):
+    """Works out which vertices of a path to keep using the Douglas-Peucker
+    algorithm - a vertex is kept if it is further than the tolerance from the
+    line segment between the vertices kept either side of it.
+
+    :param list xs: The x values of the vertices.
+    :param list ys: The y values of the vertices.
+    :param tolerance: The tolerance.
+    :returns: The indices of the vertices to keep, as a ``list``."""
+
+    keep = [False] * len(xs)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(xs) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        x0, y0, x1, y1 = xs[start], ys[start], xs[end], ys[end]
+        dx, dy = x1 - x0, y1 - y0
+        length = dx * dx + dy * dy
+        # The ends of the segment may be the same point.
+        scale = length or 1
+        furthest, distance = start, 0
+        for index in range(start + 1, end):
+            # Squared distances from the line segment, scaled up by its
+            # squared length.
+            x, y = xs[index], ys[index]
+            along = (x - x0) * dx + (y - y0) * dy
+            if along <= 0:
+                offset = ((x - x0) ** 2 + (y - y0) ** 2) * scale
+            elif along >= length:
+                offset = ((x - x1) ** 2 + (y - y1) ** 2) * scale
+            else:
+                offset = ((x - x0) * dy - (y - y0) * dx) ** 2
+            if offset > distance:
+                furthest, distance = index, offset
+        if distance > tolerance * tolerance * scale:
+            keep[furthest] = True
+            stack.append((start, furthest))
+            stack.append((furthest, end))
+    return [index for index, kept in enumerate(keep) if kept]
@@ -0,0 +1,267 @@
+"""This module contains the spatial index used by the Canvas to find Graphics
+by location without looking at every one of them."""
+
+import math
+from array import array
+
+GRAPHICS_PER_CELL = 8
+MIN_CELL_SIZE = 4
+
+class SpatialIndex:
+    """A uniform grid of square cells, each of which knows which
+    :py:class:`.Graphic` objects have a bounding box overlapping it.
+
+    Graphics which would cover a very large number of cells are kept in a
+    separate collection which is checked on every query instead.
+
+    Graphics whose geometry changes are only marked as moved - they are placed
+    back on the grid the next time the index is queried.
+
+    Batches are placed on the grid as a whole, but the first query which
+    finds a batch also puts its rows on a grid of their own, so that the rows
+    which match can be found without checking all of them. The rows' grid is
+    discarded whenever the batch moves.
+
+    :param list graphics: The list of Graphics to index. The index remembers\
+    which list it was built from.
+    :param cell_size: The width and height of each cell in pixels (see\
+    :py:func:`choose_cell_size`).
+    :param int max_cells: The most cells a Graphic can cover before it is\
+    treated as large."""
+
+    def __init__(self, graphics, cell_size, max_cells=64):
+        self.graphics = graphics
+        self._cell_size = cell_size
+        self._max_cells = max_cells
+        self._cells = {}
+        self._large = {}
+        self._locations = {}
+        self._moved = {}
+        self._row_grids = {}
+        for graphic in graphics:
+            self.add(graphic)
+
+
+    def __len__(self):
+        return len(self._locations)
+
+
+    def cell_size(self):
+        """Returns the width and height of each cell in pixels.
+
+        :rtype: ``float``"""
+
+        return self._cell_size
+
+
+    def add(self, graphic):
+        """Adds a Graphic to the grid.
+
+        :param Graphic graphic: The Graphic to add."""
+
+        min_x, min_y, max_x, max_y = graphic._get_bounds()
+        size = self._cell_size
+        location = (
+         int(min_x // size), int(min_y // size),
+         int(max_x // size), int(max_y // size)
+        )
+        columns = location[2] - location[0] + 1
+        rows = location[3] - location[1] + 1
+        if columns * rows > self._max_cells:
+            self._large[graphic] = None
+            self._locations[graphic] = None
+        else:
+            cells = self._cells
+            for column in range(location[0], location[2] + 1):
+                for row in range(location[1], location[3] + 1):
+                    cell = cells.get((column, row))
+                    if cell is None:
+                        cell = cells[(column, row)] = {}
+                    cell[graphic] = None
+            self._locations[graphic] = location
+
+
+    def remove(self, graphic):
+        """Removes a Graphic from the grid.
+
+        :param Graphic graphic: The Graphic to remove."""
+
+        self._moved.pop(graphic, None)
+        self._row_grids.pop(graphic, None)
+        location = self._locations.pop(graphic)
+        if location is None:
+            del self._large[graphic]
+        else:
+            cells = self._cells
+            for column in range(location[0], location[2] + 1):
+                for row in range(location[1], location[3] + 1):
+                    cell = cells[(column, row)]
+                    del cell[graphic]
+                    if not cell:
+                        del cells[(column, row)]
+
+
+    def move(self, graphic):
+        """Marks a Graphic as having moved, so that it will be re-filed before
+        the next query.
+
+        :param Graphic graphic: The Graphic which has moved."""
+
+        if graphic in self._locations:
+            self._moved[graphic] = None
+
+
+    def _refresh(self):
+        if self._moved:
+            moved, self._moved = self._moved, {}
+            for graphic in moved:
+                self.remove(graphic)
+                self.add(graphic)
+
+
+    def at(self, x, y):
+        """Returns the Graphics whose bounding boxes contain a point. Batches
+        are not returned themselves - the views of their rows which contain
+        the point are.
+
+        :param x: The x-coordinate of the point.
+        :param y: The y-coordinate of the point.
+        :rtype: ``list``"""
+
+        self._refresh()
+        size = self._cell_size
+        cell = self._cells.get((int(x // size), int(y // size)), {})
+        return _views([
+         (graphic, self._rows_in(graphic, (x, y, x, y)))
+          for candidates in (cell, self._large) for graphic in candidates
+           if _contains(graphic._get_bounds(), x, y)
+        ])
+
+
+    def within(self, x, y, width, height):
+        """Returns the Graphics whose bounding boxes overlap a region. Batches
+        are not returned themselves - the views of their rows which overlap
+        the region are.
+
+        :param x: The x-coordinate of the region's upper left corner.
+        :param y: The y-coordinate of the region's upper left corner.
+        :param width: The region's width.
+        :param height: The region's height.
+        :rtype: ``list``"""
+
+        return _views(self.rows_within(x, y, width, height))
+
+
+    def rows_within(self, x, y, width, height):
+        """Returns the Graphics whose bounding boxes overlap a region, as
+        ``(graphic, rows)`` pairs. For batches, ``rows`` is a list of the
+        rows which overlap the region, and batches with no such rows are left
+        out. For other Graphics it is ``None``.
+
+        :param x: The x-coordinate of the region's upper left corner.
+        :param y: The y-coordinate of the region's upper left corner.
+        :param width: The region's width.
+        :param height: The region's height.
+        :rtype: ``list``"""
+
+        self._refresh()
+        region = (x, y, x + width, y + height)
+        candidates = {}
+        for cell in _cells_in(self._cells, region, self._cell_size):
+            candidates.update(cell)
+        candidates.update(self._large)
+        return [(graphic, self._rows_in(graphic, region))
+         for graphic in candidates if _overlaps(graphic._get_bounds(), region)]
+
+
+    def _rows_in(self, graphic, region):
+        # The rows of a batch which overlap a region, in order.
+        if not hasattr(graphic, "_row_bounds"):
+            return None
+        grid = self._row_grids.get(graphic)
+        if grid is None:
+            grid = self._row_grids[graphic] = _build_row_grid(
+             graphic, self._max_cells
+            )
+        bounds, size, cells, large = grid
+        candidates = set(large)
+        for cell in _cells_in(cells, region, size):
+            candidates.update(cell)
+        min_xs, min_ys, max_xs, max_ys = bounds
+        return sorted([row for row in candidates if min_xs[row] <= region[2]
+         and region[0] <= max_xs[row] and min_ys[row] <= region[3]
+          and region[1] <= max_ys[row]])
+
+
+
+def choose_cell_size(count, width, height):
+    """Works out how large the cells of a :py:class:`.SpatialIndex` should be
+    for some number of Graphics spread over an area, so that there are about
+    ``GRAPHICS_PER_CELL`` Graphics in each cell however densely they are
+    packed. Cells are never smaller than ``MIN_CELL_SIZE`` pixels.
+
+    :param int count: The number of Graphics.
+    :param width: The width of the area.
+    :param height: The height of the area.
+    :rtype: ``float``"""
+
+    return max(MIN_CELL_SIZE, math.sqrt(
+     width * height * GRAPHICS_PER_CELL / max(count, 1)
+    ))
+
+
+def _build_row_grid(batch, max_cells):
+    # The bounds of a batch's rows as four columns, the size of the grid's
+    # cells, the rows overlapping each cell, and the rows which cover too many
+    # cells to be put on the grid.
+    min_x, min_y, max_x, max_y = batch._get_bounds()
+    size = choose_cell_size(len(batch), max_x - min_x, max_y - min_y)
+    bounds = tuple(array("d") for _ in range(4))
+    cells, large = {}, array("l")
+    for row, (min_x, min_y, max_x, max_y) in enumerate(batch._row_bounds()):
+        for column, value in zip(bounds, (min_x, min_y, max_x, max_y)):
+            column.append(value)
+        first_column, first_row = int(min_x // size), int(min_y // size)
+        last_column, last_row = int(max_x // size), int(max_y // size)
+        if (last_column - first_column + 1) * (last_row - first_row + 1)\
+         > max_cells:
+            large.append(row)
+            continue
+        for column in range(first_column, last_column + 1):
+            for cell_row in range(first_row, last_row + 1):
+                cell = cells.get((column, cell_row))
+                if cell is None:
+                    cell = cells[(column, cell_row)] = array("l")
+                cell.append(row)
+    return bounds, size, cells, large
+
+
+def _cells_in(cells, region, size):
+    # The cells of a grid which overlap a region - if the region covers more
+    # cells than the grid has, it is quicker to go through all of them.
+    first_column, first_row = int(region[0] // size), int(region[1] // size)
+    last_column, last_row = int(region[2] // size), int(region[3] // size)
+    if (last_column - first_column + 1) * (last_row - first_row + 1)\
+     > len(cells):
+        return list(cells.values())
+    return [cells[key] for key in (
+     (column, row) for column in range(first_column, last_column + 1)
+      for row in range(first_row, last_row + 1)
+    ) if key in cells]
+
+
+def _views(found):
+    # Replaces the batches among some (graphic, rows) pairs with the views of
+    # their rows.
+    return [view for graphic, rows in found for view in (
+     (graphic,) if rows is None else map(graphic.__getitem__, rows)
+    )]
+
+
+def _contains(bounds, x, y):
+    return bounds[0] <= x <= bounds[2] and bounds[1] <= y <= bounds[3]
+
+
+def _overlaps(bounds, region):
+    return (bounds[0] <= region[2] and region[0] <= bounds[2]
+     and bounds[1] <= region[3] and region[1] <= bounds[3])
@@ -1,87 +1,256 @@
-def generate_graphic_svg(graphic, include_fill=None):
-    width = "stroke-width:%.1f;" % graphic.line_width()
+import base64
+import hashlib
+import io
+import operator
+import re
+from array import array
+from itertools import chain, repeat
+from .simplify import simplify_coordinates
+from .transforms import IDENTITY
+from . import raster
+
+class SvgFormat:
+    """Describes how numbers and colours are written out when generating SVG.
+    The generators below are written in terms of the default format, with
+    numbers to one decimal place, and adapt their templates to others.
+
+    :param int precision: The number of decimal places to give numbers to.
+    :param bool minify: If ``True``, the output is made as small as possible\
+    - trailing zeros are stripped from numbers, colours are shortened where\
+    possible, and styling which makes no difference to how the SVG looks is\
+    left out.
+    :param tolerance: If not zero, the paths of Polylines and Polygons are\
+    simplified, so that none of their vertices move by more than this."""
+
+    __slots__ = ("precision", "minify", "tolerance", "field", "_templates")
+
+    def __init__(self, precision=1, minify=False, tolerance=0):
+        self.precision = precision
+        self.minify = minify
+        self.tolerance = tolerance
+        self.field = "%s" if minify else "%%.%if" % precision
+        self._templates = {}
+
+
+    def template(self, template):
+        """Adapts a template written with ``%.1f`` number fields to this
+        format. Its numbers must then be passed through :py:meth:`numbers`.
+
+        :param str template: The template to adapt.
+        :rtype: ``str``"""
+
+        adapted = self._templates.get(template)
+        if adapted is None:
+            adapted = template.replace("%.1f", self.field)
+            if self.minify:
+                adapted = adapted.replace(" />", "/>")
+            self._templates[template] = adapted
+        return adapted
+
+
+    def number(self, value, precision=None):
+        """Writes out a single number.
+
+        :param value: The number to write.
+        :param int precision: The number of decimal places to use, if not\
+        the format's own.
+        :rtype: ``str``"""
+
+        text = "%.*f" % (self.precision if precision is None else precision, value)
+        if self.minify and "." in text:
+            text = text.rstrip("0").rstrip(".")
+            if text == "-0":
+                text = "0"
+            elif text.startswith("0."):
+                text = text[1:]
+            elif text.startswith("-0."):
+                text = "-" + text[2:]
+        return text
+
+
+    def numbers(self, *values):
+        """Prepares numbers to fill the number fields of an adapted template.
+
+        :param \*values: The numbers.
+        :rtype: ``tuple``"""
+
+        return tuple(map(self.number, values)) if self.minify else values
+
+
+    def points(self, coordinates):
+        """Writes out a sequence of alternating x and y values as the value of
+        a ``points`` attribute.
+
+        :param coordinates: The x and y values.
+        :rtype: ``str``"""
+
+        if self.minify:
+            values = list(map(self.number, coordinates))
+            return " ".join(map(",".join, zip(values[::2], values[1::2])))
+        pair = "%s,%s" % (self.field, self.field)
+        return ", ".join([pair] * (len(coordinates) // 2)) % tuple(coordinates)
+
+
+    def color(self, color):
+        """Writes out a colour, using the three digit form when minifying if
+        the colour has one.
+
+        :param str color: The colour in ``#RRGGBB`` form.
+        :rtype: ``str``"""
+
+        if self.minify and color[1] == color[2] and color[3] == color[4]\
+         and color[5] == color[6]:
+            return color[::2]
+        return color
+
+
+
+DEFAULT_FORMAT = SvgFormat()
+
+
+def generate_graphic_svg(graphic, include_fill=None, svg_format=DEFAULT_FORMAT):
+    line_width = graphic.line_width()
+    if svg_format.minify and not line_width:
+        return "fill:none;" if include_fill else ""
+    number = svg_format.number
+    width = "stroke-width:%s;" % number(line_width)
     pattern = "stroke-dasharray:%s;" % {
      "-": "1,0",
-     "--": "%.1f,%.1f" % (10 * graphic.line_width(), 5 * graphic.line_width()),
-     "..": "%.1f,%.1f" % (1 * graphic.line_width(), 2 * graphic.line_width())
+     "--": "%s,%s" % (number(10 * line_width), number(5 * line_width)),
+     "..": "%s,%s" % (number(1 * line_width), number(2 * line_width))
     }[graphic.line_style()]
 
     return "%sstroke:%s;%s%s" % (
      "fill:none;" if include_fill else "",
-     graphic.line_color(),
-     width if graphic.line_width() != 1 else "",
+     svg_format.color(graphic.line_color()),
+     width if line_width != 1 else "",
      pattern if graphic.line_style() != "-" else ""
     )
 
 
-def generate_rotation_svg(graphic):
-    return (' transform="rotate(%.1f %.1f %.1f)"' % (
-     graphic.rotation()[2], graphic.rotation()[0], graphic.rotation()[1]
-    )) if graphic.rotation() != (0, 0, 0) else ""
+def generate_rotation_svg(graphic, svg_format=DEFAULT_FORMAT):
+    if graphic._transform != IDENTITY:
+        # The rotation and transform are written as one compiled matrix, with
+        # values which are only off zero by rounding error written as zero.
+        a, b, c, d, e, f = [round(value, 9) or 0 for value in graphic.matrix()]
+        return svg_format.template(MATRIX_SVG) % (
+         "%.6g" % a, "%.6g" % b, "%.6g" % c, "%.6g" % d,
+         *svg_format.numbers(e, f)
+        )
+    rotation = graphic.rotation()
+    return (svg_format.template(ROTATION_SVG) % svg_format.numbers(
+     rotation[2], rotation[0], rotation[1]
+    )) if rotation != (0, 0, 0) else ""
 
 
 def generate_data_svg(graphic):
     return " " + " ".join(
-     ['%s="%s"' % (str(key), str(graphic.data()[key])) for key in graphic.data()]
-    ) if graphic.data() else ""
+     ['%s="%s"' % (str(key), str(graphic._data[key])) for key in graphic._data]
+    ) if graphic._data else ""
+
+
+def generate_style_svg(style):
+    """Turns the style of an element into its ``style`` attribute, which is
+    left out altogether when there is no style - as there can be once
+    minified, when every property has its default value.
+
+    :param str style: The element's style.
+    :rtype: ``str``"""
+
+    return ' style="%s"' % style if style else ""
 
 
-def generate_shape_svg(shape):
-    opacity = "fill-opacity:%.3f;" % shape.opacity()
-    return "fill:%s;%s%s" % (
-     shape.fill_color(),
+def generate_shape_svg(shape, svg_format=DEFAULT_FORMAT):
+    opacity = "fill-opacity:%s;" % svg_format.number(shape.opacity(), 3)
+    fill = "fill:%s;" % svg_format.color(shape.fill_color())
+    return "%s%s%s" % (
+     "" if svg_format.minify and shape.fill_color() == "#000000" else fill,
      opacity if shape.opacity() != 1 else "",
-     shape.graphic_svg()
+     shape.graphic_svg(svg_format=svg_format)
     )
 
 
-def generate_rectangle_svg(rectangle):
-    return '<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" style="%s"%s%s />' % (
-     rectangle.x(),
-     rectangle.y(),
-     rectangle.width(),
-     rectangle.height(),
-     rectangle.shape_svg(),
-     rectangle.rotation_svg(),
+ROWS_PER_BLOCK = 1024
+
+ROTATION_SVG = ' transform="rotate(%.1f %.1f %.1f)"'
+
+MATRIX_SVG = ' transform="matrix(%s %s %s %s %.1f %.1f)"'
+
+RECTANGLE_SVG = '<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f"%s%s%s />'
+
+LINE_SVG = '<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f"%s%s%s />'
+
+OVAL_SVG = '<ellipse cx="%.1f" cy="%.1f" rx="%.1f" ry="%.1f"%s%s%s />'
+
+POLYGON_SVG = '<polygon points="%s"%s%s%s />'
+
+POLYLINE_SVG = '<polyline points="%s"%s%s%s />'
+
+TEXT_SVG = '<text x="%.1f" y="%.1f" text-anchor="%s" alignment-baseline="%s" style="font-size:%.1f;%s"%s%s>%s</text>'
+
+INSTANCE_SVG = '<use href="#%s" x="%.1f" y="%.1f"%s%s />'
+
+GROUP_SVG = '<g%s%s%s>\n%s\n</g>'
+
+HEATMAP_SVG = '<g shape-rendering="crispEdges"%s%s>\n%s\n</g>'
+
+HEATMAP_COLOR_SVG = '<g style="fill:%s;">\n%s\n</g>'
+
+HEATMAP_CELL_SVG = '<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" />'
+
+HEATMAP_IMAGE_SVG = '<image x="%.1f" y="%.1f" width="%.1f" height="%.1f" preserveAspectRatio="none" style="image-rendering:pixelated;" href="data:image/png;base64,%s" />'
+
+HEATMAP_RECT_BYTES = 48
+
+IMAGE_SVG = '<image x="%.1f" y="%.1f" width="%.1f" height="%.1f" preserveAspectRatio="none"%s%s%s href="data:%s;base64,%s" />'
+
+IMAGE_CHUNK_SIZE = 3 * 16384
+
+
+def generate_rectangle_svg(rectangle, svg_format=DEFAULT_FORMAT):
+    return svg_format.template(RECTANGLE_SVG) % (
+     *svg_format.numbers(
+      rectangle.x(), rectangle.y(), rectangle.width(), rectangle.height()
+     ),
+     generate_style_svg(rectangle.shape_svg(svg_format)),
+     rectangle.rotation_svg(svg_format),
      rectangle.data_svg()
     )
 
 
-def generate_line_svg(line):
-    return '<line x1="%.1f" y1="%.1f" x2="%.1f" y2="%.1f" style="%s"%s%s />' % (
-     line.x1(),
-     line.y1(),
-     line.x2(),
-     line.y2(),
-     line.graphic_svg(),
-     line.rotation_svg(),
+def generate_line_svg(line, svg_format=DEFAULT_FORMAT):
+    return svg_format.template(LINE_SVG) % (
+     *svg_format.numbers(line.x1(), line.y1(), line.x2(), line.y2()),
+     generate_style_svg(line.graphic_svg(svg_format=svg_format)),
+     line.rotation_svg(svg_format),
      line.data_svg()
     )
 
 
-def generate_polygon_svg(polygon):
-    return '<polygon points="%s" style="%s"%s%s />' % (
-     ", ".join(["%.1f,%.1f" % (
-      point[0], point[1]
-     ) for point in polygon.coordinates(xy_pairs=True)]),
-     polygon.shape_svg(),
-     polygon.rotation_svg(),
+def generate_polygon_svg(polygon, svg_format=DEFAULT_FORMAT):
+    coordinates = polygon._coordinates
+    if svg_format.tolerance:
+        coordinates = simplify_coordinates(
+         coordinates, svg_format.tolerance, closed=True
+        )
+    return svg_format.template(POLYGON_SVG) % (
+     svg_format.points(coordinates),
+     generate_style_svg(polygon.shape_svg(svg_format)),
+     polygon.rotation_svg(svg_format),
      polygon.data_svg(),
     )
 
 
-def generate_oval_svg(oval):
-    return '<ellipse cx="%.1f" cy="%.1f" rx="%.1f" ry="%.1f" style="%s"%s%s />' % (
-     *oval.center(),
-     oval.width() / 2,
-     oval.height() / 2,
-     oval.shape_svg(),
-     oval.rotation_svg(),
+def generate_oval_svg(oval, svg_format=DEFAULT_FORMAT):
+    return svg_format.template(OVAL_SVG) % (
+     *svg_format.numbers(*oval.center(), oval.width() / 2, oval.height() / 2),
+     generate_style_svg(oval.shape_svg(svg_format)),
+     oval.rotation_svg(svg_format),
      oval.data_svg()
     )
 
 
-def generate_text_svg(text):
+def generate_text_svg(text, svg_format=DEFAULT_FORMAT):
     horizontal_align = {
      "left": "end",
      "center": "middle",
@@ -92,46 +261,525 @@ def generate_text_svg(text):
      "center": "middle",
      "bottom": "hanging"
     }[text.vertical_align()]
-    return '<text x="%.1f" y="%.1f" text-anchor="%s" alignment-baseline="%s" style="font-size:%.1f;%s"%s%s>%s</text>' % (
-     text.x(),
-     text.y(),
+    x, y, font_size = svg_format.numbers(text.x(), text.y(), text.font_size())
+    return svg_format.template(TEXT_SVG) % (
+     x,
+     y,
      horizontal_align,
      vertical_align,
-     text.font_size(),
-     text.shape_svg(),
-     text.rotation_svg(),
+     font_size,
+     text.shape_svg(svg_format),
+     text.rotation_svg(svg_format),
      text.data_svg(),
      text.text()
     )
 
 
-def generate_polyline_svg(polyline):
-    return '<polyline points="%s" style="%s"%s%s />' % (
-     ", ".join(["%.1f,%.1f" % (
-      point[0], point[1]
-     ) for point in polyline.coordinates(xy_pairs=True)]),
-     polyline.graphic_svg(include_fill=True),
-     polyline.rotation_svg(),
+def generate_polyline_svg(polyline, svg_format=DEFAULT_FORMAT):
+    coordinates = polyline._coordinates
+    if svg_format.tolerance:
+        coordinates = simplify_coordinates(coordinates, svg_format.tolerance)
+    return svg_format.template(POLYLINE_SVG) % (
+     svg_format.points(coordinates),
+     generate_style_svg(
+      polyline.graphic_svg(include_fill=True, svg_format=svg_format)
+     ),
+     polyline.rotation_svg(svg_format),
      polyline.data_svg(),
     )
 
 
-SVG_BASE = """<?xml version="1.0" encoding="UTF-8"?>
+def generate_instance_svg(instance, svg_format=DEFAULT_FORMAT):
+    return svg_format.template(INSTANCE_SVG) % (
+     generate_template_id(instance.template()),
+     *svg_format.numbers(instance.x(), instance.y()),
+     instance.rotation_svg(svg_format),
+     instance.data_svg()
+    )
+
+
+def generate_group_svg(group, svg_format=DEFAULT_FORMAT):
+    return "".join(iterate_group_svg(group, svg_format))
+
+
+def iterate_group_svg(group, svg_format=DEFAULT_FORMAT):
+    """Yields the SVG of a Group piece by piece, streaming the data of any
+    Images inside it rather than holding it as text.
+
+    :param Group group: The Group.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :rtype: ``generator``"""
+
+    for piece in split_group_svg(group, svg_format):
+        if isinstance(piece, str):
+            yield piece
+        else:
+            yield from piece._iterate_svg(svg_format)
+
+
+def split_group_svg(group, svg_format=DEFAULT_FORMAT):
+    """Splits the SVG of a Group into pieces of text and the Images inside
+    it, whose SVG is left to be streamed.
+
+    :param Group group: The Group.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :rtype: ``list``"""
+
+    opacity = group.opacity()
+    start, end = (GROUP_SVG % (
+     ' opacity="%s"' % svg_format.number(opacity, 3) if opacity != 1 else "",
+     group.rotation_svg(svg_format),
+     group.data_svg(),
+     "\0"
+    )).split("\0")
+    return [start, *get_group_contents(group, svg_format), end]
+
+
+def get_group_contents(group, svg_format=DEFAULT_FORMAT):
+    """Splits the SVG of the Graphics in a Group into pieces of text and the
+    Images among them, including those in Groups inside the Group. There is
+    always one more piece of text than there are Images.
+
+    The default pieces are cached apart from the Group's opening tag, so that
+    changes to the Group itself don't rewrite them, but Images are never kept
+    as text.
+
+    :param Group group: The Group.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :rtype: ``list``"""
+
+    if svg_format is DEFAULT_FORMAT and group._contents is not None:
+        return group._contents
+    pieces, text = [], []
+    for index, graphic in enumerate(group._graphics):
+        if index:
+            text.append("\n")
+        if hasattr(graphic, "_iterate_svg"):
+            graphic_pieces = (graphic,)
+        elif hasattr(graphic, "_graphics"):
+            graphic_pieces = split_group_svg(graphic, svg_format)
+        elif svg_format is DEFAULT_FORMAT:
+            graphic_pieces = (graphic.to_svg(),)
+        else:
+            graphic_pieces = (graphic._generate_svg(svg_format),)
+        for piece in graphic_pieces:
+            if isinstance(piece, str):
+                text.append(piece)
+            else:
+                pieces += ["".join(text), piece]
+                text = []
+    pieces.append("".join(text))
+    if svg_format is DEFAULT_FORMAT:
+        group._contents = pieces
+    return pieces
+
+
+def generate_heatmap_svg(heatmap, svg_format=DEFAULT_FORMAT):
+    colors = heatmap.colors()
+    runs = heatmap._runs(colors)
+    x, y = heatmap.x(), heatmap.y()
+    cell_width, cell_height = heatmap.cell_width(), heatmap.cell_height()
+    body = None
+    if len(runs) * HEATMAP_RECT_BYTES > len(colors):
+        # The rectangles might take up more space than an image would.
+        image = generate_heatmap_image(colors, heatmap.columns())
+        if len(image) < len(runs) * HEATMAP_RECT_BYTES:
+            body = svg_format.template(HEATMAP_IMAGE_SVG) % (
+             *svg_format.numbers(
+              x, y, cell_width * heatmap.columns(), cell_height * heatmap.rows()
+             ), image
+            )
+    if body is None:
+        groups = {}
+        for color, column, row, width, height in runs:
+            group = groups.get(color)
+            if group is None:
+                group = groups[color] = [array("d") for _ in range(4)]
+            group[0].append(x + column * cell_width)
+            group[1].append(y + row * cell_height)
+            group[2].append(width * cell_width)
+            group[3].append(height * cell_height)
+        body = "\n".join([svg_format.template(HEATMAP_COLOR_SVG) % (
+         svg_format.color(color),
+         generate_rows_svg(HEATMAP_CELL_SVG, columns, svg_format=svg_format)
+        ) for color, columns in groups.items()])
+    return HEATMAP_SVG % (
+     heatmap.rotation_svg(svg_format), heatmap.data_svg(), body
+    )
+
+
+def generate_heatmap_image(colors, columns):
+    """Creates a PNG image of a grid of colours with one pixel per cell,
+    encoded with base64 so that it can be embedded in SVG.
+
+    :param list colors: The colours of the cells, row by row.
+    :param int columns: The number of columns in the grid.
+    :rtype: ``str``"""
+
+    pixels = dict.fromkeys(colors)
+    for color in pixels:
+        pixels[color] = bytes(raster.parse_color(color)) + b"\xff"
+    return base64.b64encode(raster.encode_png(
+     columns, len(colors) // columns,
+     b"".join(map(pixels.__getitem__, colors))
+    )).decode("ascii")
+
+
+def generate_image_svg(image, svg_format=DEFAULT_FORMAT):
+    return "".join(iterate_image_svg(image, svg_format))
+
+
+def iterate_image_svg(image, svg_format=DEFAULT_FORMAT):
+    """Yields the SVG of an Image piece by piece, so that its data never has
+    to be held in memory all at once. The data is read and base64 encoded a
+    chunk at a time - the chunks are a multiple of three bytes, so that their
+    base64 text can simply be joined together.
+
+    :param Image image: The Image.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :rtype: ``generator``"""
+
+    opacity = image.opacity()
+    prefix, suffix = (svg_format.template(IMAGE_SVG) % (
+     *svg_format.numbers(image.x(), image.y(), image.width(), image.height()),
+     ' opacity="%s"' % svg_format.number(opacity, 3) if opacity != 1 else "",
+     image.rotation_svg(svg_format),
+     image.data_svg(),
+     image.mime_type(),
+     "\0"
+    )).split("\0")
+    yield prefix
+    for chunk in image._iterate_bytes(IMAGE_CHUNK_SIZE):
+        yield base64.b64encode(chunk).decode("ascii")
+    yield suffix
+
+
+def generate_template_id(graphic):
+    """Gives a Graphic which is used as a template an ID based on its SVG, so
+    that templates which look the same share an ID and are only written once.
+
+    :param Graphic graphic: The template.
+    :rtype: ``str``"""
+
+    return "t" + hashlib.sha1(graphic.to_svg().encode("utf-8")).hexdigest()[:12]
+
+
+def generate_rectangle_batch_svg(batch, svg_format=DEFAULT_FORMAT):
+    return generate_rows_svg(
+     RECTANGLE_SVG, batch._columns,
+     generate_style_svg(batch.shape_svg(svg_format)),
+     batch.rotation_svg(svg_format), batch.data_svg(), svg_format=svg_format
+    )
+
+
+def generate_oval_batch_svg(batch, svg_format=DEFAULT_FORMAT):
+    xs, ys, widths, heights = batch._columns
+    x_radii = array("d", map(operator.truediv, widths, repeat(2)))
+    y_radii = array("d", map(operator.truediv, heights, repeat(2)))
+    return generate_rows_svg(
+     OVAL_SVG, (
+      array("d", map(operator.add, xs, x_radii)),
+      array("d", map(operator.add, ys, y_radii)),
+      x_radii, y_radii
+     ), generate_style_svg(batch.shape_svg(svg_format)),
+     batch.rotation_svg(svg_format), batch.data_svg(), svg_format=svg_format
+    )
+
+
+def generate_line_batch_svg(batch, svg_format=DEFAULT_FORMAT):
+    return generate_rows_svg(
+     LINE_SVG, batch._columns,
+     generate_style_svg(batch.graphic_svg(svg_format=svg_format)),
+     batch.rotation_svg(svg_format), batch.data_svg(), svg_format=svg_format
+    )
+
+
+def generate_rows_svg(template, columns, *strings, svg_format=DEFAULT_FORMAT):
+    """Fills in an element template once per row of some columns of numbers,
+    and joins the results with newlines.
+
+    Rather than formatting each row separately, the template's ``%s`` fields
+    are filled with the given strings, and any column whose values are all the
+    same (bit for bit, so that ``0.0`` and ``-0.0`` are told apart) is
+    written into the template as a constant. The template is then
+    repeated for a block of rows and formatted with a single ``%`` operation
+    per block.
+
+    :param str template: The element template - its ``%.1f`` fields are\
+    filled from the columns, and its ``%s`` fields from the strings.
+    :param columns: The columns of numbers as ``array("d")`` objects, one per\
+    ``%.1f`` field.
+    :param \*strings: The values of the ``%s`` fields.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :rtype: ``str``"""
+
+    rows = len(columns[0])
+    if not rows:
+        return ""
+    if svg_format.minify:
+        template = template.replace(" />", "/>")
+    pieces = template.split("%s")
+    template = pieces[0] + "".join([
+     string.replace("%", "%%") + piece for string, piece in zip(strings, pieces[1:])
+    ])
+    pieces = template.split("%.1f")
+    template, variables = pieces[0], []
+    for column, piece in zip(columns, pieces[1:]):
+        if column.tobytes() == column[:1].tobytes() * rows:
+            template += svg_format.number(column[0]) + piece
+        else:
+            template += svg_format.field + piece
+            variables.append(
+             list(map(svg_format.number, column)) if svg_format.minify
+              else column
+            )
+    if not variables:
+        return "\n".join([template % ()] * rows)
+    block = "\n".join([template] * ROWS_PER_BLOCK)
+    blocks = []
+    for start in range(0, rows, ROWS_PER_BLOCK):
+        values = [column[start:start + ROWS_PER_BLOCK] for column in variables]
+        if len(values[0]) != ROWS_PER_BLOCK:
+            block = "\n".join([template] * len(values[0]))
+        blocks.append(block % tuple(chain.from_iterable(zip(*values))))
+    return "\n".join(blocks)
+
+
+SVG_START = """<?xml version="1.0" encoding="UTF-8"?>
 <!-- Created with OmniCanvas (omnicanvas.readthedocs.io) -->
-<svg xmlns="http://www.w3.org/2000/svg" width="%i" height="%i">
-%s
-%s
+<svg xmlns="http://www.w3.org/2000/svg" width="%i" height="%i"%s>
+"""
+
+MINIFIED_SVG_START = """<svg xmlns="http://www.w3.org/2000/svg" width="%i" height="%i"%s>
+"""
+
+SVG_END = """
 </svg>"""
 
+STYLE_ATTRIBUTE = re.compile(
+ r'(<[a-z]+(?: [^\s"<>=]+="[^"]*")*?) style="([^"]*)"'
+)
+
+
+def generate_canvas_svg(canvas, **options):
+    return "".join(iterate_canvas_svg(canvas, **options))
+
 
-def generate_canvas_svg(canvas):
-    return SVG_BASE % (
-     canvas.width(),
-     canvas.height(),
-     ('<rect x="0" y="0" width="%i" height="%i" style="fill:%s;stroke-width:0;" />' % (
-      canvas.width(), canvas.height(), canvas.background_color()
-     )) if canvas.background_color() else "",
-     "\n".join(
-      [graphic.to_svg() for graphic in canvas.graphics()]
-     )
+def iterate_canvas_svg(canvas, viewport=None, **options):
+    css_classes, svg_format = process_svg_options(**options)
+    if viewport is None:
+        return iterate_graphics_svg(
+         canvas, canvas.graphics(), css_classes, svg_format
+        )
+    if not isinstance(viewport, tuple):
+        raise TypeError("Viewports must be tuples, not '%s'" % str(viewport))
+    if len(viewport) != 4:
+        raise ValueError(
+         "Viewports must be tuples of length 4, not %i" % len(viewport)
+        )
+    for value in viewport:
+        if not isinstance(value, int) and not isinstance(value, float):
+            raise TypeError("Viewport values must be numeric, not '%s'" % value)
+    if viewport[2] <= 0 or viewport[3] <= 0:
+        raise ValueError("Viewport width and height must be positive")
+    return iterate_graphics_svg(
+     canvas, cull_graphics(canvas, viewport), css_classes, svg_format,
+     viewport=viewport, size=(round(viewport[2]), round(viewport[3]))
     )
+
+
+def cull_graphics(canvas, viewport):
+    """Finds the Graphics on a canvas which overlap a region, using the
+    canvas's spatial index. Batches which only partly overlap the region are
+    replaced by batches of just the rows which do.
+
+    :param Canvas canvas: The canvas.
+    :param tuple viewport: The ``(x, y, width, height)`` region.
+    :rtype: ``list``"""
+
+    culled = []
+    for graphic, rows in sorted(
+     canvas._get_spatial_index().rows_within(*viewport),
+     key=lambda found: canvas._index_of(found[0])
+    ):
+        if rows is not None and len(rows) != len(graphic):
+            culled.append(graphic._select(rows))
+        else:
+            culled.append(graphic)
+    return culled
+
+
+def process_svg_options(css_classes=False, precision=1, minify=False,
+ tolerance=0):
+    """Checks the output options of a canvas's SVG, and works out the format
+    that they describe.
+
+    :param bool css_classes: Whether styles will be written as CSS classes.
+    :param int precision: The number of decimal places to give numbers to.
+    :param bool minify: Whether the output will be minified.
+    :param tolerance: How far Polylines and Polygons can be simplified by.
+    :raises TypeError: if any of the options are the wrong type.
+    :raises ValueError: if the precision or tolerance is negative.
+    :rtype: ``tuple``"""
+
+    if not isinstance(css_classes, bool):
+        raise TypeError("css_classes must be bool, not '%s'" % css_classes)
+    if not isinstance(precision, int) or isinstance(precision, bool):
+        raise TypeError("precision must be int, not '%s'" % precision)
+    if precision < 0:
+        raise ValueError("precision cannot be negative, not %i" % precision)
+    if not isinstance(minify, bool):
+        raise TypeError("minify must be bool, not '%s'" % minify)
+    if not isinstance(tolerance, int) and not isinstance(tolerance, float)\
+     or isinstance(tolerance, bool):
+        raise TypeError("tolerance must be numeric, not '%s'" % tolerance)
+    if tolerance < 0:
+        raise ValueError("tolerance cannot be negative, not %s" % tolerance)
+    if precision == 1 and not minify and not tolerance:
+        return css_classes, DEFAULT_FORMAT
+    return css_classes, SvgFormat(precision, minify, tolerance)
+
+
+def iterate_graphics_svg(canvas, graphics, css_classes, svg_format,
+ viewport=None, size=None):
+    """Yields the SVG document of some Graphics on a canvas, piece by piece.
+
+    :param Canvas canvas: The canvas, whose size and background are used.
+    :param list graphics: The Graphics to include, from back to front.
+    :param bool css_classes: Whether styles will be written as CSS classes.
+    :param SvgFormat svg_format: The format to write numbers in.
+    :param tuple viewport: If given, the ``(x, y, width, height)`` region of\
+    the canvas that the document shows, which will be given as its\
+    ``viewBox``.
+    :param tuple size: The ``(width, height)`` of the document, if it should\
+    not be the canvas's own.
+    :rtype: ``generator``"""
+
+    if svg_format is DEFAULT_FORMAT:
+        # The default SVG of each Graphic is cached, so it is used directly.
+        render = lambda graphic: graphic.to_svg()
+    else:
+        render = lambda graphic: graphic._generate_svg(svg_format)
+
+    def split(graphic):
+        # The SVG of a Graphic as pieces of text and the Images to stream.
+        if hasattr(graphic, "_iterate_svg"):
+            return (graphic,)
+        if hasattr(graphic, "_graphics"):
+            return split_group_svg(graphic, svg_format)
+        return (render(graphic),)
+
+    start = MINIFIED_SVG_START if svg_format.minify else SVG_START
+    if viewport is None:
+        region = ("0", "0", "%i" % canvas.width(), "%i" % canvas.height())
+        view_box = ""
+    else:
+        region = tuple(map(svg_format.number, viewport))
+        view_box = ' viewBox="%s"' % " ".join(region)
+    yield start % (*(size or (canvas.width(), canvas.height())), view_box)
+    templates = collect_instance_templates(graphics)
+    defs = "<defs>\n%s\n</defs>\n" % "\n".join([
+     '<g id="%s">\n%s\n</g>' % (template_id, render(template))
+      for template_id, template in templates.items()
+    ]) if templates else ""
+    rendered = map(split, graphics)
+    if css_classes:
+        # The Graphics are rendered once, and their SVG kept until the
+        # classes found in it have been written out ahead of it.
+        rendered = list(rendered)
+        classes = collect_style_classes(chain((defs,), (
+         piece for pieces in rendered for piece in pieces
+          if isinstance(piece, str)
+        )))
+        if classes:
+            yield "<style>\n%s\n</style>\n" % "\n".join([
+             ".%s{%s}" % (name, style) for style, name in classes.items()
+            ])
+        attributes = {
+         style: ' class="%s"' % name for style, name in classes.items()
+        }
+        replace = lambda match: match.group(1) + attributes[match.group(2)]
+        defs = STYLE_ATTRIBUTE.sub(replace, defs)
+    yield defs
+    if canvas.background_color():
+        if svg_format.minify:
+            yield '<rect%s width="%s" height="%s" style="fill:%s"/>' % (
+             "" if region[:2] == ("0", "0") else ' x="%s" y="%s"' % region[:2],
+             region[2], region[3], svg_format.color(canvas.background_color())
+            )
+        else:
+            yield '<rect x="%s" y="%s" width="%s" height="%s" style="fill:%s;stroke-width:0;" />' % (
+             *region, canvas.background_color()
+            )
+    yield "\n"
+    for index, pieces in enumerate(rendered):
+        if index:
+            yield "\n"
+        for piece in pieces:
+            if not isinstance(piece, str):
+                # Images can be very large, so they are streamed rather than
+                # rendered in one go. Their SVG has no style attribute.
+                yield from piece._iterate_svg(svg_format)
+            elif css_classes:
+                yield STYLE_ATTRIBUTE.sub(replace, piece)
+            else:
+                yield piece
+    yield SVG_END
+
+
+def collect_instance_templates(graphics, templates=None):
+    """Finds the templates of any Instances among some Graphics (including
+    Instances of Instances, and Instances inside Groups), keyed by their IDs.
+
+    :param graphics: The Graphics to look through.
+    :param dict templates: The templates found so far, which will be added\
+    to.
+    :rtype: ``dict``"""
+
+    if templates is None:
+        templates = {}
+    for graphic in graphics:
+        if hasattr(graphic, "_graphics"):
+            collect_instance_templates(graphic._graphics, templates)
+        while hasattr(graphic, "template"):
+            graphic = graphic.template()
+            templates.setdefault(generate_template_id(graphic), graphic)
+            if hasattr(graphic, "_graphics"):
+                collect_instance_templates(graphic._graphics, templates)
+    return templates
+
+
+def collect_style_classes(texts):
+    """Finds every distinct ``style`` attribute of the elements in some SVG
+    text, and gives each one a class name - ``s0``, ``s1`` etc. in the order
+    they first appear. Only the attributes of the elements' own tags are
+    looked at, not any text that looks like one in their content.
+
+    :param texts: The pieces of SVG text to look through.
+    :rtype: ``dict``"""
+
+    classes = {}
+    for text in texts:
+        for _, style in STYLE_ATTRIBUTE.findall(text):
+            if style not in classes:
+                classes[style] = "s%i" % len(classes)
+    return classes
+
+
+def write_canvas_svg(pieces, fileobj, chunk_size):
+    if isinstance(fileobj, io.TextIOBase):
+        write, encode = fileobj.write, False
+    else:
+        write = getattr(fileobj, "write", None) or fileobj.sendall
+        encode = True
+    chunks, size = [], 0
+    for chunk in pieces:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= chunk_size:
+            text = "".join(chunks)
+            write(text.encode("utf-8") if encode else text)
+            chunks, size = [], 0
+    if chunks:
+        text = "".join(chunks)
+        write(text.encode("utf-8") if encode else text)
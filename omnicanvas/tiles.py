@@ -0,0 +1,113 @@
+"""This module contains the functions used to render a canvas as a pyramid of
+tiles, of the kind used by slippy maps."""
+
+import math
+import os
+from . import graphics
+from . import svg
+from . import raster
+
+def render_canvas_tiles(canvas, tile_size, zoom_levels, out_dir, rasters, options):
+    css_classes, svg_format = svg.process_svg_options(**options)
+    bounds = list(iterate_bounds(canvas.graphics()))
+    count = 0
+    for zoom in range(zoom_levels):
+        scale = 2 ** (zoom - zoom_levels + 1)
+        side = tile_size / scale
+        level_format = svg_format
+        if svg_format.tolerance:
+            # The tolerance is in the pixels of the tiles, which cover more
+            # of the canvas at each level further out.
+            level_format = svg.SvgFormat(
+             svg_format.precision, svg_format.minify,
+             svg_format.tolerance / scale
+            )
+        tiles = assign_tiles(
+         bounds, side,
+         max(1, math.ceil(canvas.width() * scale / tile_size)),
+         max(1, math.ceil(canvas.height() * scale / tile_size))
+        )
+        for (column, row), contents in tiles.items():
+            tile_graphics = [content if isinstance(content, graphics.Graphic)
+             else content[0]._select(content[1]) for content in contents]
+            directory = os.path.join(out_dir, str(zoom), str(column))
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, str(row))
+            viewport = (column * side, row * side, side, side)
+            with open(path + ".svg", "w") as f:
+                svg.write_canvas_svg(svg.iterate_graphics_svg(
+                 canvas, tile_graphics, css_classes, level_format,
+                 viewport=viewport, size=(tile_size, tile_size)
+                ), f, 65536)
+            if rasters:
+                tile = raster.Raster(
+                 tile_size, tile_size, canvas.background_color()
+                )
+                transform = (
+                 scale, 0, 0, scale, -viewport[0] * scale, -viewport[1] * scale
+                )
+                for graphic in tile_graphics:
+                    tile.paint(graphic, transform)
+                with open(path + ".png", "wb") as f:
+                    f.write(tile.to_png())
+            count += 1
+    return count
+
+
+def iterate_bounds(graphics_list):
+    """Yields the bounds of some Graphics, as ``(graphic, row, bounds)``
+    tuples. The rows of batches are given separately, each with its own
+    bounds, and other Graphics have a row of ``None``.
+
+    :param list graphics_list: The Graphics.
+    :rtype: ``generator``"""
+
+    for graphic in graphics_list:
+        if isinstance(graphic, (graphics.BoxBatch, graphics.LineBatch)):
+            for row, bounds in enumerate(graphic._row_bounds()):
+                yield (graphic, row, bounds)
+        else:
+            yield (graphic, None, graphic._get_bounds())
+
+
+def assign_tiles(bounds, side, columns, rows):
+    """Works out which Graphics overlap each tile of a grid, in a single pass
+    over the Graphics. Tiles which nothing overlaps are left out.
+
+    The contents of each tile are listed from back to front - each is either a
+    Graphic, or a ``[batch, rows]`` list of the rows of a batch which overlap
+    the tile.
+
+    :param list bounds: The ``(graphic, row, bounds)`` tuples of the Graphics.
+    :param side: The width and height of each tile, in canvas pixels.
+    :param int columns: The number of columns of tiles.
+    :param int rows: The number of rows of tiles.
+    :rtype: ``dict``"""
+
+    tiles = {}
+    for graphic, row, (min_x, min_y, max_x, max_y) in bounds:
+        first_column, last_column = int(min_x // side), int(max_x // side)
+        first_row, last_row = int(min_y // side), int(max_y // side)
+        if first_column == last_column and first_row == last_row:
+            # Most Graphics are within a single tile.
+            if not (0 <= first_column < columns and 0 <= first_row < rows):
+                continue
+            keys = ((first_column, first_row),)
+        else:
+            keys = [(column, tile_row) for column in range(
+             max(0, first_column), min(columns - 1, last_column) + 1
+            ) for tile_row in range(
+             max(0, first_row), min(rows - 1, last_row) + 1
+            )]
+        for key in keys:
+            contents = tiles.get(key)
+            if contents is None:
+                contents = tiles[key] = []
+            if row is None:
+                contents.append(graphic)
+            elif contents and isinstance(contents[-1], list)\
+             and contents[-1][0] is graphic:
+                contents[-1][1].append(row)
+            else:
+                contents.append([graphic, [row]])
+    return tiles
@@ -0,0 +1,145 @@
+"""This module contains the functions used to create and apply affine
+transforms - the 2×3 matrices ``(a, b, c, d, e, f)`` which move a point
+(x, y) to (ax + cy + e, bx + dy + f), as SVG's ``matrix()`` does."""
+
+import math
+from array import array
+from functools import lru_cache
+
+IDENTITY = (1, 0, 0, 1, 0, 0)
+
+def process_transform(transform):
+    """Raises exceptions if an affine transform does not meet requirements.
+
+    :param tuple transform: The ``(a, b, c, d, e, f)`` transform to check.
+    :raises TypeError: if the transform is not a tuple of numbers.
+    :raises ValueError: if the transform is not of length 6.
+    :rtype: ``tuple``"""
+
+    if not isinstance(transform, tuple):
+        raise TypeError("Transforms must be tuples, not '%s'" % str(transform))
+    if len(transform) != 6:
+        raise ValueError(
+         "Transforms must be tuples of length 6, not %i" % len(transform)
+        )
+    for value in transform:
+        if not isinstance(value, int) and not isinstance(value, float)\
+         or isinstance(value, bool):
+            raise TypeError("Transform values must be numeric, not '%s'" % value)
+    return transform
+
+
+def rotation_transform(rotation):
+    """Creates the affine transform for a Graphic's rotation.
+
+    :param tuple rotation: The rotation, as (x of rotation point, y of\
+    rotation point, angle), in degrees.
+    :rtype: ``tuple``"""
+
+    x, y, angle = rotation
+    if not angle % 360:
+        return IDENTITY
+    cos, sin = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    return (cos, sin, -sin, cos, x - x * cos + y * sin, y - x * sin - y * cos)
+
+
+def translation_transform(x_offset, y_offset):
+    """Creates the affine transform which moves points by some offset.
+
+    :param x_offset: The distance to move points to the right.
+    :param y_offset: The distance to move points down.
+    :rtype: ``tuple``"""
+
+    return (1, 0, 0, 1, x_offset, y_offset)
+
+
+def scale_transform(x_scale, y_scale, x_origin=0, y_origin=0):
+    """Creates the affine transform which stretches points away from (or
+    towards) an origin.
+
+    :param x_scale: The factor to stretch horizontal distances by.
+    :param y_scale: The factor to stretch vertical distances by.
+    :param x_origin: The x value of the point which stays where it is.
+    :param y_origin: The y value of the point which stays where it is.
+    :rtype: ``tuple``"""
+
+    return (
+     x_scale, 0, 0, y_scale,
+     x_origin - x_origin * x_scale, y_origin - y_origin * y_scale
+    )
+
+
+def skew_transform(x_angle, y_angle, x_origin=0, y_origin=0):
+    """Creates the affine transform which shears points about an origin, as
+    SVG's ``skewX()`` and ``skewY()`` do.
+
+    :param x_angle: The angle to slant vertical lines by, in degrees.
+    :param y_angle: The angle to slant horizontal lines by, in degrees.
+    :param x_origin: The x value of the point which stays where it is.
+    :param y_origin: The y value of the point which stays where it is.
+    :rtype: ``tuple``"""
+
+    x_tan = math.tan(math.radians(x_angle))
+    y_tan = math.tan(math.radians(y_angle))
+    return (1, y_tan, x_tan, 1, -y_origin * x_tan, -x_origin * y_tan)
+
+
+def combine_transforms(*transforms):
+    """Combines affine transforms into one which applies each of them in
+    turn, the first given being applied first.
+
+    :param \*transforms: The ``(a, b, c, d, e, f)`` transforms.
+    :rtype: ``tuple``"""
+
+    a, b, c, d, e, f = transforms[0]
+    for a2, b2, c2, d2, e2, f2 in transforms[1:]:
+        a, b, c, d, e, f = (
+         a2 * a + c2 * b, b2 * a + d2 * b,
+         a2 * c + c2 * d, b2 * c + d2 * d,
+         a2 * e + c2 * f + e2, b2 * e + d2 * f + f2
+        )
+    return (a, b, c, d, e, f)
+
+
+@lru_cache(maxsize=1024)
+def graphic_transform(rotation, transform):
+    """Compiles a Graphic's rotation and its transform into the single affine
+    transform which applies both. Graphics tend to share the same few
+    rotations and transforms, so the most recently used results are cached.
+
+    :param tuple rotation: The Graphic's rotation.
+    :param tuple transform: The Graphic's transform, applied after its\
+    rotation.
+    :rtype: ``tuple``"""
+
+    if transform == IDENTITY:
+        return rotation_transform(rotation)
+    return combine_transforms(rotation_transform(rotation), transform)
+
+
+def apply_transform(transform, points):
+    """Applies an affine transform to some points.
+
+    :param tuple transform: The ``(a, b, c, d, e, f)`` transform.
+    :param list points: The ``(x, y)`` points.
+    :rtype: ``list``"""
+
+    a, b, c, d, e, f = transform
+    return [(a * x + c * y + e, b * x + d * y + f) for x, y in points]
+
+
+def transform_coordinates(transform, coordinates):
+    """Applies an affine transform to a whole sequence of alternating x and y
+    values at once, in a single pass and without making a tuple for each
+    point as :py:func:`apply_transform` does.
+
+    :param tuple transform: The ``(a, b, c, d, e, f)`` transform.
+    :param coordinates: The x and y values, such as the ``array`` of a\
+    Polygon.
+    :rtype: ``array``"""
+
+    a, b, c, d, e, f = transform
+    values = iter(coordinates)
+    return array("d", [value for x, y in zip(values, values) for value in (
+     a * x + c * y + e, b * x + d * y + f
+    )])
@@ -0,0 +1,201 @@
+from array import array
+from unittest import TestCase
+from omnicanvas.graphics import ShapeGraphic, Graphic, Rectangle, Oval, Line
+from omnicanvas.graphics import RectangleBatch, OvalBatch, LineBatch
+
+class BatchCreationTests(TestCase):
+
+    def test_can_create_rectangle_batch(self):
+        batch = RectangleBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        self.assertIsInstance(batch, ShapeGraphic)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch._columns[0], array("d", [10, 20]))
+        self.assertEqual(batch._columns[3], array("d", [70, 80]))
+        self.assertEqual(batch._fill_color, "#FFFFFF")
+        self.assertEqual(batch._line_width, 1)
+
+
+    def test_can_create_line_batch(self):
+        batch = LineBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        self.assertIsInstance(batch, Graphic)
+        self.assertEqual(len(batch), 2)
+
+
+    def test_batch_reprs(self):
+        self.assertEqual(
+         str(RectangleBatch([1], [1], [1], [1])),
+         "<RectangleBatch (1 Rectangles)>"
+        )
+        self.assertEqual(
+         str(OvalBatch([1, 2], [1, 2], [1, 2], [1, 2])),
+         "<OvalBatch (2 Ovals)>"
+        )
+        self.assertEqual(
+         str(LineBatch([], [], [], [])),
+         "<LineBatch (0 Lines)>"
+        )
+
+
+    def test_columns_can_be_any_sequence(self):
+        batch = OvalBatch(range(3), (1, 2.5, 3), array("d", [4, 5, 6]), [1] * 3)
+        self.assertEqual(batch._columns[1], array("d", [1, 2.5, 3]))
+        self.assertEqual(batch._columns[2], array("d", [4, 5, 6]))
+
+
+    def test_columns_must_be_numeric(self):
+        with self.assertRaises(TypeError):
+            RectangleBatch([10, "20"], [30, 40], [50, 60], [70, 80])
+        with self.assertRaises(TypeError):
+            LineBatch("10", [30], [50], [70])
+        with self.assertRaises(TypeError):
+            OvalBatch(None, [30], [50], [70])
+
+
+    def test_columns_must_be_same_length(self):
+        with self.assertRaises(ValueError):
+            RectangleBatch([10, 20], [30, 40], [50], [70, 80])
+
+
+    def test_style_is_validated(self):
+        with self.assertRaises(ValueError):
+            RectangleBatch([10], [30], [50], [70], fill_color="red")
+        with self.assertRaises(TypeError):
+            LineBatch([10], [30], [50], [70], line_width="2")
+
+
+    def test_batch_bounding_box(self):
+        batch = RectangleBatch([10, 50], [30, 0], [50, -20], [70, 10], line_width=0)
+        self.assertEqual(batch.bounding_box(), (10, 0, 50, 100))
+        batch = LineBatch([10, 20], [30, 40], [50, 0], [70, 80], line_width=0)
+        self.assertEqual(batch.bounding_box(), (0, 30, 50, 50))
+
+
+
+class BatchSvgTests(TestCase):
+
+    def test_rectangle_batch_svg_matches_rectangles(self):
+        style = {"fill_color": "#FF0000", "opacity": 0.5, "line_style": "--",
+         "rotation": (10, 10, 45), "data": {"a": "b"}}
+        batch = RectangleBatch([10, 20.5], [30, 40], [50, 60], [70, 80], **style)
+        self.assertEqual(batch.to_svg(), "\n".join([
+         Rectangle(10, 30, 50, 70, **style).to_svg(),
+         Rectangle(20.5, 40, 60, 80, **style).to_svg()
+        ]))
+
+
+    def test_oval_batch_svg_matches_ovals(self):
+        batch = OvalBatch([10, 21], [30, 40], [51, 60], [70, 80], line_width=2)
+        self.assertEqual(batch.to_svg(), "\n".join([
+         Oval(10, 30, 51, 70, line_width=2).to_svg(),
+         Oval(21, 40, 60, 80, line_width=2).to_svg()
+        ]))
+
+
+    def test_line_batch_svg_matches_lines(self):
+        batch = LineBatch([10, 20], [30, 40], [50, 60], [70, 80], line_color="#0000FF")
+        self.assertEqual(batch.to_svg(), "\n".join([
+         Line(10, 30, 50, 70, line_color="#0000FF").to_svg(),
+         Line(20, 40, 60, 80, line_color="#0000FF").to_svg()
+        ]))
+
+
+    def test_large_batch_svg_matches_rectangles(self):
+        xs = [i * 1.37 for i in range(2500)]
+        ys = [(i % 7) - 3.04 for i in range(2500)]
+        batch = RectangleBatch(xs, ys, [10] * 2500, [0.0, -0.0] * 1250)
+        self.assertEqual(batch.to_svg(), "\n".join([
+         Rectangle(x, y, 10, height).to_svg()
+          for x, y, height in zip(xs, ys, [0.0, -0.0] * 1250)
+        ]))
+
+
+    def test_constant_batch_svg_matches_ovals(self):
+        batch = OvalBatch([5] * 3, [6] * 3, [7] * 3, [8] * 3)
+        self.assertEqual(
+         batch.to_svg(), "\n".join([Oval(5, 6, 7, 8).to_svg()] * 3)
+        )
+
+
+    def test_batch_svg_can_contain_percent_signs(self):
+        batch = LineBatch([10, 20], [30, 40], [50, 60], [70, 80], data={"w": "50%"})
+        self.assertEqual(batch.to_svg(), "\n".join([
+         Line(10, 30, 50, 70, data={"w": "50%"}).to_svg(),
+         Line(20, 40, 60, 80, data={"w": "50%"}).to_svg()
+        ]))
+
+
+    def test_empty_batch_svg(self):
+        self.assertEqual(RectangleBatch([], [], [], []).to_svg(), "")
+
+
+    def test_style_changes_apply_to_whole_batch(self):
+        batch = RectangleBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        batch.to_svg()
+        batch.fill_color("#00FF00")
+        self.assertEqual(batch.to_svg().count("fill:#00FF00;"), 2)
+
+
+
+class BatchViewTests(TestCase):
+
+    def test_can_get_views_of_rows(self):
+        batch = RectangleBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        view = batch[1]
+        self.assertIsInstance(view, Rectangle)
+        self.assertEqual((view.x(), view.y(), view.width(), view.height()), (20, 40, 60, 80))
+        self.assertEqual(batch[-1].x(), 20)
+        self.assertEqual([view.x() for view in batch], [10, 20])
+        self.assertIsInstance(LineBatch([1], [2], [3], [4])[0], Line)
+        self.assertIsInstance(OvalBatch([1], [2], [3], [4])[0], Oval)
+
+
+    def test_batch_index_must_be_valid(self):
+        batch = RectangleBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        with self.assertRaises(IndexError):
+            batch[2]
+        with self.assertRaises(IndexError):
+            batch[-3]
+        with self.assertRaises(TypeError):
+            batch["0"]
+
+
+    def test_views_write_to_columns(self):
+        batch = LineBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        svg = batch.to_svg()
+        batch[0].x2(55)
+        self.assertEqual(batch._columns[2][0], 55)
+        self.assertEqual(batch[0].x2(), 55)
+        self.assertNotEqual(batch.to_svg(), svg)
+        self.assertIn('x2="55.0"', batch.to_svg())
+        with self.assertRaises(TypeError):
+            batch[0].x2("55")
+
+
+    def test_view_transform_is_the_batch_transform(self):
+        batch = RectangleBatch([0, 20], [0, 40], [10, 10], [10, 10], line_width=0)
+        self.assertEqual(batch.bounding_box(), (0, 0, 30, 50))
+        batch[0].translate(5, 5)
+        self.assertEqual(batch.transform(), (1, 0, 0, 1, 5, 5))
+        self.assertEqual(batch[1].transform(), (1, 0, 0, 1, 5, 5))
+        self.assertEqual(batch.bounding_box(), (5, 5, 30, 50))
+        self.assertEqual(batch[1].bounding_box(), (25, 45, 10, 10))
+        self.assertIn("matrix(1 0 0 1 5.0 5.0)", batch.to_svg())
+        self.assertEqual(batch._select([1]).transform(), (1, 0, 0, 1, 5, 5))
+
+
+    def test_view_styling_is_the_batch_styling(self):
+        batch = OvalBatch([10, 20], [30, 40], [50, 60], [70, 80], fill_color="#FF0000")
+        self.assertEqual(batch[0].fill_color(), "#FF0000")
+        batch.to_svg()
+        batch[1].fill_color("#00FF00")
+        self.assertEqual(batch.fill_color(), "#00FF00")
+        self.assertEqual(batch.to_svg().count("fill:#00FF00;"), 2)
+        batch[0].data()["a"] = "b"
+        self.assertEqual(batch.to_svg().count('a="b"'), 2)
+
+
+    def test_view_svg_matches_graphic(self):
+        batch = OvalBatch([10, 20], [30, 40], [50, 60], [70, 80])
+        self.assertEqual(batch[1].to_svg(), Oval(20, 40, 60, 80).to_svg())
+        batch[1].x(0)
+        self.assertEqual(batch[1].to_svg(), Oval(0, 40, 60, 80).to_svg())
@@ -87,3 +87,23 @@ class BoxGraphicPropertyTests(TestCase):
     def test_box_center(self):
         box = BoxGraphic(10, 20, 100, 200)
         self.assertEqual(box.center(), (60, 120))
+
+
+
+    def test_box_bounding_box(self):
+        box = BoxGraphic(10, 20, 100, 200, line_width=0)
+        self.assertEqual(box.bounding_box(), (10, 20, 100, 200))
+        box.width(-50)
+        self.assertEqual(box.bounding_box(), (-40, 20, 50, 200))
+
+
+    def test_bounding_box_includes_line_width(self):
+        box = BoxGraphic(10, 20, 100, 200, line_width=4)
+        self.assertEqual(box.bounding_box(), (8, 18, 104, 204))
+
+
+    def test_bounding_box_includes_rotation(self):
+        box = BoxGraphic(0, 0, 100, 50, line_width=0, rotation=(0, 0, 90))
+        bounds = box.bounding_box()
+        for value, expected in zip(bounds, (-50, 0, 50, 100)):
+            self.assertAlmostEqual(value, expected)
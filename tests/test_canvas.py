@@ -1,9 +1,13 @@
 import os
+import io
+import gzip
+import pickle
 from unittest import TestCase
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 import omnicanvas
 from omnicanvas.canvas import Canvas
 import omnicanvas.graphics as graphics
+from omnicanvas.svg import generate_template_id, SvgFormat
 
 class CanvasCreationTests(TestCase):
 
@@ -283,6 +287,273 @@ class GraphicAdditionTests(TestCase):
 
 
 
+    def test_can_add_rectangles(self):
+        batch = self.canvas.add_rectangles(
+         [10, 20], [10, 20], [50, 50], [100, 100], fill_color="#FF0000"
+        )
+        self.assertIsInstance(batch, graphics.RectangleBatch)
+        self.assertIs(batch, self.canvas.graphics()[-1])
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch._fill_color, "#FF0000")
+
+
+    def test_can_add_instance(self):
+        template = graphics.Rectangle(0, 0, 10, 10)
+        instance = self.canvas.add_instance(template, 50, 60, name="I")
+        self.assertIsInstance(instance, graphics.Instance)
+        self.assertIs(instance, self.canvas.graphics()[-1])
+        self.assertIs(instance._template, template)
+        self.assertIs(self.canvas.get_graphic_by_name("I"), instance)
+        self.assertEqual(self.canvas.graphics_at(55, 65), [instance])
+
+
+    def test_can_add_ovals(self):
+        batch = self.canvas.add_ovals([10, 20], [10, 20], [50, 50], [100, 100])
+        self.assertIsInstance(batch, graphics.OvalBatch)
+        self.assertIs(batch, self.canvas.graphics()[-1])
+
+
+    def test_can_add_lines(self):
+        batch = self.canvas.add_lines([10], [10], [50], [100], line_width=3)
+        self.assertIsInstance(batch, graphics.LineBatch)
+        self.assertIs(batch, self.canvas.graphics()[-1])
+        self.assertEqual(batch._line_width, 3)
+
+
+
+class ColumnarCanvasTests(TestCase):
+
+    def setUp(self):
+        self.canvas = Canvas(400, 400, columnar=True)
+
+
+    def test_columnar_must_be_bool(self):
+        with self.assertRaises(TypeError):
+            Canvas(400, 400, columnar="yes")
+
+
+    def test_same_styled_graphics_share_a_batch(self):
+        first = self.canvas.add_rectangle(10, 10, 50, 100, fill_color="#FF0000")
+        second = self.canvas.add_rectangle(20, 20, 50, 100, fill_color="#FF0000")
+        self.assertIsInstance(first, graphics.RectangleView)
+        self.assertEqual(len(self.canvas.graphics()), 1)
+        batch = self.canvas.graphics()[0]
+        self.assertIsInstance(batch, graphics.RectangleBatch)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(second.x(), 20)
+        self.assertEqual(batch._fill_color, "#FF0000")
+
+
+    def test_different_graphics_start_new_batches(self):
+        self.canvas.add_rectangle(10, 10, 50, 100)
+        self.canvas.add_rectangle(10, 10, 50, 100, opacity=0.5)
+        self.canvas.add_oval(10, 10, 50, 100)
+        self.canvas.add_line(10, 10, 50, 100)
+        self.canvas.add_line(10, 10, 50, 100)
+        self.canvas.add_rectangle(10, 10, 50, 100)
+        self.assertEqual(
+         [type(g) for g in self.canvas.graphics()], [
+          graphics.RectangleBatch, graphics.RectangleBatch,
+          graphics.OvalBatch, graphics.LineBatch, graphics.RectangleBatch
+         ]
+        )
+
+
+    def test_transformed_batches_are_not_added_to(self):
+        view = self.canvas.add_rectangle(10, 10, 50, 100)
+        view.scale(2)
+        self.canvas.add_rectangle(20, 20, 50, 100)
+        batch1, batch2 = self.canvas.graphics()
+        self.assertEqual(batch1.transform(), (2, 0, 0, 2, 0, 0))
+        self.assertEqual(batch2.transform(), (1, 0, 0, 1, 0, 0))
+
+
+    def test_graphics_with_data_are_not_batched(self):
+        rectangle = self.canvas.add_rectangle(10, 10, 50, 100, data={"a": "b"})
+        self.assertIs(type(rectangle), graphics.Rectangle)
+        polygon = self.canvas.add_polygon(10, 10, 50, 100, 20, 20)
+        self.assertIs(type(polygon), graphics.Polygon)
+
+
+    def test_columnar_svg_matches_normal_svg(self):
+        canvas = Canvas(400, 400)
+        for c in (canvas, self.canvas):
+            c.add_rectangle(10, 10, 50, 100, fill_color="#FF0000")
+            c.add_rectangle(20, 20, 50, 100, fill_color="#FF0000")
+            c.add_oval(10, 10, 50, 100)
+            c.add_line(10, 10, 50, 100, line_style="..")
+            c.add_text(10, 10, "Text")
+        self.assertEqual(self.canvas.to_svg(), canvas.to_svg())
+
+
+    def test_columnar_batches_are_indexed(self):
+        self.canvas.add_rectangle(10, 10, 50, 50, fill_color="#FF0000")
+        view = self.canvas.add_rectangle(200, 200, 50, 50, name="R")
+        self.assertEqual(self.canvas.graphics_at(220, 220), [view])
+        view.x(300)
+        self.assertEqual(self.canvas.graphics_at(220, 220), [])
+        self.assertIs(self.canvas.get_graphic_by_name("R"), view)
+        view.name("S")
+        self.assertIs(self.canvas.get_graphic_by_name("S"), view)
+        self.assertIs(self.canvas.get_graphic_by_name("R"), None)
+
+
+    def test_searches_return_matching_rows_of_batches(self):
+        canvas = Canvas(1000, 1000, columnar=True)
+        first = canvas.add_rectangle(0, 0, 10, 10)
+        second = canvas.add_rectangle(900, 900, 10, 10)
+        self.assertEqual(canvas.graphics_at(500, 500), [])
+        self.assertEqual(canvas.graphics_in(400, 400, 200, 200), [])
+        self.assertEqual(canvas.graphics_at(905, 905), [second])
+        self.assertEqual(canvas.graphics_in(0, 0, 1000, 1000), [first, second])
+        second.x(495)
+        self.assertEqual(canvas.graphics_at(500, 905), [second])
+        batch = canvas.add_rectangles(
+         [0, 500, 990], [0, 500, 990], [10, 10, 10], [10, 10, 10]
+        )
+        self.assertEqual(
+         canvas.graphics_in(0, 0, 20, 20), [first, batch[0]]
+        )
+        self.assertEqual(
+         canvas.to_svg(viewport=(480, 480, 40, 40)).count("<rect"), 1
+        )
+
+
+    def test_columnar_names_belong_to_rows(self):
+        first = self.canvas.add_rectangle(10, 10, 50, 50, name="A")
+        second = self.canvas.add_rectangle(20, 20, 50, 50)
+        third = self.canvas.add_rectangle(30, 30, 50, 50, name="A")
+        self.assertEqual(len(self.canvas.graphics()), 1)
+        self.assertEqual((first.name(), second.name()), ("A", None))
+        second.name("B")
+        self.assertEqual(
+         [first.name(), second.name(), third.name()], ["A", "B", "A"]
+        )
+        self.assertIs(self.canvas.get_graphic_by_name("B"), second)
+        self.assertEqual(self.canvas.get_graphics_by_name("A"), [first, third])
+        self.assertIs(self.canvas.graphics()[0][1], second)
+
+
+    def test_columnar_rows_can_be_reordered(self):
+        first = self.canvas.add_rectangle(10, 10, 50, 50, name="R")
+        second = self.canvas.add_rectangle(20, 20, 50, 50, name="R")
+        third = self.canvas.add_rectangle(30, 30, 50, 50)
+        self.canvas.move_graphic_forward(first)
+        self.assertEqual(
+         [view.x() for view in self.canvas.graphics()[0]], [20, 10, 30]
+        )
+        self.assertEqual((first.x(), second.x()), (10, 20))
+        self.assertEqual(self.canvas.get_graphics_by_name("R"), [second, first])
+        self.canvas.bring_to_front(second)
+        self.assertEqual(
+         [[view.x() for view in batch] for batch in self.canvas.graphics()],
+         [[10, 30], [20]]
+        )
+        self.assertEqual(self.canvas.get_graphics_by_name("R"), [first, second])
+        self.canvas.send_to_back(third)
+        self.canvas.move_to_index(first, 2)
+        self.assertEqual(
+         [[view.x() for view in batch] for batch in self.canvas.graphics()],
+         [[30], [20], [10]]
+        )
+        self.assertEqual(
+         (first.x(), second.x(), third.x(), third.name()), (10, 20, 30, None)
+        )
+        self.canvas.move_graphic_backward(first)
+        self.assertEqual(self.canvas.get_graphics_by_name("R"), [first, second])
+        svg = Canvas(400, 400)
+        for x in (30, 10, 20):
+            svg.add_rectangle(x, x, 50, 50)
+        self.assertEqual(self.canvas.to_svg(), svg.to_svg())
+
+
+    def test_columnar_rows_can_be_removed(self):
+        first = self.canvas.add_rectangle(10, 10, 50, 50)
+        second = self.canvas.add_rectangle(20, 20, 50, 50, name="R")
+        third = self.canvas.add_rectangle(30, 30, 50, 50, name="S")
+        batch = self.canvas.graphics()[0]
+        self.canvas.remove_graphic(second)
+        self.assertEqual([view.x() for view in batch], [10, 30])
+        self.assertIs(batch[1], third)
+        self.assertEqual((third.x(), third.name()), (30, "S"))
+        self.assertIs(self.canvas.get_graphic_by_name("R"), None)
+        self.assertIs(self.canvas.get_graphic_by_name("S"), third)
+        self.assertEqual((second.x(), second.name()), (20, "R"))
+        self.assertIsNone(second._parent)
+        self.assertEqual(self.canvas.graphics_at(25, 25), [first])
+        with self.assertRaises(ValueError):
+            self.canvas.remove_graphic(second)
+        self.canvas.remove_graphic(first)
+        self.canvas.remove_graphic(third)
+        self.assertEqual(self.canvas.graphics(), [])
+        with self.assertRaises(ValueError):
+            Canvas(400, 400).bring_to_front(first)
+
+
+    def test_columnar_rows_are_restyled_separately(self):
+        canvas = Canvas(400, 400)
+        for c in (canvas, self.canvas):
+            first = c.add_rectangle(10, 10, 50, 50, name="A")
+            second = c.add_rectangle(20, 20, 50, 50)
+            third = c.add_rectangle(30, 30, 50, 50)
+            first.fill_color("#FFFFFF")
+            second.fill_color("#FF0000")
+            third.data()["k"] = "v"
+            first.rotate(5, 5, 45)
+        self.assertEqual(
+         [first.fill_color(), second.fill_color(), third.fill_color()],
+         ["#FFFFFF", "#FF0000", "#FFFFFF"]
+        )
+        self.assertEqual([first.data(), second.data()], [{}, {}])
+        self.assertEqual(third.data(), {"k": "v"})
+        self.assertEqual(
+         [first.rotation(), second.rotation(), third.rotation()],
+         [(5, 5, 45), (0, 0, 0), (0, 0, 0)]
+        )
+        self.assertEqual(
+         [[view.x() for view in batch] for batch in self.canvas.graphics()],
+         [[10], [20], [30]]
+        )
+        self.assertIs(self.canvas.get_graphic_by_name("A"), first)
+        self.assertEqual(self.canvas.graphics_at(75, 75), [third])
+        self.assertEqual(self.canvas.to_svg(), canvas.to_svg())
+        fourth = self.canvas.add_rectangle(40, 40, 50, 50)
+        self.assertEqual(len(self.canvas.graphics()), 4)
+        self.assertEqual(fourth.data(), {})
+
+
+    def test_unchanged_columnar_rows_stay_batched(self):
+        first = self.canvas.add_rectangle(10, 10, 50, 50)
+        self.canvas.add_line(0, 0, 10, 10)
+        second = self.canvas.add_line(0, 0, 20, 20)
+        first.fill_color("#FFFFFF")
+        second.line_width(1)
+        second.transform((1, 0, 0, 1, 0, 0))
+        self.assertEqual([len(batch) for batch in self.canvas.graphics()], [1, 2])
+        second.line_color("#00FF00")
+        self.assertEqual([len(batch) for batch in self.canvas.graphics()], [1, 1, 1])
+        self.assertEqual(self.canvas.graphics()[1][0].line_color(), "#000000")
+
+
+    def test_added_batches_are_restyled_as_a_whole(self):
+        batch = self.canvas.add_rectangles([10, 20], [10, 20], [5, 5], [5, 5])
+        view = self.canvas.add_rectangle(30, 30, 5, 5)
+        self.assertEqual(len(self.canvas.graphics()), 2)
+        batch[0].fill_color("#FF0000")
+        self.assertEqual(batch[1].fill_color(), "#FF0000")
+        self.assertEqual(view.fill_color(), "#FFFFFF")
+
+
+    def test_columnar_names_survive_pickling(self):
+        self.canvas.add_rectangle(10, 10, 50, 50)
+        self.canvas.add_rectangle(20, 20, 50, 50, name="R")
+        copy = pickle.loads(pickle.dumps(self.canvas))
+        view = copy.get_graphic_by_name("R")
+        self.assertEqual(view.x(), 20)
+        self.assertIs(view, copy.graphics()[0][1])
+
+
+
 class GraphicRetrievalTests(TestCase):
 
     def setUp(self):
@@ -335,6 +606,143 @@ class GraphicRetrievalTests(TestCase):
             self.canvas.get_graphics_by_name(100)
 
 
+    def test_name_lookups_follow_renaming(self):
+        canvas = Canvas(700, 500)
+        line = canvas.add_line(0, 0, 10, 10, name="A")
+        oval = canvas.add_oval(0, 0, 10, 10, name="B")
+        self.assertIs(canvas.get_graphic_by_name("A"), line)
+        oval.name("A")
+        self.assertEqual(canvas.get_graphics_by_name("A"), [line, oval])
+        self.assertEqual(canvas.get_graphics_by_name("B"), [])
+        line.name("B")
+        self.assertIs(canvas.get_graphic_by_name("A"), oval)
+        self.assertIs(canvas.get_graphic_by_name("B"), line)
+
+
+    def test_name_lookups_include_graphics_added_later(self):
+        canvas = Canvas(700, 500)
+        self.assertIs(canvas.get_graphic_by_name("A"), None)
+        line = canvas.add_line(0, 0, 10, 10, name="A")
+        self.assertIs(canvas.get_graphic_by_name("A"), line)
+
+
+    def test_name_lookups_follow_reordering(self):
+        canvas = Canvas(700, 500)
+        line = canvas.add_line(0, 0, 10, 10, name="A")
+        oval = canvas.add_oval(0, 0, 10, 10, name="A")
+        self.assertIs(canvas.get_graphic_by_name("A"), line)
+        canvas.move_graphic_forward(line)
+        self.assertIs(canvas.get_graphic_by_name("A"), oval)
+        self.assertEqual(canvas.get_graphics_by_name("A"), [oval, line])
+
+
+    def test_name_lookups_return_new_lists(self):
+        self.canvas.get_graphics_by_name("Graphic1").append("fluff")
+        self.assertEqual(
+         self.canvas.get_graphics_by_name("Graphic1"),
+         [self.canvas._graphics[0]]
+        )
+
+
+
+class GraphicLocationTests(TestCase):
+
+    def setUp(self):
+        self.canvas = Canvas(1000, 1000)
+        self.rectangle = self.canvas.add_rectangle(10, 10, 100, 50)
+        self.line = self.canvas.add_line(500, 500, 900, 900)
+        self.polygon = self.canvas.add_polygon(100, 40, 200, 40, 150, 300)
+        self.background = self.canvas.add_rectangle(0, 0, 1000, 1000)
+
+
+    def test_can_get_graphics_at_point(self):
+        self.assertEqual(
+         set(self.canvas.graphics_at(50, 30)),
+         set([self.rectangle, self.background])
+        )
+        self.assertEqual(
+         set(self.canvas.graphics_at(105, 45)),
+         set([self.rectangle, self.polygon, self.background])
+        )
+        self.assertEqual(self.canvas.graphics_at(-50, -50), [])
+
+
+    def test_can_get_graphics_in_region(self):
+        self.assertEqual(
+         set(self.canvas.graphics_in(400, 400, 200, 200)),
+         set([self.line, self.background])
+        )
+        self.assertEqual(
+         set(self.canvas.graphics_in(0, 0, 120, 20)),
+         set([self.rectangle, self.background])
+        )
+        self.assertEqual(
+         set(self.canvas.graphics_in(-5000, -5000, 10000, 10000)),
+         set(self.canvas.graphics())
+        )
+
+
+    def test_index_follows_geometry_changes(self):
+        self.canvas.graphics_at(50, 30)
+        self.rectangle.x(600)
+        self.assertNotIn(self.rectangle, self.canvas.graphics_at(50, 30))
+        self.assertIn(self.rectangle, self.canvas.graphics_at(650, 30))
+        self.polygon.add_vertex(800, 40)
+        self.assertIn(self.polygon, self.canvas.graphics_at(700, 45))
+
+
+    def test_index_follows_rotation(self):
+        self.assertNotIn(self.rectangle, self.canvas.graphics_at(50, 100))
+        self.rectangle.rotate(60, 35, 90)
+        self.assertIn(self.rectangle, self.canvas.graphics_at(50, 70))
+        self.assertNotIn(self.rectangle, self.canvas.graphics_at(105, 35))
+
+
+    def test_index_includes_graphics_added_later(self):
+        self.canvas.graphics_at(50, 30)
+        oval = self.canvas.add_oval(40, 20, 5, 5)
+        self.assertIn(oval, self.canvas.graphics_at(42, 22))
+
+
+    def test_index_cells_are_sized_for_dense_scenes(self):
+        self.canvas.graphics_at(50, 30)
+        index = self.canvas._spatial_index
+        self.assertGreater(index.cell_size(), 1000)
+        for n in range(1000):
+            self.canvas.add_rectangle(n % 100 * 10, n // 100 * 100, 5, 5)
+        self.assertEqual(
+         self.canvas.graphics_at(992, 902)[-1], self.canvas.graphics()[-1]
+        )
+        self.assertIsNot(self.canvas._spatial_index, index)
+        self.assertLess(self.canvas._spatial_index.cell_size(), 100)
+        index = self.canvas._spatial_index
+        for graphic in self.canvas.graphics()[4:]:
+            self.canvas.remove_graphic(graphic)
+        self.canvas.graphics_at(50, 30)
+        self.assertIsNot(self.canvas._spatial_index, index)
+        self.assertGreater(self.canvas._spatial_index.cell_size(), 1000)
+
+
+    def test_batch_rows_are_indexed_by_the_batch_size(self):
+        batch = self.canvas.add_rectangles(
+         [n % 100 * 10 for n in range(1000)],
+         [n // 100 * 100 for n in range(1000)], [5] * 1000, [5] * 1000
+        )
+        self.assertEqual(self.canvas.graphics_at(992, 902)[-1], batch[-1])
+        grid = self.canvas._spatial_index._row_grids[batch]
+        self.assertLess(grid[1], 100)
+        self.assertLess(max(len(cell) for cell in grid[2].values()), 20)
+
+
+    def test_location_queries_must_be_numeric(self):
+        with self.assertRaises(TypeError):
+            self.canvas.graphics_at("10", 10)
+        with self.assertRaises(TypeError):
+            self.canvas.graphics_in(10, 10, 10, "10")
+        with self.assertRaises(ValueError):
+            self.canvas.graphics_in(10, 10, -10, 10)
+
+
 
 class GraphicReorderingTests(TestCase):
 
@@ -435,6 +843,137 @@ class GraphicReorderingTests(TestCase):
 
 
 
+class GraphicLayeringTests(TestCase):
+
+    def setUp(self):
+        self.canvas = Canvas(700, 400)
+        self.graphics = [
+         self.canvas.add_rectangle(n * 10, 0, 10, 10) for n in range(5)
+        ]
+
+
+    def test_can_bring_graphic_to_front(self):
+        self.canvas.bring_to_front(self.graphics[1])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (0, 2, 3, 4, 1)]
+        )
+        self.canvas.bring_to_front(self.graphics[1])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (0, 2, 3, 4, 1)]
+        )
+
+
+    def test_can_send_graphic_to_back(self):
+        self.canvas.send_to_back(self.graphics[3])
+        self.canvas.send_to_back(self.graphics[4])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (4, 3, 0, 1, 2)]
+        )
+
+
+    def test_can_move_graphic_to_index(self):
+        self.canvas.move_to_index(self.graphics[0], 3)
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (1, 2, 3, 0, 4)]
+        )
+        self.canvas.move_to_index(self.graphics[4], 1)
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (1, 4, 2, 3, 0)]
+        )
+        self.canvas.move_graphic_forward(self.graphics[2])
+        self.canvas.move_graphic_backward(self.graphics[1])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (1, 4, 3, 2, 0)]
+        )
+
+
+    def test_move_to_index_must_be_valid(self):
+        with self.assertRaises(TypeError):
+            self.canvas.move_to_index(self.graphics[0], "1")
+        with self.assertRaises(ValueError):
+            self.canvas.move_to_index(self.graphics[0], 5)
+        with self.assertRaises(ValueError):
+            self.canvas.move_to_index(self.graphics[0], -1)
+
+
+    def test_can_remove_graphic(self):
+        self.canvas.remove_graphic(self.graphics[2])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (0, 1, 3, 4)]
+        )
+        self.canvas.move_graphic_forward(self.graphics[3])
+        self.assertEqual(
+         self.canvas.graphics(),
+         [self.graphics[n] for n in (0, 1, 4, 3)]
+        )
+        with self.assertRaises(ValueError):
+            self.canvas.remove_graphic(self.graphics[2])
+
+
+    def test_removed_graphics_leave_indexes(self):
+        self.graphics[2].name("G")
+        self.canvas.get_graphic_by_name("G")
+        self.canvas.graphics_at(25, 5)
+        self.canvas.remove_graphic(self.graphics[2])
+        self.assertIs(self.canvas.get_graphic_by_name("G"), None)
+        self.assertNotIn(self.graphics[2], self.canvas.graphics_at(25, 5))
+        self.graphics[2].x(0)
+        self.graphics[2].name("H")
+        self.assertIs(self.canvas.get_graphic_by_name("H"), None)
+
+
+    def test_layering_must_use_graphics_on_canvas(self):
+        for method in (
+         self.canvas.bring_to_front, self.canvas.send_to_back,
+         self.canvas.remove_graphic
+        ):
+            with self.assertRaises(TypeError):
+                method("...")
+            with self.assertRaises(ValueError):
+                method(graphics.Rectangle(0, 0, 10, 10))
+
+
+    def test_name_lookups_follow_layering(self):
+        for graphic in self.graphics[1:4]:
+            graphic.name("G")
+        self.canvas.get_graphics_by_name("G")
+        self.canvas.send_to_back(self.graphics[3])
+        self.assertEqual(
+         self.canvas.get_graphics_by_name("G"),
+         [self.graphics[n] for n in (3, 1, 2)]
+        )
+        self.canvas.bring_to_front(self.graphics[1])
+        self.assertEqual(
+         self.canvas.get_graphics_by_name("G"),
+         [self.graphics[n] for n in (3, 2, 1)]
+        )
+        self.graphics[0].name("G")
+        self.assertEqual(
+         self.canvas.get_graphics_by_name("G"),
+         [self.graphics[n] for n in (3, 0, 2, 1)]
+        )
+
+
+    def test_location_queries_are_in_paint_order(self):
+        self.canvas.add_rectangle(0, 0, 100, 100)
+        self.canvas.send_to_back(self.graphics[1])
+        self.assertEqual(
+         self.canvas.graphics_at(15, 5)[0], self.graphics[1]
+        )
+        self.assertEqual(
+         self.canvas.graphics_in(0, 0, 100, 100),
+         self.canvas.graphics()
+        )
+
+
+
 class CanvasSvgTests(TestCase):
 
     def test_can_make_shell_svg(self):
@@ -478,13 +1017,270 @@ class CanvasSvgTests(TestCase):
 
 
 
+    def test_svg_chunks_join_to_svg(self):
+        canvas = Canvas(300, 200, background_color="#123456")
+        canvas.add_line(0, 0, 300, 200)
+        canvas.add_rectangle(10, 10, 50, 50)
+        self.assertEqual("".join(canvas.iter_svg()), canvas.to_svg())
+        canvas = Canvas(300, 200)
+        self.assertEqual("".join(canvas.iter_svg()), canvas.to_svg())
+
+
+
+    def test_can_write_styles_as_css_classes(self):
+        canvas = Canvas(300, 200)
+        canvas.add_rectangle(10, 10, 50, 50, fill_color="#FF0000")
+        canvas.add_line(0, 0, 300, 200)
+        canvas.add_rectangle(20, 20, 50, 50, fill_color="#FF0000")
+        canvas.add_ovals([10, 20], [10, 20], [5, 5], [5, 5], data={"a": "b"})
+        svg = canvas.to_svg(css_classes=True)
+        self.assertIn(
+         '<style>\n'
+         '.s0{fill:#FF0000;stroke:#000000;}\n'
+         '.s1{stroke:#000000;}\n'
+         '.s2{fill:#FFFFFF;stroke:#000000;}\n'
+         '</style>\n', svg
+        )
+        self.assertNotIn(" style=", svg)
+        self.assertEqual(svg.count('class="s0"'), 2)
+        self.assertEqual(svg.count('class="s2"'), 2)
+        self.assertIn(
+         '<ellipse cx="22.5" cy="22.5" rx="2.5" ry="2.5" class="s2" a="b" />',
+         svg
+        )
+
+
+    def test_css_classes_keep_everything_else(self):
+        canvas = Canvas(300, 200, background_color="#123456")
+        canvas.add_polygon(10, 10, 50, 50, 10, 50, line_style="..")
+        canvas.add_text(10, 10, "Hello", font_size=12)
+        plain, classed = canvas.to_svg(), canvas.to_svg(css_classes=True)
+        for name, graphic in zip(("s0", "s1"), canvas.graphics()):
+            style = graphic.to_svg().split(' style="')[1].split('"')[0]
+            self.assertIn(".%s{%s}\n" % (name, style), classed)
+            plain = plain.replace(
+             graphic.to_svg(),
+             graphic.to_svg().replace(' style="%s"' % style, ' class="%s"' % name)
+            )
+        self.assertIn("stroke-dasharray", classed)
+        self.assertTrue(classed.endswith(plain.split("\n", 3)[3]))
+        self.assertEqual("".join(canvas.iter_svg(css_classes=True)), classed)
+
+
+    def test_css_classes_only_replace_element_styles(self):
+        canvas = Canvas(300, 200)
+        canvas.add_text(10, 10, '"a" style="b"', data={"note": "c style=d"})
+        canvas.add_rectangle(10, 10, 50, 50, data={"title": '" style="e'})
+        svg = canvas.to_svg(css_classes=True)
+        self.assertIn('class="s0" note="c style=d">"a" style="b"</text>', svg)
+        self.assertIn('class="s1" title="" style="e" />', svg)
+        self.assertNotIn(".s2", svg)
+
+
+    def test_css_classes_render_graphics_once(self):
+        canvas = Canvas(300, 200)
+        canvas.add_rectangle(10, 10, 50, 50)
+        with patch.object(
+         graphics.Rectangle, "_generate_svg", autospec=True,
+         side_effect=graphics.Rectangle._generate_svg
+        ) as generate:
+            canvas.to_svg(css_classes=True, precision=2)
+        self.assertEqual(generate.call_count, 1)
+
+
+    def test_instance_templates_are_written_once_in_defs(self):
+        canvas = Canvas(300, 200)
+        marker = graphics.Polygon(0, -5, 5, 5, -5, 5)
+        for x in range(10):
+            canvas.add_instance(marker, x * 20, 100)
+        canvas.add_instance(canvas.add_instance(marker, 0, 0), 5, 5)
+        svg = canvas.to_svg()
+        template_id = generate_template_id(marker)
+        self.assertEqual(svg.count("<polygon"), 1)
+        self.assertIn(
+         '<defs>\n<g id="%s">\n%s\n</g>\n' % (template_id, marker.to_svg()), svg
+        )
+        self.assertEqual(svg.count('<use href="#%s"' % template_id), 12)
+        self.assertEqual(svg.count("<use "), 13)
+        self.assertEqual(svg.count("<g id="), 2)
+        classed = canvas.to_svg(css_classes=True)
+        self.assertIn('<polygon points="0.0,-5.0, 5.0,5.0, -5.0,5.0" class="s0" />', classed)
+
+
+    def test_can_set_svg_precision(self):
+        canvas = Canvas(300, 200)
+        canvas.add_line(0, 0.125, 300, 200, line_style="--")
+        canvas.add_polygon(10, 10, 50, 50.5, 10, 50, rotation=(10, 10, 45))
+        svg = canvas.to_svg(precision=2)
+        self.assertIn('<line x1="0.00" y1="0.12" x2="300.00" y2="200.00"', svg)
+        self.assertIn("stroke-dasharray:10.00,5.00;", svg)
+        self.assertIn('points="10.00,10.00, 50.00,50.50, 10.00,50.00"', svg)
+        self.assertIn('transform="rotate(45.00 10.00 10.00)"', svg)
+        self.assertIn('<line x1="0" y1="0" x2="300" y2="200"', canvas.to_svg(precision=0))
+        self.assertEqual(canvas.to_svg(precision=1), canvas.to_svg())
+
+
+    def test_can_minify_svg(self):
+        canvas = Canvas(300, 200, background_color="#FFFFFF")
+        canvas.add_rectangle(10, 10.5, 50, 50, fill_color="#FF0000", opacity=0.5)
+        canvas.add_polygon(10, 10, 50, 50, 10, 50, line_style="..", line_width=2)
+        canvas.add_text(10, 10, "1.50", fill_color="#000000")
+        canvas.add_polyline(0, -0.01, 10, 10, line_width=0)
+        self.assertEqual(canvas.to_svg(minify=True), "\n".join((
+         '<svg xmlns="http://www.w3.org/2000/svg" width="300" height="200">',
+         '<rect width="300" height="200" style="fill:#FFF"/>',
+         '<rect x="10" y="10.5" width="50" height="50"'
+         ' style="fill:#F00;fill-opacity:.5;stroke:#000;"/>',
+         '<polygon points="10,10 50,50 10,50" style="fill:#FFF;stroke:#000;'
+         'stroke-width:2;stroke-dasharray:2,4;"/>',
+         '<text x="10" y="10" text-anchor="middle" alignment-baseline="middle"'
+         ' style="font-size:18;">1.50</text>',
+         '<polyline points="0,0 10,10" style="fill:none;"/>',
+         '</svg>'
+        )))
+
+
+    def test_minified_svg_leaves_out_empty_styles(self):
+        canvas = Canvas(300, 200)
+        canvas.add_rectangle(10, 10, 50, 50, fill_color="#000000", line_width=0)
+        canvas.add_rectangles(
+         [70, 80], [10, 10], [5, 5], [5, 5], fill_color="#000000", line_width=0
+        )
+        canvas.add_line(0, 0, 10, 10, line_width=0)
+        canvas.add_oval(10, 10, 5, 5, line_width=3)
+        svg = canvas.to_svg(minify=True)
+        self.assertIn('<rect x="10" y="10" width="50" height="50"/>', svg)
+        self.assertIn('<rect x="80" y="10" width="5" height="5"/>', svg)
+        self.assertIn('<line x1="0" y1="0" x2="10" y2="10"/>', svg)
+        self.assertNotIn('style=""', svg)
+        classed = canvas.to_svg(minify=True, css_classes=True)
+        self.assertIn("<style>\n.s0{fill:#FFF;stroke:#000;stroke-width:3;}\n</style>", classed)
+        self.assertNotIn("{}", classed)
+        self.assertEqual(classed.count("class="), 1)
+        self.assertIn('<rect x="10" y="10" width="50" height="50"/>', classed)
+
+
+    def test_minified_batches_match_minified_graphics(self):
+        batched, separate = Canvas(300, 200), Canvas(300, 200)
+        xs, ys = [0.5, 1, -0.25, 7], [3, 3, 3, 3]
+        batched.add_ovals(xs, ys, [2] * 4, [1.5] * 4, data={"p": "5%"})
+        for x, y in zip(xs, ys):
+            separate.add_oval(x, y, 2, 1.5, data={"p": "5%"})
+        for options in ({"minify": True}, {"precision": 3}):
+            self.assertEqual(
+             batched.to_svg(**options), separate.to_svg(**options)
+            )
+
+
+    def test_svg_options_are_validated(self):
+        canvas = Canvas(300, 200)
+        with self.assertRaises(TypeError):
+            canvas.to_svg(precision=1.5)
+        with self.assertRaises(TypeError):
+            canvas.to_svg(precision=True)
+        with self.assertRaises(ValueError):
+            canvas.to_svg(precision=-1)
+        with self.assertRaises(TypeError):
+            canvas.to_svg(minify="yes")
+        with self.assertRaises(TypeError):
+            canvas.to_svg(tolerance="1")
+        with self.assertRaises(ValueError):
+            canvas.to_svg(tolerance=-1)
+
+
+    def test_can_simplify_paths_when_rendering(self):
+        canvas = Canvas(300, 200)
+        coordinates = []
+        for x in range(3000):
+            coordinates += (x / 10, 100 + (x % 3) / 100)
+        polyline = canvas.add_polyline(*coordinates)
+        polygon = canvas.add_polygon(10, 10, 20, 10.1, 30, 10, 30, 30)
+        svg = canvas.to_svg(tolerance=0.5)
+        self.assertIn('<polyline points="0.0,100.0, 299.9,100.0"', svg)
+        self.assertIn('<polygon points="10.0,10.0, 30.0,10.0, 30.0,30.0"', svg)
+        self.assertEqual(len(polyline.coordinates()), 6000)
+        self.assertEqual(len(polygon.coordinates()), 8)
+        self.assertIn(polyline.to_svg(), canvas.to_svg())
+        self.assertEqual(canvas.to_svg(tolerance=0), canvas.to_svg())
+
+
+    def test_can_render_viewport(self):
+        canvas = Canvas(1000, 1000, background_color="#123456")
+        inside = canvas.add_rectangle(110, 110, 20, 20)
+        outside = canvas.add_rectangle(500, 500, 20, 20)
+        rotated = canvas.add_rectangle(-40, 120, 20, 20, rotation=(50, 125, 180))
+        line = canvas.add_line(0, 0, 1000, 1000)
+        svg = canvas.to_svg(viewport=(100, 100, 50, 40.4))
+        self.assertIn(
+         '<svg xmlns="http://www.w3.org/2000/svg" width="50" height="40"'
+         ' viewBox="100.0 100.0 50.0 40.4">', svg
+        )
+        self.assertIn(
+         '<rect x="100.0" y="100.0" width="50.0" height="40.4" style="fill:#123456;', svg
+        )
+        self.assertIn(inside.to_svg() + "\n" + rotated.to_svg(), svg)
+        self.assertIn(line.to_svg(), svg)
+        self.assertNotIn(outside.to_svg(), svg)
+        self.assertEqual("".join(canvas.iter_svg(viewport=(100, 100, 50, 40.4))), svg)
+
+
+    def test_viewport_culls_batch_rows(self):
+        canvas = Canvas(1000, 1000)
+        batch = canvas.add_ovals([0, 500, 10], [0, 500, 10], [5, 5, 5], [5, 5, 5])
+        svg = canvas.to_svg(viewport=(0, 0, 100, 100), minify=True)
+        self.assertEqual(svg.count("<ellipse"), 2)
+        self.assertIn(batch[2]._generate_svg(SvgFormat(minify=True)), svg)
+        self.assertNotIn("<ellipse", canvas.to_svg(viewport=(200, 200, 10, 10)))
+        self.assertEqual(canvas.to_svg(viewport=(0, 0, 1000, 1000)).count(
+         batch.to_svg()
+        ), 1)
+
+
+    def test_viewport_is_validated(self):
+        canvas = Canvas(300, 200)
+        with self.assertRaises(TypeError):
+            canvas.to_svg(viewport=[0, 0, 10, 10])
+        with self.assertRaises(ValueError):
+            canvas.to_svg(viewport=(0, 0, 10))
+        with self.assertRaises(TypeError):
+            canvas.to_svg(viewport=(0, 0, "10", 10))
+        with self.assertRaises(ValueError):
+            canvas.to_svg(viewport=(0, 0, 0, 10))
+
+
+    def test_css_classes_must_be_bool(self):
+        with self.assertRaises(TypeError):
+            Canvas(300, 200).to_svg(css_classes="yes")
+
+
+
+class CanvasPicklingTests(TestCase):
+
+    def test_can_pickle_canvas(self):
+        canvas = Canvas(300, 200, background_color="#123456")
+        canvas.add_rectangle(10, 10, 50, 50, name="R")
+        canvas.add_ovals([10, 20], [10, 20], [5, 5], [5, 5])
+        canvas.get_graphic_by_name("R")
+        canvas.graphics_at(30, 30)
+        copy = pickle.loads(pickle.dumps(canvas))
+        self.assertEqual(copy.to_svg(), canvas.to_svg())
+        rectangle = copy.graphics()[0]
+        self.assertIs(rectangle._parent, copy)
+        rectangle.name("S")
+        self.assertIs(copy.get_graphic_by_name("S"), rectangle)
+        rectangle.x(100)
+        self.assertEqual(copy.graphics_at(120, 30), [rectangle])
+
+
+
 class CanvasSavingTests(TestCase):
 
     def tearDown(self):
-        try:
-            os.remove("test.svg")
-        except OSError:
-            pass
+        for path in ("test.svg", "test.svgz"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
 
     def test_can_save_canvas_as_svg(self):
@@ -493,3 +1289,80 @@ class CanvasSavingTests(TestCase):
         self.assertIn("test.svg", os.listdir())
         with open("test.svg") as f:
             self.assertEqual(f.read(), canvas.to_svg())
+
+
+    def test_can_save_canvas_with_css_classes(self):
+        canvas = Canvas(300, 200)
+        canvas.add_rectangle(10, 10, 50, 50)
+        canvas.save("test.svg", css_classes=True)
+        with open("test.svg") as f:
+            self.assertEqual(f.read(), canvas.to_svg(css_classes=True))
+
+
+    def test_can_save_canvas_as_svgz(self):
+        canvas = Canvas(300, 200)
+        for n in range(50):
+            canvas.add_oval(n, n, 10, 10)
+        canvas.save("test.svgz")
+        with gzip.open("test.svgz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), canvas.to_svg())
+        canvas.save("test.svg", compress=True, css_classes=True)
+        with gzip.open("test.svg", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), canvas.to_svg(css_classes=True))
+        canvas.save("test.svgz", compress=False)
+        with open("test.svgz") as f:
+            self.assertEqual(f.read(), canvas.to_svg())
+
+
+    def test_can_save_minified_svg(self):
+        canvas = Canvas(300, 200)
+        canvas.add_rectangle(10, 10, 50, 50)
+        canvas.save("test.svgz", minify=True, precision=2)
+        with gzip.open("test.svgz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), canvas.to_svg(minify=True, precision=2))
+        with self.assertRaises(TypeError):
+            canvas.save("test.svg", minify="yes")
+        self.assertNotIn("test.svg", os.listdir())
+
+
+    def test_compress_must_be_bool(self):
+        with self.assertRaises(TypeError):
+            Canvas(300, 200).save("test.svg", compress="gzip")
+
+
+    def test_can_write_svg_to_text_stream(self):
+        canvas = Canvas(300, 200)
+        for n in range(50):
+            canvas.add_oval(n, n, 10, 10)
+        f = io.StringIO()
+        canvas.write_svg(f, chunk_size=100)
+        self.assertEqual(f.getvalue(), canvas.to_svg())
+
+
+    def test_can_write_svg_to_binary_stream(self):
+        canvas = Canvas(300, 200, background_color="#123456")
+        canvas.add_text(10, 10, "café")
+        f = io.BytesIO()
+        canvas.write_svg(f)
+        self.assertEqual(f.getvalue(), canvas.to_svg().encode("utf-8"))
+
+
+    def test_write_svg_writes_in_chunks(self):
+        canvas = Canvas(300, 200)
+        for n in range(50):
+            canvas.add_oval(n, n, 10, 10)
+        f = Mock()
+        canvas.write_svg(f, chunk_size=1000)
+        self.assertGreater(f.write.call_count, 1)
+        self.assertEqual(
+         b"".join(call[0][0] for call in f.write.call_args_list),
+         canvas.to_svg().encode("utf-8")
+        )
+
+
+    def test_chunk_size_must_be_positive_int(self):
+        canvas = Canvas(300, 200)
+        with self.assertRaises(TypeError):
+            canvas.write_svg(io.StringIO(), chunk_size=10.5)
+        with self.assertRaises(ValueError):
+            canvas.write_svg(io.StringIO(), chunk_size=0)
@@ -1,7 +1,9 @@
 from unittest import TestCase
 import omnicanvas
 import omnicanvas.color
-from omnicanvas.color import hsl_to_rgb, colors
+from omnicanvas.color import hsl_to_rgb, colors, process_color, is_valid_color
+from omnicanvas.color import hsl_to_rgb_many, rgb_to_hex_many, gradient
+from omnicanvas.color import apply_colormap, get_colormap, RED, BLUE
 
 class HslConversionTests(TestCase):
 
@@ -56,6 +58,105 @@ class HslConversionTests(TestCase):
 
 
 
+class ManyColorConversionTests(TestCase):
+
+    def test_can_convert_many_hsl_colors(self):
+        hues, saturations, lightnesses = [108, 8, 300.5], [100, 87, 6], [50, 31, 61]
+        self.assertEqual(
+         hsl_to_rgb_many(hues, saturations, lightnesses),
+         [hsl_to_rgb(*hsl) for hsl in zip(hues, saturations, lightnesses)]
+        )
+        self.assertEqual(hsl_to_rgb_many([], [], []), [])
+
+
+    def test_repeated_hsl_colors_give_same_results(self):
+        hues = [(value * 7) % 360 for value in range(10000)]
+        saturations = [value % 3 * 50 for value in range(10000)]
+        lightnesses = [value % 5 * 20 for value in range(10000)]
+        colors = hsl_to_rgb_many(hues, saturations, lightnesses)
+        for index in (0, 1, 4999, 9999):
+            self.assertEqual(colors[index], hsl_to_rgb(
+             hues[index], saturations[index], lightnesses[index]
+            ))
+
+
+    def test_many_hsl_colors_are_validated(self):
+        with self.assertRaises(TypeError):
+            hsl_to_rgb_many(["108"], [100], [50])
+        with self.assertRaises(ValueError):
+            hsl_to_rgb_many([361], [100], [50])
+        with self.assertRaises(ValueError):
+            hsl_to_rgb_many([108], [-1], [50])
+        with self.assertRaises(ValueError):
+            hsl_to_rgb_many([108, 0], [100], [50])
+
+
+    def test_can_convert_many_rgb_colors(self):
+        self.assertEqual(
+         rgb_to_hex_many([255, 0], [0, 16], [10, 255]), ["#FF000A", "#0010FF"]
+        )
+        with self.assertRaises(TypeError):
+            rgb_to_hex_many([1.5], [0], [0])
+        with self.assertRaises(ValueError):
+            rgb_to_hex_many([256], [0], [0])
+        with self.assertRaises(ValueError):
+            rgb_to_hex_many([0, 1], [0], [0])
+
+
+    def test_can_make_gradients(self):
+        self.assertEqual(
+         gradient(RED, BLUE, steps=3), [RED, "#786982", BLUE]
+        )
+        self.assertEqual(
+         gradient("#000000", "#ff0000", "#ffffff", steps=5),
+         ["#000000", "#800000", "#FF0000", "#FF8080", "#FFFFFF"]
+        )
+        with self.assertRaises(ValueError):
+            gradient(RED)
+        with self.assertRaises(ValueError):
+            gradient(RED, BLUE, steps=1)
+        with self.assertRaises(TypeError):
+            gradient(RED, BLUE, steps=2.5)
+
+
+    def test_can_apply_colormaps(self):
+        self.assertEqual(len(get_colormap("viridis")), 256)
+        self.assertIs(get_colormap("viridis"), get_colormap("viridis"))
+        self.assertEqual(
+         apply_colormap([0, 5, 10, 20], "greys", maximum=10),
+         ["#000000", "#7F7F7F", "#FFFFFF", "#FFFFFF"]
+        )
+        self.assertEqual(
+         apply_colormap([3, 1, 2], [RED, BLUE]), [BLUE, RED, RED]
+        )
+        self.assertEqual(apply_colormap([4, 4], [RED, BLUE]), [RED, RED])
+        with self.assertRaises(ValueError):
+            apply_colormap([1], "nothing")
+        with self.assertRaises(TypeError):
+            apply_colormap(["1"])
+
+
+
+class ColorProcessingTests(TestCase):
+
+    def test_can_process_colors(self):
+        self.assertEqual(process_color("#ff00aB"), "#FF00AB")
+        self.assertIs(process_color("#ff00ab"), process_color("#FF00AB"))
+        self.assertIs(process_color("#"+ "ab1234"), process_color("#AB1234"))
+
+
+    def test_invalid_colors_are_rejected(self):
+        for color in ("", "ff00ab", "#ff00a", "#ff00abc", "#gg00ab", "#ff00ab\n"):
+            self.assertFalse(is_valid_color(color))
+            with self.assertRaises(ValueError):
+                process_color(color)
+            with self.assertRaises(ValueError):
+                process_color(color)
+        with self.assertRaises(TypeError):
+            process_color(0xFF00AB)
+
+
+
 class ColorConstantTests(TestCase):
 
     def test_all_named_colors_in_list(self):
@@ -1,5 +1,15 @@
+import copy
+import pickle
 from unittest import TestCase
-from omnicanvas.graphics import Graphic
+from omnicanvas.graphics import Graphic, Rectangle, Polygon, Polyline, Text
+
+class Labelled(Rectangle):
+
+    def __init__(self, *args, label="", **kwargs):
+        Rectangle.__init__(self, *args, **kwargs)
+        self.label = label
+
+
 
 class GraphicCreationTests(TestCase):
 
@@ -250,6 +260,114 @@ class GraphicPropertyTests(TestCase):
 
 
 
+class GraphicTransformTests(TestCase):
+
+    def assertTransformAlmostEqual(self, transform1, transform2):
+        self.assertEqual(len(transform1), len(transform2))
+        for value1, value2 in zip(transform1, transform2):
+            self.assertAlmostEqual(value1, value2)
+
+
+    def test_graphics_start_with_identity_transform(self):
+        graphic = Graphic()
+        self.assertEqual(graphic.transform(), (1, 0, 0, 1, 0, 0))
+        self.assertEqual(graphic.matrix(), (1, 0, 0, 1, 0, 0))
+
+
+    def test_can_set_transform(self):
+        graphic = Graphic()
+        graphic.transform((2, 0, 0, 3, 10, 20))
+        self.assertEqual(graphic.transform(), (2, 0, 0, 3, 10, 20))
+
+
+    def test_transform_must_be_tuple_of_six_numbers(self):
+        graphic = Graphic()
+        with self.assertRaises(TypeError):
+            graphic.transform([1, 0, 0, 1, 0, 0])
+        with self.assertRaises(ValueError):
+            graphic.transform((1, 0, 0, 1))
+        with self.assertRaises(TypeError):
+            graphic.transform((1, 0, 0, 1, 0, "0"))
+
+
+    def test_transforms_compose(self):
+        graphic = Graphic()
+        graphic.translate(10, 20)
+        graphic.scale(2)
+        self.assertEqual(graphic.transform(), (2, 0, 0, 2, 20, 40))
+        graphic.scale(0.5, 1, 10, 10)
+        self.assertEqual(graphic.transform(), (1, 0, 0, 2, 15, 40))
+
+
+    def test_rotate_by_sums(self):
+        graphic = Graphic()
+        graphic.rotate_by(10, 10, 30)
+        graphic.rotate_by(10, 10, 60)
+        self.assertTransformAlmostEqual(graphic.transform(), (0, 1, -1, 0, 20, 0))
+        self.assertEqual(graphic.rotation(), (0, 0, 0))
+
+
+    def test_can_skew(self):
+        graphic = Graphic()
+        graphic.skew(45)
+        self.assertTransformAlmostEqual(graphic.transform(), (1, 0, 1, 1, 0, 0))
+        graphic = Graphic()
+        graphic.skew(0, 45, 10, 0)
+        self.assertTransformAlmostEqual(graphic.transform(), (1, 1, 0, 1, 0, -10))
+
+
+    def test_transform_methods_need_numbers(self):
+        graphic = Graphic()
+        with self.assertRaises(TypeError):
+            graphic.translate(10, "20")
+        with self.assertRaises(TypeError):
+            graphic.scale("2")
+        with self.assertRaises(TypeError):
+            graphic.skew(10, y_origin="5")
+        with self.assertRaises(TypeError):
+            graphic.rotate_by(10, 10, "30")
+
+
+    def test_matrix_applies_rotation_then_transform(self):
+        graphic = Graphic(rotation=(0, 0, 90))
+        graphic.translate(10, 0)
+        self.assertTransformAlmostEqual(graphic.matrix(), (0, 1, -1, 0, 10, 0))
+
+
+    def test_matrices_are_shared(self):
+        graphic1, graphic2 = Graphic(rotation=(5, 5, 30)), Graphic(rotation=(5, 5, 30))
+        graphic1.scale(2)
+        graphic2.scale(2)
+        self.assertIs(graphic1.matrix(), graphic2.matrix())
+
+
+    def test_transform_changes_bounds_and_svg(self):
+        rectangle = Rectangle(0, 0, 10, 20, line_width=0)
+        rectangle.to_svg()
+        self.assertEqual(rectangle.bounding_box(), (0, 0, 10, 20))
+        rectangle.scale(2, 3, 5, 0)
+        self.assertEqual(rectangle.bounding_box(), (-5, 0, 20, 60))
+        self.assertIn("matrix(", rectangle.to_svg())
+
+
+    def test_can_get_transformed_coordinates(self):
+        for shape in (Polygon(0, 0, 10, 0, 10, 10), Polyline(0, 0, 10, 0, 10, 10)):
+            shape.scale(2)
+            shape.translate(1, 1)
+            self.assertEqual(
+             list(shape.transformed_coordinates()), [1, 1, 21, 1, 21, 21]
+            )
+            self.assertEqual(list(shape.coordinates()), [0, 0, 10, 0, 10, 10])
+
+
+    def test_transforms_are_pickled(self):
+        rectangle = Rectangle(10, 10, 50, 50)
+        rectangle.skew(10, 20)
+        copy = pickle.loads(pickle.dumps(rectangle))
+        self.assertEqual(copy.transform(), rectangle.transform())
+
+
+
 class GraphicSvgTests(TestCase):
 
     def test_graphic_can_produce_stroke_svg(self):
@@ -313,6 +431,19 @@ class GraphicSvgTests(TestCase):
         )
 
 
+    def test_transform_produces_single_matrix(self):
+        graphic = Graphic(rotation=(10, 10, 90))
+        graphic.translate(5, 0)
+        self.assertEqual(
+         graphic.rotation_svg(), ' transform="matrix(0 1 -1 0 25.0 0.0)"'
+        )
+        graphic = Graphic()
+        graphic.scale(0.5, 2)
+        self.assertEqual(
+         graphic.rotation_svg(), ' transform="matrix(0.5 0 0 2 0.0 0.0)"'
+        )
+
+
     def test_data_in_svg(self):
         graphic = Graphic(data={"onclick":"func(true);"})
         self.assertEqual(graphic.data_svg(), ' onclick="func(true);"')
@@ -329,3 +460,50 @@ class GraphicSvgTests(TestCase):
          ' ',
          graphic.data_svg()
         )
+
+
+
+class GraphicStorageTests(TestCase):
+
+    def test_graphics_have_no_instance_dict(self):
+        for graphic in (
+         Graphic(), Rectangle(10, 10, 50, 50), Polygon(1, 2, 3, 4, 5, 6),
+         Text(10, 10, "Text")
+        ):
+            self.assertFalse(hasattr(graphic, "__dict__"))
+            with self.assertRaises(AttributeError):
+                graphic.extra = 5
+
+
+    def test_graphics_can_be_pickled(self):
+        rectangle = Rectangle(
+         10, 10, 50, 50, name="R", rotation=(5, 5, 45), data={"a": "b"}
+        )
+        rectangle.to_svg()
+        copy = pickle.loads(pickle.dumps(rectangle))
+        self.assertEqual(copy.to_svg(), rectangle.to_svg())
+        self.assertEqual(copy.name(), "R")
+        self.assertIs(copy._parent, None)
+        copy.data()["c"] = "d"
+        self.assertIn('c="d"', copy.to_svg())
+        self.assertNotIn('c="d"', rectangle.to_svg())
+
+
+    def test_copies_of_graphics_have_their_own_data(self):
+        rectangle = Rectangle(10, 10, 50, 50, data={"a": "b"})
+        for copied in (copy.copy(rectangle), copy.deepcopy(rectangle)):
+            rectangle_svg, copied_svg = rectangle.to_svg(), copied.to_svg()
+            copied.data()["c"] = "d"
+            self.assertIs(rectangle._svg, rectangle_svg)
+            self.assertIn('c="d"', copied.to_svg())
+            self.assertNotIn('c="d"', rectangle.to_svg())
+            self.assertIs(copied.data()._graphic, copied)
+            self.assertEqual(copied.data(), {"a": "b", "c": "d"})
+            self.assertEqual(rectangle.data(), {"a": "b"})
+
+
+    def test_graphics_can_be_subclassed(self):
+        graphic = Labelled(10, 10, 50, 50, label="L")
+        copy = pickle.loads(pickle.dumps(graphic))
+        self.assertEqual(copy.label, "L")
+        self.assertEqual(copy.x(), 10)
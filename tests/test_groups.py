@@ -0,0 +1,214 @@
+import pickle
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.graphics import Graphic, Group, Rectangle, Oval, Instance, Image
+from omnicanvas.svg import SvgFormat
+from .test_raster import decode_png
+from .test_images import GIF, embedded_data
+
+class GroupCreationTests(TestCase):
+
+    def setUp(self):
+        self.rectangle = Rectangle(10, 10, 20, 20, line_width=0)
+        self.oval = Oval(40, 0, 10, 50, line_width=0)
+
+
+    def test_can_create_group(self):
+        group = Group([self.rectangle, self.oval])
+        self.assertIsInstance(group, Graphic)
+        self.assertEqual(group._graphics, [self.rectangle, self.oval])
+        self.assertEqual(group._opacity, 1)
+        self.assertEqual(group._line_width, 0)
+        self.assertIs(self.rectangle._parent, group)
+        self.assertEqual(group.graphics(), [self.rectangle, self.oval])
+        self.assertEqual(len(group), 2)
+
+
+    def test_group_repr(self):
+        self.assertEqual(str(Group([self.rectangle])), "<Group (1 Graphics)>")
+
+
+    def test_group_opacity_must_be_valid(self):
+        with self.assertRaises(TypeError):
+            Group(opacity="0.5")
+        with self.assertRaises(ValueError):
+            Group(opacity=1.5)
+
+
+    def test_can_add_and_remove_graphics(self):
+        group = Group([self.rectangle])
+        group.add_graphic(self.oval)
+        self.assertEqual(group.graphics(), [self.rectangle, self.oval])
+        group.remove_graphic(self.rectangle)
+        self.assertEqual(group.graphics(), [self.oval])
+        self.assertIs(self.rectangle._parent, None)
+        with self.assertRaises(ValueError):
+            group.remove_graphic(self.rectangle)
+        with self.assertRaises(TypeError):
+            group.add_graphic("rectangle")
+
+
+    def test_graphics_can_only_be_in_one_place(self):
+        Group([self.rectangle])
+        with self.assertRaises(ValueError):
+            Group([self.rectangle])
+        canvas = Canvas(100, 100)
+        line = canvas.add_line(0, 0, 10, 10)
+        with self.assertRaises(ValueError):
+            Group([line])
+
+
+    def test_groups_can_be_nested_but_not_circularly(self):
+        inner = Group([self.rectangle])
+        outer = Group([inner])
+        with self.assertRaises(ValueError):
+            inner.add_graphic(inner)
+        outer.remove_graphic(inner)
+        inner.add_graphic(outer)
+        with self.assertRaises(ValueError):
+            outer.add_graphic(inner)
+
+
+    def test_group_bounds_contain_graphics(self):
+        group = Group([self.rectangle, self.oval])
+        self.assertEqual(group.bounding_box(), (10, 0, 40, 50))
+        self.rectangle.x(0)
+        self.assertEqual(group.bounding_box(), (0, 0, 50, 50))
+        group.translate(5, 5)
+        self.assertEqual(group.bounding_box(), (5, 5, 50, 50))
+        self.assertEqual(Group().bounding_box(), (0, 0, 0, 0))
+
+
+    def test_groups_can_be_pickled(self):
+        group = Group([self.rectangle, Group([self.oval])], opacity=0.5)
+        group.to_svg()
+        copy = pickle.loads(pickle.dumps(group))
+        self.assertIs(copy._contents, None)
+        self.assertEqual(copy.to_svg(), group.to_svg())
+        rectangle = copy.graphics()[0]
+        self.assertIs(rectangle._parent, copy)
+        rectangle.fill_color("#FF0000")
+        self.assertIn("#FF0000", copy.to_svg())
+
+
+
+class GroupSvgTests(TestCase):
+
+    def setUp(self):
+        self.rectangle = Rectangle(10, 10, 20, 20)
+        self.oval = Oval(40, 0, 10, 50)
+        self.group = Group([self.rectangle, self.oval])
+
+
+    def test_group_svg(self):
+        self.assertEqual(self.group.to_svg(), "<g>\n%s\n%s\n</g>" % (
+         self.rectangle.to_svg(), self.oval.to_svg()
+        ))
+
+
+    def test_group_attributes_svg(self):
+        group = Group(
+         [Rectangle(0, 0, 5, 5)], opacity=0.5, rotation=(10, 10, 90),
+         data={"a": "b"}
+        )
+        self.assertTrue(group.to_svg().startswith(
+         '<g opacity="0.500" transform="rotate(90.0 10.0 10.0)" a="b">\n'
+        ))
+        group.scale(2)
+        self.assertTrue(
+         group.to_svg().startswith('<g opacity="0.500" transform="matrix(')
+        )
+
+
+    def test_changing_group_keeps_contents(self):
+        self.group.to_svg()
+        contents = self.group._contents
+        self.group.translate(5, 5)
+        self.group.opacity(0.25)
+        self.assertIs(self.group._contents, contents)
+        self.assertEqual(len(contents), 1)
+        self.assertTrue(self.group.to_svg().endswith(contents[0] + "\n</g>"))
+        self.assertIsNotNone(self.rectangle._svg)
+
+
+    def test_changing_graphics_updates_group(self):
+        self.group.to_svg()
+        self.rectangle.fill_color("#FF0000")
+        self.assertIn("fill:#FF0000;", self.group.to_svg())
+        self.oval.data()["a"] = "b"
+        self.assertIn('a="b"', self.group.to_svg())
+        outer = Group([self.group])
+        outer.to_svg()
+        self.rectangle.x(15)
+        self.assertIn('x="15.0"', outer.to_svg())
+
+
+    def test_formatted_group_svg(self):
+        svg = self.group._generate_svg(SvgFormat(minify=True))
+        self.assertIn('<rect x="10" y="10" width="20" height="20"', svg)
+        self.assertNotIn('<rect x="10"', self.group.to_svg())
+
+
+
+class CanvasGroupTests(TestCase):
+
+    def test_can_add_group(self):
+        canvas = Canvas(100, 100)
+        rectangle = Rectangle(10, 10, 20, 20)
+        group = canvas.add_group([rectangle], name="G")
+        self.assertIsInstance(group, Group)
+        self.assertEqual(canvas.graphics(), [group])
+        self.assertIs(canvas.get_graphic_by_name("G"), group)
+        self.assertEqual(canvas.graphics_at(20, 20), [group])
+        rectangle.x(60)
+        self.assertEqual(canvas.graphics_at(20, 20), [])
+        self.assertEqual(canvas.graphics_at(70, 20), [group])
+
+
+    def test_canvas_svg_with_groups(self):
+        canvas = Canvas(100, 100)
+        template = Rectangle(0, 0, 5, 5, fill_color="#FF0000")
+        canvas.add_group([Instance(template, 10, 10)])
+        svg = canvas.to_svg()
+        self.assertIn("<defs>", svg)
+        self.assertIn("<g>\n<use", svg)
+        svg = canvas.to_svg(css_classes=True)
+        self.assertNotIn("style=", svg.split("</style>")[1])
+
+
+    def test_instances_in_groups_follow_template_changes(self):
+        canvas = Canvas(100, 100)
+        template = Rectangle(0, 0, 5, 5, fill_color="#FF0000")
+        canvas.add_group([Instance(template, 10, 10)])
+        canvas.to_svg()
+        template.fill_color("#00FF00")
+        svg = canvas.to_svg()
+        template_id = svg.split('<g id="')[1].split('"')[0]
+        self.assertIn('href="#%s"' % template_id, svg.split("</defs>")[1])
+
+
+    def test_images_in_groups_are_streamed(self):
+        canvas = Canvas(100, 100)
+        data = GIF + bytes(range(256)) * 1000
+        rectangle = Rectangle(0, 0, 10, 10)
+        group = canvas.add_group([rectangle, Group([Image(0, 0, data)])])
+        self.assertEqual(embedded_data(group.to_svg()), data)
+        self.assertIsNone(group._svg)
+        self.assertEqual(len(group._contents), 3)
+        self.assertNotIn("base64", "".join(group._contents[::2]))
+        pieces = list(canvas.iter_svg())
+        self.assertGreater(len(pieces), 10)
+        self.assertLess(max(map(len, pieces)), len(data))
+        self.assertEqual(embedded_data("".join(pieces)), data)
+        svg = canvas.to_svg(css_classes=True)
+        self.assertEqual(embedded_data(svg), data)
+        self.assertNotIn("style=", svg.split("</style>")[1])
+
+
+    def test_groups_are_painted(self):
+        canvas = Canvas(40, 40)
+        rectangle = Rectangle(0, 0, 10, 10, fill_color="#FF0000", line_width=0)
+        canvas.add_group([rectangle]).translate(20, 20)
+        width, height, pixel = decode_png(canvas.to_png())
+        self.assertEqual(pixel(25, 25), (255, 0, 0, 255))
+        self.assertEqual(pixel(5, 5), (0, 0, 0, 0))
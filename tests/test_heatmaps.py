@@ -0,0 +1,214 @@
+import base64
+from array import array
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.graphics import Graphic, Heatmap, merge_cells
+from omnicanvas.svg import SvgFormat
+from omnicanvas.color import get_colormap
+from .test_raster import decode_png
+
+class HeatmapCreationTests(TestCase):
+
+    def test_can_create_heatmap(self):
+        heatmap = Heatmap(10, 20, [[1, 2, 3], [4, 5, 6]])
+        self.assertIsInstance(heatmap, Graphic)
+        self.assertEqual(heatmap._x, 10)
+        self.assertEqual(heatmap._y, 20)
+        self.assertEqual(heatmap._values, array("d", [1, 2, 3, 4, 5, 6]))
+        self.assertEqual(heatmap._columns, 3)
+        self.assertEqual(heatmap._cell_width, 1)
+        self.assertEqual(heatmap._cell_height, 1)
+        self.assertEqual(heatmap._colormap, "viridis")
+        self.assertEqual(heatmap._line_width, 0)
+        self.assertEqual(heatmap._rotation, (0, 0, 0))
+        self.assertEqual(heatmap._data, {})
+
+
+    def test_heatmap_repr(self):
+        heatmap = Heatmap(10, 20, [[1, 2, 3], [4, 5, 6]])
+        self.assertEqual(str(heatmap), "<Heatmap 3x2 at (10,20)>")
+
+
+    def test_can_create_heatmap_from_flat_values(self):
+        heatmap = Heatmap(0, 0, array("d", range(6)), columns=2)
+        self.assertEqual(heatmap.values(), ((0, 1), (2, 3), (4, 5)))
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, range(5), columns=2)
+        with self.assertRaises(TypeError):
+            Heatmap(0, 0, range(6), columns=2.0)
+
+
+    def test_can_create_heatmap_from_2d_buffer(self):
+        values = memoryview(array("d", range(6))).cast("B").cast("d", [2, 3])
+        heatmap = Heatmap(0, 0, values)
+        self.assertEqual(heatmap.values(), ((0, 1, 2), (3, 4, 5)))
+
+
+    def test_heatmap_values_are_validated(self):
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, [[1, 2], [3]])
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, [])
+        with self.assertRaises(TypeError):
+            Heatmap(0, 0, [[1, "2"]])
+        with self.assertRaises(TypeError):
+            Heatmap("0", 0, [[1]])
+        with self.assertRaises(TypeError):
+            Heatmap(0, 0, [[1]], cell_width="1")
+
+
+    def test_heatmap_colormap_is_validated(self):
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, [[1]], colormap="nothing")
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, [[1]], colormap=["#FF0000", "red"])
+        with self.assertRaises(ValueError):
+            Heatmap(0, 0, [[1]], colormap=[])
+        with self.assertRaises(TypeError):
+            Heatmap(0, 0, [[1]], minimum="0")
+        heatmap = Heatmap(0, 0, [[1]], colormap=["#ff0000", "#0000FF"])
+        self.assertEqual(heatmap.colormap(), ("#FF0000", "#0000FF"))
+
+
+
+class HeatmapPropertyTests(TestCase):
+
+    def test_heatmap_properties(self):
+        heatmap = Heatmap(10, 20, [[1, 2, 3], [4, 5, 6]], cell_width=5, cell_height=2)
+        self.assertEqual(heatmap.x(), 10)
+        self.assertEqual(heatmap.y(), 20)
+        self.assertEqual(heatmap.cell_width(), 5)
+        self.assertEqual(heatmap.cell_height(), 2)
+        self.assertEqual(heatmap.columns(), 3)
+        self.assertEqual(heatmap.rows(), 2)
+        self.assertEqual(heatmap.bounding_box(), (10, 20, 15, 4))
+
+
+    def test_can_update_heatmap_properties(self):
+        heatmap = Heatmap(10, 20, [[1, 2, 3], [4, 5, 6]])
+        svg = heatmap.to_svg()
+        heatmap.x(0)
+        heatmap.cell_width(2)
+        self.assertEqual(heatmap.bounding_box(), (0, 20, 6, 2))
+        self.assertNotEqual(heatmap.to_svg(), svg)
+        svg = heatmap.to_svg()
+        heatmap.colormap("greys")
+        self.assertNotEqual(heatmap.to_svg(), svg)
+        with self.assertRaises(TypeError):
+            heatmap.cell_height("2")
+
+
+    def test_heatmap_colors(self):
+        heatmap = Heatmap(0, 0, [[0, 5], [10, 20]], colormap="greys", maximum=10)
+        self.assertEqual(
+         heatmap.colors(), ["#000000", "#7F7F7F", "#FFFFFF", "#FFFFFF"]
+        )
+        self.assertEqual(
+         Heatmap(0, 0, [[0, 1]]).colors(),
+         [get_colormap("viridis")[0], get_colormap("viridis")[-1]]
+        )
+
+
+
+class CellMergingTests(TestCase):
+
+    def test_can_merge_runs_of_cells(self):
+        self.assertEqual(merge_cells(["a", "a", "b", "a"], 4), [
+         ("a", 0, 0, 2, 1), ("b", 2, 0, 1, 1), ("a", 3, 0, 1, 1)
+        ])
+
+
+    def test_can_merge_identical_rows(self):
+        colors = ["a", "b"] * 3 + ["b", "b"] + ["a", "b"]
+        self.assertEqual(merge_cells(colors, 2), [
+         ("a", 0, 0, 1, 3), ("b", 1, 0, 1, 3), ("b", 0, 3, 2, 1),
+         ("a", 0, 4, 1, 1), ("b", 1, 4, 1, 1)
+        ])
+
+
+
+class HeatmapSvgTests(TestCase):
+
+    def test_heatmap_svg_merges_cells(self):
+        heatmap = Heatmap(
+         10, 20, [[0, 0, 1], [0, 0, 1]], cell_width=5, cell_height=2,
+         colormap=["#000000", "#FFFFFF"], data={"a": "b"}
+        )
+        self.assertEqual(heatmap.to_svg(), (
+         '<g shape-rendering="crispEdges" a="b">\n'
+         '<g style="fill:#000000;">\n'
+         '<rect x="10.0" y="20.0" width="10.0" height="4.0" />\n'
+         '</g>\n'
+         '<g style="fill:#FFFFFF;">\n'
+         '<rect x="20.0" y="20.0" width="5.0" height="4.0" />\n'
+         '</g>\n'
+         '</g>'
+        ))
+
+
+    def test_heatmap_svg_respects_format(self):
+        heatmap = Heatmap(
+         0, 0, [[0, 1]], cell_width=0.5, colormap=["#000000", "#FFFFFF"],
+         rotation=(1, 1, 90)
+        )
+        self.assertEqual(heatmap._generate_svg(SvgFormat(minify=True)), (
+         '<g shape-rendering="crispEdges" transform="rotate(90 1 1)">\n'
+         '<g style="fill:#000;">\n'
+         '<rect x="0" y="0" width=".5" height="1"/>\n'
+         '</g>\n'
+         '<g style="fill:#FFF;">\n'
+         '<rect x=".5" y="0" width=".5" height="1"/>\n'
+         '</g>\n'
+         '</g>'
+        ))
+
+
+    def test_noisy_heatmap_is_written_as_image(self):
+        values = [[(row * 7 + column * 13) % 17 for column in range(40)]
+         for row in range(30)]
+        heatmap = Heatmap(5, 5, values, cell_width=2, cell_height=3)
+        svg = heatmap.to_svg()
+        self.assertEqual(svg.count("<rect"), 0)
+        self.assertIn(
+         '<image x="5.0" y="5.0" width="80.0" height="90.0" ', svg
+        )
+        png = base64.b64decode(svg.split("base64,")[1].split('"')[0])
+        width, height, pixel = decode_png(png)
+        self.assertEqual((width, height), (40, 30))
+        colors = heatmap.colors()
+        for x, y in ((0, 0), (39, 0), (17, 29)):
+            self.assertEqual(
+             "#%02X%02X%02X" % pixel(x, y)[:3], colors[y * 40 + x]
+            )
+
+
+
+class HeatmapCanvasTests(TestCase):
+
+    def test_can_add_heatmap(self):
+        canvas = Canvas(100, 100)
+        heatmap = canvas.add_heatmap(0, 0, [[1, 2], [3, 4]], name="h")
+        self.assertIsInstance(heatmap, Heatmap)
+        self.assertIs(canvas.get_graphic_by_name("h"), heatmap)
+        self.assertIn(heatmap.to_svg(), canvas.to_svg())
+
+
+    def test_heatmap_rasters_like_rectangles(self):
+        values = [[0, 1, 1], [1, 0, 1]]
+        colors = ["#000000", "#FFFFFF"]
+        for rotation in ((0, 0, 0), (20, 20, 30)):
+            heatmap_canvas, rectangle_canvas = Canvas(40, 40), Canvas(40, 40)
+            heatmap_canvas.add_heatmap(
+             2.5, 3, values, cell_width=7, cell_height=5.5, colormap=colors,
+             rotation=rotation
+            )
+            for row, row_values in enumerate(values):
+                for column, value in enumerate(row_values):
+                    rectangle_canvas.add_rectangle(
+                     2.5 + column * 7, 3 + row * 5.5, 7, 5.5,
+                     fill_color=colors[int(value)], line_width=0,
+                     rotation=rotation
+                    )
+            self.assertEqual(
+             heatmap_canvas.to_png(scale=1.5), rectangle_canvas.to_png(scale=1.5)
+            )
@@ -0,0 +1,178 @@
+import base64
+import os
+import pickle
+import struct
+import tempfile
+import zlib
+from array import array
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.graphics import BoxGraphic, Image, measure_image
+from omnicanvas.raster import Raster, encode_png
+from omnicanvas.svg import SvgFormat
+
+PNG = encode_png(3, 2, bytes(range(24)))
+
+GIF = b"GIF89a" + struct.pack("<HH", 7, 5) + b"\x00" * 20
+
+JPEG = b"".join((
+ b"\xff\xd8",
+ b"\xff\xe0" + struct.pack(">H", 6) + b"JFIF",
+ b"\xff\xc0" + struct.pack(">HBHH", 11, 8, 9, 4) + b"\x03\x01\x11",
+ b"\xff\xd9"
+))
+
+def embedded_data(svg):
+    return base64.b64decode(svg.split("base64,")[1].split('"')[0])
+
+
+
+class ImageCreationTests(TestCase):
+
+    def test_can_create_image_from_png_bytes(self):
+        image = Image(10, 20, PNG)
+        self.assertIsInstance(image, BoxGraphic)
+        self.assertEqual(image._x, 10)
+        self.assertEqual(image._y, 20)
+        self.assertEqual(image._width, 3)
+        self.assertEqual(image._height, 2)
+        self.assertEqual(image._line_width, 0)
+        self.assertEqual(image._opacity, 1)
+        self.assertIs(image.source(), PNG)
+        self.assertEqual(image.mime_type(), "image/png")
+
+
+    def test_image_repr(self):
+        self.assertEqual(str(Image(10, 20, PNG)), "<Image 3×2 at (10,20)>")
+
+
+    def test_width_and_height_can_be_given(self):
+        image = Image(10, 20, PNG, width=30, height=40)
+        self.assertEqual(image.width(), 30)
+        self.assertEqual(image.height(), 40)
+
+
+    def test_can_measure_gif_and_jpeg(self):
+        self.assertEqual(measure_image(GIF), ("image/gif", 7, 5))
+        self.assertEqual(measure_image(JPEG), ("image/jpeg", 4, 9))
+        self.assertEqual(Image(0, 0, memoryview(JPEG)).mime_type(), "image/jpeg")
+
+
+    def test_can_create_image_from_pixels(self):
+        pixels = memoryview(bytearray(2 * 5 * 3)).cast("B", (2, 5, 3))
+        image = Image(0, 0, pixels)
+        self.assertEqual((image.width(), image.height()), (5, 2))
+        self.assertEqual(image.mime_type(), "image/png")
+
+
+    def test_can_create_image_from_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "image.gif")
+            with open(path, "wb") as f:
+                f.write(GIF)
+            image = Image(0, 0, path)
+            self.assertEqual(image.source(), path)
+            self.assertEqual((image.width(), image.height()), (7, 5))
+            self.assertEqual(embedded_data(image.to_svg()), GIF)
+
+
+    def test_image_source_must_be_path_or_buffer(self):
+        with self.assertRaises(TypeError):
+            Image(0, 0, 100)
+
+
+    def test_image_source_must_be_an_image(self):
+        with self.assertRaises(ValueError):
+            Image(0, 0, b"not an image")
+        with self.assertRaises(ValueError):
+            Image(0, 0, memoryview(bytearray(8)).cast("B", (2, 2, 2)))
+        with self.assertRaises(ValueError):
+            Image(0, 0, array("d", [1, 2, 3]))
+
+
+    def test_images_can_be_pickled(self):
+        image = pickle.loads(pickle.dumps(Image(10, 20, PNG)))
+        self.assertEqual(image.source(), PNG)
+        self.assertEqual(image.width(), 3)
+
+
+
+class ImageSvgTests(TestCase):
+
+    def test_image_svg(self):
+        svg = Image(10, 20, PNG, width=30).to_svg()
+        self.assertEqual(svg, (
+         '<image x="10.0" y="20.0" width="30.0" height="2.0" '
+         'preserveAspectRatio="none" href="data:image/png;base64,%s" />'
+        ) % base64.b64encode(PNG).decode())
+
+
+    def test_image_svg_opacity_rotation_and_data(self):
+        svg = Image(
+         10, 20, GIF, opacity=0.5, rotation=(10, 20, 45), data={"a": "b"}
+        ).to_svg()
+        self.assertIn(' opacity="0.500"', svg)
+        self.assertIn(' transform="rotate(45.0 10.0 20.0)"', svg)
+        self.assertIn(' a="b"', svg)
+        self.assertIn("data:image/gif;base64,", svg)
+
+
+    def test_image_svg_is_not_cached(self):
+        data = bytearray(PNG)
+        image = Image(0, 0, data)
+        self.assertEqual(embedded_data(image.to_svg()), PNG)
+        data[-1] = 0
+        self.assertEqual(embedded_data(image.to_svg())[-1], 0)
+
+
+    def test_large_images_are_encoded_in_chunks(self):
+        data = GIF + bytes(range(256)) * 1000
+        self.assertEqual(embedded_data(Image(0, 0, data).to_svg()), data)
+        pieces = list(Image(0, 0, data)._iterate_svg(SvgFormat()))
+        self.assertGreater(len(pieces), 4)
+
+
+    def test_pixels_are_encoded_as_png(self):
+        pixels = memoryview(bytearray(
+         b"\xff\x00\x00\x00\xff\x00" * 2
+        )).cast("B", (2, 2, 3))
+        png = embedded_data(Image(0, 0, pixels).to_svg())
+        self.assertEqual(
+         png[16:26], struct.pack(">IIBB", 2, 2, 8, 2)
+        )
+        data = zlib.decompress(png[png.index(b"IDAT") + 4:-16])
+        self.assertEqual(data, b"\x00\xff\x00\x00\x00\xff\x00" * 2)
+
+
+    def test_minified_image_svg(self):
+        svg = Image(10, 20, PNG)._generate_svg(SvgFormat(minify=True))
+        self.assertTrue(svg.startswith(
+         '<image x="10" y="20" width="3" height="2" preserveAspectRatio="none"'
+        ))
+        self.assertTrue(svg.endswith('"/>'))
+
+
+
+class CanvasImageTests(TestCase):
+
+    def test_can_add_image(self):
+        canvas = Canvas(100, 100)
+        image = canvas.add_image(10, 20, PNG)
+        self.assertIsInstance(image, Image)
+        self.assertIs(canvas.graphics()[-1], image)
+
+
+    def test_images_are_streamed_into_canvas_svg(self):
+        canvas = Canvas(100, 100)
+        canvas.add_rectangle(0, 0, 10, 10)
+        canvas.add_image(10, 20, PNG)
+        svg = canvas.to_svg()
+        self.assertIn("\n<image ", svg)
+        self.assertEqual(embedded_data(svg), PNG)
+        self.assertIn("<image", canvas.to_svg(css_classes=True))
+
+
+    def test_images_are_not_painted(self):
+        raster = Raster(10, 10)
+        raster.paint(Image(0, 0, PNG, width=10, height=10))
+        self.assertEqual(raster.pixels, bytearray(400))
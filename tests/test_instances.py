@@ -0,0 +1,118 @@
+import gc
+import pickle
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.graphics import Graphic, Polygon, Rectangle, Instance
+from omnicanvas.svg import generate_template_id
+
+class InstanceCreationTests(TestCase):
+
+    def setUp(self):
+        self.marker = Polygon(0, -5, 5, 5, -5, 5, fill_color="#FF0000")
+
+
+    def test_can_create_instance(self):
+        instance = Instance(self.marker, 100, 50)
+        self.assertIsInstance(instance, Graphic)
+        self.assertIs(instance._template, self.marker)
+        self.assertEqual(instance._x, 100)
+        self.assertEqual(instance._y, 50)
+        self.assertEqual(instance._rotation, (0, 0, 0))
+        self.assertEqual(instance._data, {})
+
+
+    def test_instance_repr(self):
+        instance = Instance(self.marker, 100, 50)
+        self.assertEqual(
+         str(instance), "<Instance of <Polygon (3 points)> shifted by (100,50)>"
+        )
+
+
+    def test_template_must_be_graphic(self):
+        with self.assertRaises(TypeError):
+            Instance("marker", 100, 50)
+
+
+    def test_shift_must_be_numeric(self):
+        with self.assertRaises(TypeError):
+            Instance(self.marker, "100", 50)
+        with self.assertRaises(TypeError):
+            Instance(self.marker, 100, "50")
+        instance = Instance(self.marker, 100, 50)
+        with self.assertRaises(TypeError):
+            instance.x("100")
+
+
+
+class InstanceSvgTests(TestCase):
+
+    def test_instance_svg_refers_to_template(self):
+        marker = Polygon(0, -5, 5, 5, -5, 5)
+        instance = Instance(marker, 100, 50.5, data={"a": "b"})
+        self.assertEqual(
+         instance.to_svg(),
+         '<use href="#%s" x="100.0" y="50.5" a="b" />' % generate_template_id(marker)
+        )
+
+
+    def test_template_ids_follow_template_appearance(self):
+        first, second = Rectangle(0, 0, 10, 10), Rectangle(0, 0, 10, 10)
+        self.assertEqual(generate_template_id(first), generate_template_id(second))
+        first.width(20)
+        self.assertNotEqual(generate_template_id(first), generate_template_id(second))
+
+
+    def test_instance_svg_follows_template_changes(self):
+        marker = Rectangle(0, 0, 10, 10)
+        instance = Instance(marker, 100, 50)
+        before = instance.to_svg()
+        marker.fill_color("#00FF00")
+        self.assertNotEqual(instance.to_svg(), before)
+        instance.x(20)
+        self.assertIn('x="20.0"', instance.to_svg())
+
+
+
+class InstanceBoundsTests(TestCase):
+
+    def test_instance_bounds_are_shifted_template_bounds(self):
+        marker = Rectangle(-5, -5, 10, 10)
+        instance = Instance(marker, 100, 50)
+        self.assertEqual(instance.bounding_box(), (94.5, 44.5, 11, 11))
+        marker.width(20)
+        self.assertEqual(instance.bounding_box(), (94.5, 44.5, 21, 11))
+
+
+    def test_canvas_searches_follow_template_changes(self):
+        canvas = Canvas(1000, 1000)
+        template = Rectangle(0, 0, 10, 10)
+        instance = canvas.add_instance(template, 100, 100)
+        self.assertEqual(canvas.graphics_at(105, 105), [instance])
+        template.x(500)
+        self.assertEqual(canvas.graphics_at(105, 105), [])
+        self.assertEqual(canvas.graphics_at(605, 105), [instance])
+        self.assertEqual(canvas.graphics_in(600, 100, 10, 10), [instance])
+
+
+    def test_instances_of_instances_follow_template_changes(self):
+        canvas = Canvas(1000, 1000)
+        template = Rectangle(0, 0, 10, 10)
+        instance = canvas.add_instance(Instance(template, 100, 0), 0, 100)
+        template.y(500)
+        self.assertEqual(canvas.graphics_at(105, 605), [instance])
+
+
+    def test_pickled_instances_follow_template_changes(self):
+        canvas = Canvas(1000, 1000)
+        canvas.add_instance(Rectangle(0, 0, 10, 10), 100, 100)
+        copy = pickle.loads(pickle.dumps(canvas))
+        instance = copy.graphics()[0]
+        instance.template().x(500)
+        self.assertEqual(copy.graphics_at(605, 105), [instance])
+
+
+    def test_templates_do_not_keep_instances_alive(self):
+        template = Rectangle(0, 0, 10, 10)
+        Instance(template, 100, 100)
+        gc.collect()
+        self.assertEqual(len(template._instances), 0)
@@ -76,6 +76,13 @@ class LinePropertiesTests(TestCase):
         line.y2(100.5)
 
 
+    def test_line_bounding_box(self):
+        line = Line(50, 60, 10, 100, line_width=2)
+        self.assertEqual(line.bounding_box(), (9, 59, 42, 42))
+        line.x2(70)
+        self.assertEqual(line.bounding_box(), (49, 59, 22, 42))
+
+
 
 class LineSvgTests(TestCase):
 
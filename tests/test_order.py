@@ -0,0 +1,80 @@
+import pickle
+import random
+from unittest import TestCase
+from omnicanvas import order
+from omnicanvas.order import DrawingOrder
+
+class DrawingOrderTests(TestCase):
+
+    def setUp(self):
+        self.block_size = order.BLOCK_SIZE
+        order.BLOCK_SIZE = 4
+
+
+    def tearDown(self):
+        order.BLOCK_SIZE = self.block_size
+
+
+    def test_behaves_like_list(self):
+        drawing_order = DrawingOrder(["a", "b", "c"])
+        self.assertEqual(drawing_order, ["a", "b", "c"])
+        self.assertEqual(len(drawing_order), 3)
+        self.assertEqual(drawing_order[0], "a")
+        self.assertEqual(drawing_order[-1], "c")
+        self.assertEqual(drawing_order[1:], ["b", "c"])
+        self.assertEqual(list(drawing_order), ["a", "b", "c"])
+        self.assertEqual(drawing_order.index("b"), 1)
+        with self.assertRaises(IndexError):
+            drawing_order[3]
+        with self.assertRaises(ValueError):
+            drawing_order.index("d")
+        self.assertEqual(DrawingOrder(), [])
+
+
+    def test_random_operations_match_list(self):
+        rng = random.Random(0)
+        items = list(range(50))
+        drawing_order = DrawingOrder(items)
+        next_item = 50
+        for n in range(3000):
+            operation = rng.random()
+            if operation < 0.4 and items:
+                index = rng.randrange(len(items))
+                new_index = rng.choice((0, len(items) - 1, rng.randrange(len(items))))
+                drawing_order.move(index, new_index)
+                items.insert(new_index, items.pop(index))
+            elif operation < 0.6 and items:
+                index = rng.randrange(len(items))
+                del drawing_order[index]
+                del items[index]
+            elif operation < 0.8:
+                index = rng.randrange(len(items) + 1)
+                drawing_order.insert(index, next_item)
+                items.insert(index, next_item)
+                next_item += 1
+            else:
+                drawing_order.append(next_item)
+                items.append(next_item)
+                next_item += 1
+            if n % 100 == 0:
+                self.assertEqual(drawing_order, items)
+                for position, item in enumerate(items):
+                    self.assertEqual(drawing_order.index(item), position)
+                    self.assertEqual(drawing_order[position], item)
+        self.assertEqual(drawing_order, items)
+
+
+    def test_keys_are_renumbered_when_gaps_run_out(self):
+        drawing_order = DrawingOrder(["a", "b", "c"])
+        for n in range(200):
+            drawing_order.insert(1, n)
+        self.assertEqual(drawing_order[1:201], list(range(199, -1, -1)))
+        self.assertEqual(drawing_order.index("b"), 201)
+
+
+    def test_can_pickle(self):
+        drawing_order = DrawingOrder(["a", "b", "c"])
+        drawing_order.move(0, 2)
+        self.assertEqual(
+         pickle.loads(pickle.dumps(drawing_order)), ["b", "c", "a"]
+        )
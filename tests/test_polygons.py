@@ -1,3 +1,5 @@
+import math
+from array import array
 from unittest import TestCase
 from omnicanvas.graphics import ShapeGraphic, Polygon
 from omnicanvas.exceptions import GeometryError
@@ -7,7 +9,9 @@ class PolygonCreationTests(TestCase):
     def test_can_create_polyon(self):
         polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
         self.assertIsInstance(polygon, ShapeGraphic)
-        self.assertEqual(polygon._coordinates, [10, 30, 60, 100, 45, 45, 0, 40])
+        self.assertEqual(
+         polygon._coordinates, array("d", [10, 30, 60, 100, 45, 45, 0, 40])
+        )
         self.assertEqual(polygon._fill_color, "#FFFFFF")
         self.assertEqual(polygon._opacity, 1)
         self.assertEqual(polygon._line_width, 1)
@@ -22,6 +26,21 @@ class PolygonCreationTests(TestCase):
         self.assertEqual(str(polygon), "<Polygon (4 points)>")
 
 
+    def test_can_create_polygon_from_sequence(self):
+        coordinates = array("d", [10, 30, 60, 100, 45, 45, 0, 40])
+        polygon = Polygon(coordinates)
+        self.assertIs(polygon._coordinates, coordinates)
+        polygon = Polygon(memoryview(coordinates))
+        self.assertEqual(polygon._coordinates, coordinates)
+        self.assertIsNot(polygon._coordinates, coordinates)
+        polygon = Polygon([10, 30, 60, 100, 45, 45])
+        self.assertEqual(polygon.coordinates(), (10, 30, 60, 100, 45, 45))
+        with self.assertRaises(TypeError):
+            Polygon(["10", 30, 60, 100, 45, 45])
+        with self.assertRaises(ValueError):
+            Polygon(array("d", [10, 30, 60, 100, 45]))
+
+
     def test_polygon_coordinates_must_be_numeric(self):
         with self.assertRaises(TypeError):
             Polygon(10, 30, 60, "100", 45, 45, 0, 40)
@@ -81,6 +100,105 @@ class PolygonPropertiesTests(TestCase):
             polygon.remove_vertex(1)
 
 
+    def test_removing_a_vertex_checks_vertex_count_first(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45)
+        with self.assertRaises(GeometryError):
+            polygon.remove_vertex(0.5)
+        with self.assertRaises(GeometryError):
+            polygon.remove_vertex(10)
+
+
+    def test_bulk_edits_cannot_leave_fewer_than_three_vertices(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
+        with self.assertRaises(GeometryError):
+            polygon.remove_vertices(range(2))
+        with self.assertRaises(GeometryError):
+            polygon.set_vertices(slice(2, None), [], [])
+        with self.assertRaises(GeometryError):
+            polygon.set_vertices(slice(None), [1] * 2, [1] * 2)
+        self.assertEqual(polygon.coordinates(), (10, 30, 60, 100, 45, 45, 0, 40))
+        polygon.remove_vertices(range(1))
+        self.assertEqual(len(polygon.coordinates()), 6)
+
+
+    def test_can_remove_negative_vertex_index(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
+        polygon.remove_vertex(-1)
+        self.assertEqual(polygon.coordinates(), (10, 30, 60, 100, 45, 45))
+
+
+    def test_can_add_vertices(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45)
+        polygon.add_vertices([0, 1.5], array("d", [40, 2]))
+        self.assertEqual(
+         polygon.coordinates(), (10, 30, 60, 100, 45, 45, 0, 40, 1.5, 2)
+        )
+        with self.assertRaises(TypeError):
+            polygon.add_vertices([0, "1"], [40, 2])
+        with self.assertRaises(ValueError):
+            polygon.add_vertices([0, 1], [40])
+        self.assertEqual(len(polygon.coordinates()), 10)
+
+
+    def test_can_insert_vertices(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45)
+        polygon.insert_vertices(1, [0, 1], [40, 2])
+        self.assertEqual(
+         polygon.coordinates(), (10, 30, 0, 40, 1, 2, 60, 100, 45, 45)
+        )
+        polygon.insert_vertices(-1, [7], [8])
+        self.assertEqual(polygon.coordinates()[-4:], (7, 8, 45, 45))
+        with self.assertRaises(TypeError):
+            polygon.insert_vertices(1.5, [7], [8])
+
+
+    def test_can_set_vertices(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
+        polygon.set_vertices(slice(1, 3), [1, 2, 3], [4, 5, 6])
+        self.assertEqual(
+         polygon.coordinates(), (10, 30, 1, 4, 2, 5, 3, 6, 0, 40)
+        )
+        polygon.set_vertices(slice(None, None, 2), [7, 8, 9], [0, 0, 0])
+        self.assertEqual(
+         polygon.coordinates(), (7, 0, 1, 4, 8, 0, 3, 6, 9, 0)
+        )
+        with self.assertRaises(ValueError):
+            polygon.set_vertices(slice(None, None, 2), [1], [1])
+        with self.assertRaises(TypeError):
+            polygon.set_vertices(1, [1], [1])
+        with self.assertRaises(GeometryError):
+            polygon.set_vertices(slice(2, None), [], [])
+        self.assertEqual(len(polygon.coordinates()), 10)
+
+
+    def test_can_remove_vertices(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40, 34, 43)
+        polygon.to_svg()
+        polygon.remove_vertices([3, 0, -2])
+        self.assertEqual(polygon.coordinates(), (60, 100, 45, 45, 34, 43))
+        self.assertNotIn("10.0,30.0", polygon.to_svg())
+        with self.assertRaises(IndexError):
+            polygon.remove_vertices([3])
+        with self.assertRaises(TypeError):
+            polygon.remove_vertices([0.5])
+        with self.assertRaises(GeometryError):
+            polygon.remove_vertices(range(1))
+        self.assertEqual(len(polygon.coordinates()), 6)
+
+
+    def test_can_get_coordinates_view(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
+        view = polygon.coordinates_view()
+        self.assertEqual(view.format, "d")
+        self.assertEqual(view.tolist(), [10, 30, 60, 100, 45, 45, 0, 40])
+        self.assertTrue(view.readonly)
+        with self.assertRaises(BufferError):
+            polygon.add_vertex(1, 2)
+        view.release()
+        polygon.add_vertex(1, 2)
+        self.assertEqual(polygon.coordinates()[-2:], (1, 2))
+
+
     def test_can_get_coordinates_as_coordinate_tuples(self):
         polygon = Polygon(10, 30, 60, 100, 45, 45, 0, 40)
         self.assertEqual(
@@ -89,6 +207,16 @@ class PolygonPropertiesTests(TestCase):
         )
 
 
+    def test_coordinates_are_returned_as_floats(self):
+        polygon = Polygon(10, 30.5, 60, 100, 45.0, 45)
+        coordinates = polygon.coordinates()
+        self.assertEqual(coordinates, (10, 30.5, 60, 100, 45, 45))
+        self.assertEqual(
+         [type(value) for value in coordinates], [float] * 6
+        )
+        self.assertIsInstance(polygon.coordinates(xy_pairs=True)[0][0], float)
+
+
 
 class SvgTests(TestCase):
 
@@ -122,3 +250,42 @@ class SvgTests(TestCase):
          'a="b"',
          polygon.to_svg()
         )
+
+
+    def test_vertex_changes_invalidate_svg(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45)
+        polygon.to_svg()
+        polygon.add_vertex(0, 40)
+        self.assertIn("0.0,40.0", polygon.to_svg())
+        polygon.remove_vertex(0)
+        self.assertNotIn("10.0,30.0", polygon.to_svg())
+
+
+
+class PolygonSimplificationTests(TestCase):
+
+    def test_can_simplify_polygon(self):
+        coordinates = []
+        for step in range(3600):
+            angle = math.radians(step / 10)
+            coordinates += (100 + 50 * math.cos(angle), 100 + 50 * math.sin(angle))
+        polygon = Polygon(*coordinates)
+        polygon.simplify(0.5)
+        self.assertLess(len(polygon.coordinates()), 100)
+        self.assertEqual(polygon.coordinates()[:2], (150, 100))
+        for x, y in polygon.coordinates(xy_pairs=True):
+            self.assertAlmostEqual(math.hypot(x - 100, y - 100), 50)
+
+
+    def test_simplified_polygon_keeps_three_vertices(self):
+        polygon = Polygon(0, 0, 0.1, 0.1, 0.2, 0, 0.1, -0.1)
+        polygon.simplify(10)
+        self.assertEqual(len(polygon.coordinates(xy_pairs=True)), 3)
+
+
+    def test_tolerance_must_be_valid(self):
+        polygon = Polygon(10, 30, 60, 100, 45, 45)
+        with self.assertRaises(TypeError):
+            polygon.simplify("1")
+        with self.assertRaises(ValueError):
+            polygon.simplify(-1)
@@ -1,3 +1,4 @@
+from array import array
 from unittest import TestCase
 from omnicanvas.graphics import Graphic, Polyline
 from omnicanvas.exceptions import GeometryError
@@ -7,7 +8,9 @@ class PolylineCreationTests(TestCase):
     def test_can_create_polyline(self):
         polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40)
         self.assertIsInstance(polyline, Graphic)
-        self.assertEqual(polyline._coordinates, [10, 30, 60, 100, 45, 45, 0, 40])
+        self.assertEqual(
+         polyline._coordinates, array("d", [10, 30, 60, 100, 45, 45, 0, 40])
+        )
         self.assertEqual(polyline._line_width, 1)
         self.assertEqual(polyline._line_style, "-")
         self.assertEqual(polyline._line_color, "#000000")
@@ -20,6 +23,21 @@ class PolylineCreationTests(TestCase):
         self.assertEqual(str(polyline), "<Polyline (4 points)>")
 
 
+    def test_can_create_polyline_from_sequence(self):
+        coordinates = array("d", [10, 30, 60, 100, 45, 45, 0, 40])
+        polyline = Polyline(coordinates)
+        self.assertIs(polyline._coordinates, coordinates)
+        polyline = Polyline(memoryview(coordinates))
+        self.assertEqual(polyline._coordinates, coordinates)
+        self.assertIsNot(polyline._coordinates, coordinates)
+        polyline = Polyline([10, 30, 60, 100, 45, 45])
+        self.assertEqual(polyline.coordinates(), (10, 30, 60, 100, 45, 45))
+        with self.assertRaises(TypeError):
+            Polyline(["10", 30, 60, 100, 45, 45])
+        with self.assertRaises(ValueError):
+            Polyline(array("d", [10, 30, 60, 100, 45]))
+
+
     def test_polyline_coordinates_must_be_numeric(self):
         with self.assertRaises(TypeError):
             Polyline(10, 30, 60, "100", 45, 45, 0, 40)
@@ -79,6 +97,105 @@ class PolylinePropertiesTests(TestCase):
             polyline.remove_vertex(1)
 
 
+    def test_removing_a_vertex_checks_vertex_count_first(self):
+        polyline = Polyline(10, 30, 60, 100)
+        with self.assertRaises(GeometryError):
+            polyline.remove_vertex(0.5)
+        with self.assertRaises(GeometryError):
+            polyline.remove_vertex(10)
+
+
+    def test_bulk_edits_cannot_leave_fewer_than_two_vertices(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45)
+        with self.assertRaises(GeometryError):
+            polyline.remove_vertices(range(3))
+        with self.assertRaises(GeometryError):
+            polyline.set_vertices(slice(1, None), [], [])
+        with self.assertRaises(GeometryError):
+            polyline.set_vertices(slice(None), [1] * 1, [1] * 1)
+        self.assertEqual(polyline.coordinates(), (10, 30, 60, 100, 45, 45))
+        polyline.remove_vertices(range(1))
+        self.assertEqual(len(polyline.coordinates()), 4)
+
+
+    def test_can_remove_negative_vertex_index(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40)
+        polyline.remove_vertex(-1)
+        self.assertEqual(polyline.coordinates(), (10, 30, 60, 100, 45, 45))
+
+
+    def test_can_add_vertices(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45)
+        polyline.add_vertices([0, 1.5], array("d", [40, 2]))
+        self.assertEqual(
+         polyline.coordinates(), (10, 30, 60, 100, 45, 45, 0, 40, 1.5, 2)
+        )
+        with self.assertRaises(TypeError):
+            polyline.add_vertices([0, "1"], [40, 2])
+        with self.assertRaises(ValueError):
+            polyline.add_vertices([0, 1], [40])
+        self.assertEqual(len(polyline.coordinates()), 10)
+
+
+    def test_can_insert_vertices(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45)
+        polyline.insert_vertices(1, [0, 1], [40, 2])
+        self.assertEqual(
+         polyline.coordinates(), (10, 30, 0, 40, 1, 2, 60, 100, 45, 45)
+        )
+        polyline.insert_vertices(-1, [7], [8])
+        self.assertEqual(polyline.coordinates()[-4:], (7, 8, 45, 45))
+        with self.assertRaises(TypeError):
+            polyline.insert_vertices(1.5, [7], [8])
+
+
+    def test_can_set_vertices(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40)
+        polyline.set_vertices(slice(1, 3), [1, 2, 3], [4, 5, 6])
+        self.assertEqual(
+         polyline.coordinates(), (10, 30, 1, 4, 2, 5, 3, 6, 0, 40)
+        )
+        polyline.set_vertices(slice(None, None, 2), [7, 8, 9], [0, 0, 0])
+        self.assertEqual(
+         polyline.coordinates(), (7, 0, 1, 4, 8, 0, 3, 6, 9, 0)
+        )
+        with self.assertRaises(ValueError):
+            polyline.set_vertices(slice(None, None, 2), [1], [1])
+        with self.assertRaises(TypeError):
+            polyline.set_vertices(1, [1], [1])
+        with self.assertRaises(GeometryError):
+            polyline.set_vertices(slice(1, None), [], [])
+        self.assertEqual(len(polyline.coordinates()), 10)
+
+
+    def test_can_remove_vertices(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40, 34, 43)
+        polyline.to_svg()
+        polyline.remove_vertices([3, 0, -2])
+        self.assertEqual(polyline.coordinates(), (60, 100, 45, 45, 34, 43))
+        self.assertNotIn("10.0,30.0", polyline.to_svg())
+        with self.assertRaises(IndexError):
+            polyline.remove_vertices([3])
+        with self.assertRaises(TypeError):
+            polyline.remove_vertices([0.5])
+        with self.assertRaises(GeometryError):
+            polyline.remove_vertices(range(2))
+        self.assertEqual(len(polyline.coordinates()), 6)
+
+
+    def test_can_get_coordinates_view(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40)
+        view = polyline.coordinates_view()
+        self.assertEqual(view.format, "d")
+        self.assertEqual(view.tolist(), [10, 30, 60, 100, 45, 45, 0, 40])
+        self.assertTrue(view.readonly)
+        with self.assertRaises(BufferError):
+            polyline.add_vertex(1, 2)
+        view.release()
+        polyline.add_vertex(1, 2)
+        self.assertEqual(polyline.coordinates()[-2:], (1, 2))
+
+
     def test_can_get_coordinates_as_coordinate_tuples(self):
         polyline = Polyline(10, 30, 60, 100, 45, 45, 0, 40)
         self.assertEqual(
@@ -87,6 +204,23 @@ class PolylinePropertiesTests(TestCase):
         )
 
 
+    def test_coordinates_are_returned_as_floats(self):
+        polyline = Polyline(10, 30.5, 60, 100, 45.0, 45)
+        coordinates = polyline.coordinates()
+        self.assertEqual(coordinates, (10, 30.5, 60, 100, 45, 45))
+        self.assertEqual(
+         [type(value) for value in coordinates], [float] * 6
+        )
+        self.assertIsInstance(polyline.coordinates(xy_pairs=True)[0][0], float)
+
+
+    def test_polyline_bounding_box(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45, line_width=0)
+        self.assertEqual(polyline.bounding_box(), (10, 30, 50, 70))
+        polyline.add_vertex(-10, 0)
+        self.assertEqual(polyline.bounding_box(), (-10, 0, 70, 100))
+
+
 
 class SvgTests(TestCase):
 
@@ -120,3 +254,43 @@ class SvgTests(TestCase):
          'a="b"',
          polyline.to_svg()
         )
+
+
+
+class PolylineSimplificationTests(TestCase):
+
+    def test_can_simplify_polyline(self):
+        coordinates = []
+        for x in range(1000):
+            coordinates += (x / 10, (x % 2) / 100)
+        polyline = Polyline(*coordinates)
+        polyline.to_svg()
+        polyline.simplify(0.5)
+        self.assertEqual(polyline.coordinates(), (0, 0, 99.9, 0.01))
+        self.assertIn("99.9,0.0", polyline.to_svg())
+
+
+    def test_simplification_keeps_visible_vertices(self):
+        polyline = Polyline(0, 0, 50, 0.2, 100, 0, 100, 100, 100.2, 150, 100, 200)
+        polyline.simplify(1)
+        self.assertEqual(polyline.coordinates(), (0, 0, 100, 0, 100, 200))
+        polyline.simplify(0)
+        self.assertEqual(polyline.coordinates(), (0, 0, 100, 0, 100, 200))
+
+
+    def test_simplification_keeps_vertices_near_tolerance(self):
+        polyline = Polyline(*[value for x in range(0, 1000, 5) for value in (
+         x, 20 * ((x // 50) % 2)
+        )])
+        polyline.simplify(2)
+        xs = polyline.coordinates()[::2]
+        for x in range(0, 1000, 50):
+            self.assertIn(x, xs)
+
+
+    def test_tolerance_must_be_valid(self):
+        polyline = Polyline(10, 30, 60, 100, 45, 45)
+        with self.assertRaises(TypeError):
+            polyline.simplify("1")
+        with self.assertRaises(ValueError):
+            polyline.simplify(-1)
@@ -0,0 +1,127 @@
+import struct
+import zlib
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.raster import Raster, dash_path
+
+def decode_png(png):
+    width, height = struct.unpack(">II", png[16:24])
+    data, offset = b"", 8
+    while offset < len(png):
+        length, kind = struct.unpack(">I4s", png[offset:offset + 8])
+        if kind == b"IDAT":
+            data += png[offset + 8:offset + 8 + length]
+        offset += length + 12
+    data = zlib.decompress(data)
+    stride = width * 4 + 1
+    rows = [data[row + 1:row + stride] for row in range(0, len(data), stride)]
+    return width, height, lambda x, y: tuple(rows[y][x * 4:x * 4 + 4])
+
+
+
+class RasterFillTests(TestCase):
+
+    def test_raster_starts_transparent_or_background(self):
+        self.assertEqual(Raster(2, 2).pixels, bytearray(16))
+        self.assertEqual(
+         Raster(2, 1, "#102030").pixels, bytearray(b"\x10\x20\x30\xff" * 2)
+        )
+
+
+    def test_can_fill_polygon(self):
+        raster = Raster(10, 10)
+        raster.fill_polygon([[(2, 2), (6, 2), (6, 5), (2, 5)]], (255, 0, 0))
+        painted = [(index // 4 % 10, index // 40)
+         for index in range(3, 400, 4) if raster.pixels[index]]
+        self.assertEqual(
+         painted, [(x, y) for y in range(2, 5) for x in range(2, 6)]
+        )
+
+
+    def test_fill_uses_non_zero_winding(self):
+        raster = Raster(10, 10)
+        outer = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        inner = [(3, 3), (3, 7), (7, 7), (7, 3)]
+        raster.fill_polygon([outer, inner], (255, 0, 0))
+        self.assertEqual(raster.pixels[(5 * 10 + 5) * 4 + 3], 0)
+        self.assertEqual(raster.pixels[(1 * 10 + 1) * 4 + 3], 255)
+
+
+    def test_translucent_fills_blend(self):
+        raster = Raster(1, 1, "#0000FF")
+        raster.fill_polygon([[(0, 0), (1, 0), (1, 1), (0, 1)]], (255, 0, 0), 0.5)
+        self.assertEqual(tuple(raster.pixels), (128, 0, 128, 255))
+
+
+    def test_dash_path(self):
+        self.assertEqual(
+         dash_path([(0, 0), (10, 0)], 3, 2),
+         [[(0, 0), (3, 0)], [(5, 0), (8, 0)]]
+        )
+
+
+
+class CanvasPngTests(TestCase):
+
+    def test_can_make_png(self):
+        canvas = Canvas(40, 30, background_color="#FFFFFF")
+        canvas.add_rectangle(10, 10, 10, 10, fill_color="#FF0000", line_width=0)
+        png = canvas.to_png()
+        self.assertTrue(png.startswith(b"\x89PNG\r\n\x1a\n"))
+        width, height, pixel = decode_png(png)
+        self.assertEqual((width, height), (40, 30))
+        self.assertEqual(pixel(15, 15), (255, 0, 0, 255))
+        self.assertEqual(pixel(5, 5), (255, 255, 255, 255))
+
+
+    def test_png_edges_and_rotation(self):
+        canvas = Canvas(40, 40)
+        canvas.add_rectangle(
+         10, 10, 20, 20, fill_color="#00FF00", line_width=4, rotation=(20, 20, 45)
+        )
+        canvas.add_line(0, 39, 40, 39, line_width=2, line_color="#0000FF")
+        width, height, pixel = decode_png(canvas.to_png())
+        self.assertEqual(pixel(20, 20), (0, 255, 0, 255))
+        self.assertEqual(pixel(20, 6), (0, 0, 0, 255))
+        self.assertEqual(pixel(11, 11), (0, 0, 0, 0))
+        self.assertEqual(pixel(5, 39), (0, 0, 255, 255))
+
+
+    def test_png_transforms(self):
+        canvas = Canvas(40, 40)
+        rectangle = canvas.add_rectangle(
+         0, 0, 10, 10, fill_color="#FF0000", line_width=0
+        )
+        rectangle.scale(2, 1)
+        rectangle.translate(10, 20)
+        width, height, pixel = decode_png(canvas.to_png())
+        self.assertEqual(pixel(25, 25), (255, 0, 0, 255))
+        self.assertEqual(pixel(5, 25), (0, 0, 0, 0))
+        self.assertEqual(pixel(25, 15), (0, 0, 0, 0))
+
+
+    def test_png_opacity_over_transparency(self):
+        canvas = Canvas(10, 10)
+        canvas.add_oval(0, 0, 10, 10, fill_color="#FF0000", opacity=0.5, line_width=0)
+        width, height, pixel = decode_png(canvas.to_png())
+        self.assertEqual(pixel(5, 5), (255, 0, 0, 128))
+
+
+    def test_png_batches_match_graphics(self):
+        batched, separate = Canvas(50, 50), Canvas(50, 50)
+        batched.add_ovals([5, 25], [5, 20], [10, 20], [15, 10], line_style="--")
+        separate.add_oval(5, 5, 10, 15, line_style="--")
+        separate.add_oval(25, 20, 20, 10, line_style="--")
+        self.assertEqual(batched.to_png(), separate.to_png())
+
+
+    def test_png_can_be_scaled(self):
+        canvas = Canvas(40, 30)
+        canvas.add_rectangle(10, 10, 10, 10)
+        width, height, pixel = decode_png(canvas.to_png(scale=0.5))
+        self.assertEqual((width, height), (20, 15))
+        self.assertEqual(pixel(7, 7), (255, 255, 255, 255))
+        with self.assertRaises(TypeError):
+            canvas.to_png(scale="2")
+        with self.assertRaises(ValueError):
+            canvas.to_png(scale=0)
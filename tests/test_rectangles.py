@@ -57,3 +57,46 @@ class SvgTests(TestCase):
          'a="b"',
          rectangle.to_svg()
         )
+
+
+
+class SvgCacheTests(TestCase):
+
+    def test_svg_is_cached(self):
+        rectangle = Rectangle(10, 30, 400, 500)
+        svg = rectangle.to_svg()
+        self.assertIs(rectangle._svg, svg)
+        self.assertIs(rectangle.to_svg(), svg)
+
+
+    def test_setters_invalidate_svg(self):
+        rectangle = Rectangle(10, 30, 400, 500)
+        rectangle.to_svg()
+        rectangle.x(20)
+        self.assertIs(rectangle._svg, None)
+        self.assertIn('x="20.0"', rectangle.to_svg())
+        rectangle.fill_color("#FF0000")
+        self.assertIn("fill:#FF0000;", rectangle.to_svg())
+        rectangle.rotate(10, 10, 90)
+        self.assertIn("rotate(90.0 10.0 10.0)", rectangle.to_svg())
+
+
+    def test_failed_setter_does_not_invalidate_svg(self):
+        rectangle = Rectangle(10, 30, 400, 500)
+        svg = rectangle.to_svg()
+        with self.assertRaises(TypeError):
+            rectangle.width("10")
+        self.assertIs(rectangle._svg, svg)
+
+
+    def test_data_changes_invalidate_svg(self):
+        rectangle = Rectangle(10, 30, 400, 500)
+        rectangle.to_svg()
+        rectangle.data()["onclick"] = "func();"
+        self.assertIn('onclick="func();"', rectangle.to_svg())
+        rectangle.data().update(a="b")
+        self.assertIn('a="b"', rectangle.to_svg())
+        del rectangle.data()["onclick"]
+        self.assertNotIn("onclick", rectangle.to_svg())
+        rectangle.data().clear()
+        self.assertNotIn('a="b"', rectangle.to_svg())
@@ -175,6 +175,14 @@ class TextPropertiesTests(TestCase):
             text.vertical_align("middle")
 
 
+    def test_text_bounding_box_is_estimated_from_font_size(self):
+        text = Text(100, 100, "abcde", font_size=10)
+        self.assertEqual(text.bounding_box(), (85, 95, 30, 10))
+        text.horizontal_align("right")
+        text.vertical_align("bottom")
+        self.assertEqual(text.bounding_box(), (100, 100, 30, 10))
+
+
 
 class SvgTests(TestCase):
 
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from omnicanvas.canvas import Canvas
+from omnicanvas.graphics import RectangleBatch, LineBatch
+
+class TileRenderingTests(TestCase):
+
+    def setUp(self):
+        self.out_dir = tempfile.mkdtemp()
+        self.canvas = Canvas(1000, 500, background_color="#FFFFFF")
+
+
+    def tearDown(self):
+        shutil.rmtree(self.out_dir)
+
+
+    def read_tile(self, zoom, column, row):
+        with open(os.path.join(
+         self.out_dir, str(zoom), str(column), "%i.svg" % row
+        )) as f:
+            return f.read()
+
+
+    def test_can_render_tiles(self):
+        line = self.canvas.add_line(10, 10, 490, 240)
+        rectangle = self.canvas.add_rectangle(600, 300, 100, 100)
+        count = self.canvas.render_tiles(256, 2, self.out_dir)
+        self.assertEqual(
+         sorted(os.listdir(os.path.join(self.out_dir, "1"))), ["0", "1", "2"]
+        )
+        self.assertEqual(count, 3 + 2)
+        tile = self.read_tile(1, 0, 0)
+        self.assertIn(
+         'width="256" height="256" viewBox="0.0 0.0 256.0 256.0">', tile
+        )
+        self.assertIn(
+         '<rect x="0.0" y="0.0" width="256.0" height="256.0" style="fill:#FFFFFF;', tile
+        )
+        self.assertIn(line.to_svg(), tile)
+        self.assertNotIn(rectangle.to_svg(), tile)
+        self.assertIn(rectangle.to_svg(), self.read_tile(1, 2, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.out_dir, "1", "3")))
+        tile = self.read_tile(0, 0, 0)
+        self.assertIn('viewBox="0.0 0.0 512.0 512.0"', tile)
+        self.assertIn(line.to_svg(), tile)
+        self.assertIn(rectangle.to_svg(), self.read_tile(0, 1, 0))
+
+
+    def test_tiles_only_contain_overlapping_batch_rows(self):
+        self.canvas.add_rectangles([10, 300, 20], [10, 10, 300], [5, 5, 5], [5, 5, 5])
+        self.canvas.add_line(0, 0, 5, 5)
+        self.canvas.add_rectangles([30], [30], [5], [5])
+        self.canvas.render_tiles(256, 1, self.out_dir)
+        tile = self.read_tile(0, 0, 0)
+        self.assertEqual(tile.count("<rect "), 3) # Background and two rows
+        self.assertLess(tile.index('<rect x="10.0"'), tile.index("<line "))
+        self.assertLess(tile.index("<line "), tile.index('<rect x="30.0"'))
+        self.assertIn('<rect x="300.0"', self.read_tile(0, 1, 0))
+        self.assertIn('<rect x="20.0"', self.read_tile(0, 0, 1))
+
+
+    def test_can_render_raster_tiles(self):
+        self.canvas.add_oval(10, 10, 50, 50)
+        self.canvas.render_tiles(128, 1, self.out_dir, rasters=True, minify=True)
+        with open(os.path.join(self.out_dir, "0", "0", "0.png"), "rb") as f:
+            self.assertTrue(f.read().startswith(b"\x89PNG"))
+        self.assertTrue(self.read_tile(0, 0, 0).startswith("<svg"))
+
+
+    def test_tolerance_is_in_tile_pixels(self):
+        self.canvas.add_polyline(
+         *[value for x in range(0, 110, 10) for value in (x, 100 + x % 20 / 10)]
+        )
+        self.canvas.render_tiles(256, 2, self.out_dir, tolerance=1.5)
+        self.assertIn("10.0,101.0", self.read_tile(1, 0, 0))
+        self.assertNotIn("10.0,101.0", self.read_tile(0, 0, 0))
+        self.assertIn("100.0,100.0", self.read_tile(0, 0, 0))
+
+
+    def test_tile_arguments_are_validated(self):
+        with self.assertRaises(TypeError):
+            self.canvas.render_tiles(256.0, 1, self.out_dir)
+        with self.assertRaises(ValueError):
+            self.canvas.render_tiles(0, 1, self.out_dir)
+        with self.assertRaises(ValueError):
+            self.canvas.render_tiles(256, 0, self.out_dir)
+        with self.assertRaises(TypeError):
+            self.canvas.render_tiles(256, 1, self.out_dir, rasters="yes")
+        with self.assertRaises(TypeError):
+            self.canvas.render_tiles(256, 1, self.out_dir, minify="yes")
+
+
+
+class BatchRowBoundsTests(TestCase):
+
+    def test_row_bounds_match_view_bounds(self):
+        for batch in (
+         RectangleBatch([10, 20], [30, 40], [-5, 60], [70, 80], line_width=3),
+         RectangleBatch([10, 20], [30, 40], [5, 60], [70, 80], rotation=(0, 0, 30)),
+         LineBatch([10, 20], [30, 40], [5, 60], [70, 10], line_width=2)
+        ):
+            self.assertEqual(
+             list(batch._row_bounds()), [view._get_bounds() for view in batch]
+            )